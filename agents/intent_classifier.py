@@ -1,7 +1,6 @@
 import asyncio
 import os
 import sys
-import time
 
 from rich.console import Console
 from rich.live import Live
@@ -14,7 +13,13 @@ _console = Console(stderr=True, force_terminal=True)
 
 from agents.router import route_intent
 from pydantic_types.intent_response import IntentResponse
-from skills.conversation.skill import get_current_topic, get_recent_history
+from skills.conversation.skill import (
+  clear_turn_cache,
+  get_current_topic,
+  get_recent_history,
+  prefetch_memories,
+  worth_prefetching,
+)
 from tts.tts import speak
 from utils.llm_structured_output import generate_structured_output
 
@@ -232,17 +237,54 @@ _INTENT_STATUS: dict[str, str] = {
 }
 
 
-async def run_intent_classifier(user_query: str, on_token=None, on_status=None) -> str:
-  """Run the intent classifier agent and return the response."""
+async def run_intent_classifier(
+  user_query: str,
+  on_token=None,
+  on_status=None,
+  session_id: str | None = None,
+) -> str:
+  """Run the intent classifier agent and return the response.
+
+  session_id selects the conversation session (history, topic, memories) the
+  query belongs to; None uses the CLI's default session.
+  """
+  from skills.conversation.session import use_session
+  from utils.idle import foreground
+  from utils.turn_metrics import start_turn
+
+  async with foreground(), use_session(session_id):
+    with start_turn() as turn:
+      # Speculative: memory retrieval overlaps with classification and is reused
+      # by CHAT if that is where the query lands. Only for queries that look
+      # conversational, and cancelled once another intent is chosen.
+      if worth_prefetching(user_query):
+        prefetch_memories(user_query)
+      try:
+        response = await _run_turn(user_query, on_token=on_token, on_status=on_status)
+      finally:
+        clear_turn_cache()
+
+    # Logged once the turn is closed, so total_ms covers all of it
+    from skills.conversation.session import current_session
+    from skills.journal import append_to_journal
+
+    await append_to_journal(
+      question=user_query, answer=response, user_id=current_session().user_id, metrics=turn.to_dict(),
+    )
+    logger.info(f"Finished in total {turn.total_ms / 1000:.2f}s — {turn.skill} {turn.stages}")
+    return response
+
+
+async def _run_turn(user_query: str, on_token=None, on_status=None) -> str:
+  from utils.turn_metrics import current_turn, stage
 
-  start_time = time.time()
   classifier_input = _build_classifier_prompt(user_query)
 
   # Use structured output to guarantee a valid intent classification
   logger.debug("Invoking primary intent classifier")
   logger.debug(f"Classifier input:\n{classifier_input}")
 
-  with Live(Spinner("dots", text=Text("tinkering", style="dim")), console=_console, transient=True):
+  with Live(Spinner("dots", text=Text("tinkering", style="dim")), console=_console, transient=True), stage("classify"):
     result = await asyncio.to_thread(
       generate_structured_output,
       model_name=os.environ["MODEL_GENERALIST"],
@@ -252,22 +294,20 @@ async def run_intent_classifier(user_query: str, on_token=None, on_status=None)
       max_tokens=100,
     )
   logger.debug(f"Classified intent: {result.intent}")
+  current_turn().intent = result.intent
+  if result.intent != "CHAT":
+    clear_turn_cache()  # the speculative retrieval is not going to be used
 
   if on_status:
     on_status(_INTENT_STATUS.get(result.intent, "Processing"))
 
-  handler_response = await route_intent(intent=result.intent, query=user_query, on_token=on_token, on_status=on_status)
-
-  # Append to today's journal
-  from skills.journal import append_to_journal
-
-  await append_to_journal(question=user_query, answer=handler_response)
+  with stage("route"):
+    handler_response = await route_intent(
+      intent=result.intent, query=user_query, on_token=on_token, on_status=on_status,
+    )
 
   logger.info(handler_response)
   if "--speak" in sys.argv:
     speak(handler_response)
 
-  elapsed_time = time.time() - start_time
-  logger.info(f"Finished in total {elapsed_time:.2f}s")
-
   return handler_response
@@ -32,7 +32,7 @@ async def _dispatch(skill, effective_query: str, original_query: str, on_token=N
   # CHAT with streaming: skip the normal handle() call and go straight to handle_chat
   if not skill.needs_wrapping and on_token is not None and skill.id == "CHAT":
     from skills.conversation.skill import handle_chat
-    return await handle_chat(query=effective_query, on_token=on_token)
+    return await handle_chat(query=effective_query, on_token=on_token, on_status=on_status)
 
   if asyncio.iscoroutinefunction(skill.handle):
     response = await skill.handle(query=effective_query)
@@ -42,7 +42,29 @@ async def _dispatch(skill, effective_query: str, original_query: str, on_token=N
   if not skill.needs_wrapping:
     return response
 
-  return await handle_conversation(original_query, response, on_token=on_token)
+  return await handle_conversation(original_query, response, on_token=on_token, on_status=on_status)
+
+
+async def execute_skill(intent: str, query: str) -> str:
+  """Run a skill's handle and return its raw output — for tool use by ReAct and the planner.
+
+  Unlike route_intent there is no topic enrichment, no handle_conversation wrap
+  and no session history: the caller digests the output itself. CHAT and PLANNER
+  are conversational entry points, not tools, and are refused, as is any skill
+  whose auth provider is not connected (an interactive connect flow makes no
+  sense mid-loop).
+  """
+  skill = SKILL_MAP.get(intent.strip().upper())
+  if skill is None or skill.id == "CHAT":
+    raise ValueError(f"{intent} is not an executable skill")
+
+  if skill.auth_provider and not await skill.auth_provider.is_connected():
+    return f"{skill.auth_provider.display_name} is not connected."
+
+  if asyncio.iscoroutinefunction(skill.handle):
+    return await skill.handle(query=query)
+  # Sync handlers do blocking I/O — keep them off the event loop
+  return await asyncio.to_thread(skill.handle, query=query)
 
 
 def _build_planner_task(query: str) -> str:
@@ -55,16 +77,23 @@ def _build_planner_task(query: str) -> str:
 
 async def route_intent(intent: str, query: str, on_token=None, on_status=None) -> str:
   """Route a classified intent to its matching skill."""
+  from utils.turn_metrics import current_turn
+
   normalized = intent.strip().upper()
+  turn = current_turn()
 
   if normalized == "PLANNER":
     from skills.planner.skill import run_planner
+    if turn is not None:
+      turn.skill = "PLANNER"
     task = _build_planner_task(query)
     logger.debug(f"Intent: PLANNER — task: {task!r}")
-    return await run_planner(task)
+    return await run_planner(task, on_status=on_status)
 
   skill_id = next((sid for sid in SKILL_MAP if sid in normalized), "CHAT")
   logger.debug(f"Intent: {skill_id}")
+  if turn is not None:
+    turn.skill = skill_id
 
   skill = SKILL_MAP[skill_id]
   effective_query = _enrich_query(query, skill_id)
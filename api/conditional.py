@@ -0,0 +1,77 @@
+"""Conditional GET (ETag / If-None-Match) and a rendered-response cache.
+
+A listing's ETag is a hash of the request path and query plus the change
+versions of the resources it reads (db/versions.py). If the client already
+holds that ETag the answer is an empty 304. Otherwise the JSON body rendered
+for that ETag is served from a small in-memory LRU when present, and only
+rendered from Mongo when a version has moved.
+
+    async def handle_notes(request):
+        async def render():
+            ...
+            return {"notes": [...]}
+        return await conditional_json(request, (NOTES,), render)
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from aiohttp import web
+
+CACHE_ENTRIES = 64
+
+_cache: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+
+
+def _etag(key: str, versions: tuple[int, ...]) -> str:
+    return '"' + hashlib.sha1(f"{key}|{versions}".encode()).hexdigest()[:24] + '"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix added by a proxy still matches
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+async def conditional_json(
+    request: web.Request,
+    resources: tuple[str, ...],
+    render: Callable[[], Awaitable[dict | web.StreamResponse]],
+) -> web.StreamResponse:
+    """Answer a GET whose body depends only on the request and the given resources.
+
+    render() returns the JSON payload, or a ready response (e.g. a 400) which is
+    passed through uncached and without an ETag.
+    """
+    from db.versions import get_versions
+
+    # Versions are read before rendering, so a write racing with render() can
+    # only make the cached body newer than its ETag, never staler
+    key = request.path_qs
+    etag = _etag(key, await get_versions(resources))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _matches(request.headers.get("If-None-Match", ""), etag):
+        return web.Response(status=304, headers=headers)
+
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == etag:
+        _cache.move_to_end(key)
+        body = cached[1]
+    else:
+        result = await render()
+        if isinstance(result, web.StreamResponse):
+            return result
+        body = json.dumps(result).encode()
+        _cache[key] = (etag, body)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+    return web.Response(body=body, content_type="application/json", headers=headers)
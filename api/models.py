@@ -11,6 +11,10 @@ from db.schemas import NoteCategory
 
 class QueryRequest(BaseModel):
     query: str = Field(..., description="Natural language query sent to the intent classifier")
+    session_id: Optional[str] = Field(
+        None,
+        description="Conversation session to continue (one per client/device). Omit to share the default session.",
+    )
 
 
 class QueryResponse(BaseModel):
@@ -32,18 +36,106 @@ class VoiceResponse(BaseModel):
     audio: str = Field(..., description="Base64-encoded WAV audio of the spoken response")
 
 
+# --- /planner ---
+
+class PlannerRequest(BaseModel):
+    task: str = Field(..., description="Task for the planner to research and plan")
+
+
+class PlannerJobAccepted(BaseModel):
+    job_id: str
+    status: str = Field(..., description="queued")
+
+
+class PlannerStepModel(BaseModel):
+    tool: str
+    query: str
+    result: str
+
+
+class PlannerJobModel(BaseModel):
+    job_id: str
+    task: str
+    status: str = Field(..., description="queued | running | done | error")
+    steps: list[PlannerStepModel] = Field(..., description="Tool calls completed so far, in order")
+    plan: Optional[str] = Field(None, description="Final plan in markdown once status is done")
+    error: Optional[str] = None
+    created_at: str = Field(..., description="ISO 8601 datetime")
+    updated_at: str = Field(..., description="ISO 8601 datetime")
+
+
+# --- paginated listings ---
+
+_NEXT_CURSOR = Field(None, description="Pass as ?after= for the next page; null on the last page")
+
+
+# --- /conversations ---
+
+class ConversationDayModel(BaseModel):
+    date: str = Field(..., description="YYYY-MM-DD")
+    exchange_count: int
+    compact_status: str = Field(..., description="idle | pending | complete | error")
+
+
+class ConversationsResponse(BaseModel):
+    dates: list[str] = Field(..., description="Dates with logged conversations, newest first")
+    days: list[ConversationDayModel]
+    next_cursor: Optional[str] = _NEXT_CURSOR
+
+
+# --- /journal ---
+
+class JournalEntryModel(BaseModel):
+    datestamp: str = Field(..., description="YYYY-MM-DD")
+    summary: str
+
+
+class JournalResponse(BaseModel):
+    entries: list[JournalEntryModel]
+    next_cursor: Optional[str] = _NEXT_CURSOR
+
+
+# --- /plans ---
+
+class PlanModel(BaseModel):
+    id: str
+    ask: str
+    plan: Optional[str] = Field(None, description="Full plan in markdown (omitted with full=false)")
+    preview: Optional[str] = Field(None, description="Start of the plan (only with full=false)")
+    created_at: str = Field(..., description="ISO 8601 datetime")
+
+
+class PlansResponse(BaseModel):
+    plans: list[PlanModel]
+    next_cursor: Optional[str] = _NEXT_CURSOR
+
+
 # --- /notes ---
 
 class NoteModel(BaseModel):
     id: str
     title: str = Field(..., description="Plain text title")
-    content: str = Field(..., description="Note body in markdown")
+    content: Optional[str] = Field(None, description="Note body in markdown (omitted with full=false)")
+    preview: Optional[str] = Field(None, description="Start of the note body (only with full=false)")
     category: Optional[NoteCategory] = Field(None, description="read | listen | watch | eat | visit")
     created_at: str = Field(..., description="ISO 8601 datetime")
 
 
 class NotesResponse(BaseModel):
     notes: list[NoteModel]
+    next_cursor: Optional[str] = _NEXT_CURSOR
+
+
+class NoteSearchHit(BaseModel):
+    id: str
+    title: str
+    category: Optional[NoteCategory] = None
+    created_at: str = Field(..., description="ISO 8601 datetime")
+    score: float = Field(..., description="Relevance; higher is better")
+
+
+class NoteSearchResponse(BaseModel):
+    results: list[NoteSearchHit] = Field(..., description="Best match first")
 
 
 # --- /reminders ---
@@ -57,6 +149,7 @@ class ReminderModel(BaseModel):
 
 class RemindersResponse(BaseModel):
     reminders: list[ReminderModel]
+    next_cursor: Optional[str] = _NEXT_CURSOR
 
 
 # --- errors ---
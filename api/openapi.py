@@ -1,15 +1,27 @@
 """Generates the OpenAPI 3.0 spec at runtime from the skills registry and API models."""
 
 from api.models import (
+    ConversationDayModel,
+    ConversationsResponse,
     ErrorResponse,
+    JournalEntryModel,
+    JournalResponse,
     NoteModel,
+    NoteSearchHit,
+    NoteSearchResponse,
     NotesResponse,
+    PlannerJobAccepted,
+    PlannerJobModel,
+    PlannerRequest,
+    PlanModel,
+    PlansResponse,
     QueryRequest,
     QueryResponse,
     ReminderModel,
     RemindersResponse,
     VoiceResponse,
 )
+from api.pagination import DEFAULT_LIMIT, MAX_LIMIT
 
 
 def build_spec() -> dict:
@@ -24,8 +36,19 @@ def build_spec() -> dict:
         "QueryRequest": QueryRequest.model_json_schema(),
         "QueryResponse": QueryResponse.model_json_schema(),
         "VoiceResponse": VoiceResponse.model_json_schema(),
+        "PlannerRequest": PlannerRequest.model_json_schema(),
+        "PlannerJobAccepted": PlannerJobAccepted.model_json_schema(),
+        "PlannerJobModel": PlannerJobModel.model_json_schema(),
+        "ConversationDayModel": ConversationDayModel.model_json_schema(),
+        "ConversationsResponse": ConversationsResponse.model_json_schema(),
+        "JournalEntryModel": JournalEntryModel.model_json_schema(),
+        "JournalResponse": JournalResponse.model_json_schema(),
+        "PlanModel": PlanModel.model_json_schema(),
+        "PlansResponse": PlansResponse.model_json_schema(),
         "NoteModel": NoteModel.model_json_schema(),
         "NotesResponse": NotesResponse.model_json_schema(),
+        "NoteSearchHit": NoteSearchHit.model_json_schema(),
+        "NoteSearchResponse": NoteSearchResponse.model_json_schema(),
         "ReminderModel": ReminderModel.model_json_schema(),
         "RemindersResponse": RemindersResponse.model_json_schema(),
         "ErrorResponse": ErrorResponse.model_json_schema(),
@@ -45,6 +68,12 @@ def build_spec() -> dict:
                 "Personal AI assistant API. All intelligence runs server-side.\n\n"
                 "## Available Skills\n\n"
                 f"{skills_table}\n\n"
+                "## Pagination\n\n"
+                "GET /conversations, /journal, /plans, /notes and /reminders are paginated. Each returns at most "
+                f"?limit= rows ({DEFAULT_LIMIT} by default, up to {MAX_LIMIT}) and a next_cursor; pass it as "
+                "?after= for the following page. next_cursor is null on the last page. Clients written before "
+                f"pagination, which expect the whole list in one response, now see only the first {DEFAULT_LIMIT} "
+                "rows and must follow next_cursor.\n\n"
                 "## Authentication\n\n"
                 "No application-level auth. Access is restricted to devices on the same "
                 "Tailscale network (WireGuard). Ensure Tailscale is connected before making requests."
@@ -56,7 +85,9 @@ def build_spec() -> dict:
                     "summary": "Send a text query",
                     "description": (
                         "Runs the query through the intent classifier and returns the skill response. "
-                        f"Valid intents: {', '.join(intent_enum)}"
+                        f"Valid intents: {', '.join(intent_enum)}. "
+                        "A query starting with \"/planner <task>\" is queued as a planner job instead, "
+                        "exactly as POST /planner, and answered with 202 and the job id."
                     ),
                     "requestBody": {
                         "required": True,
@@ -77,7 +108,16 @@ def build_spec() -> dict:
                                 }
                             },
                         },
+                        "202": {
+                            "description": "\"/planner <task>\" query — planner job queued",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/PlannerJobAccepted"}
+                                }
+                            },
+                        },
                         "400": _error_response("query field is missing or empty"),
+                        "429": _error_response("The planner already has 8 plans waiting."),
                     },
                 }
             },
@@ -124,26 +164,148 @@ def build_spec() -> dict:
                     },
                 }
             },
-            "/notes": {
+            "/planner": {
+                "post": {
+                    "summary": "Queue a planner job",
+                    "description": (
+                        "Queues the task for the multi-step planner and returns immediately. "
+                        "Poll GET /planner/{job_id} or follow WS /planner/{job_id}/ws for progress."
+                    ),
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/PlannerRequest"},
+                                "example": {"task": "Plan a weekend in Kyoto"},
+                            }
+                        },
+                    },
+                    "responses": {
+                        "202": {
+                            "description": "Job queued",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/PlannerJobAccepted"}
+                                }
+                            },
+                        },
+                        "400": _error_response("task is required"),
+                        "429": _error_response("The planner already has 8 plans waiting."),
+                    },
+                }
+            },
+            "/planner/{job_id}": {
                 "get": {
-                    "summary": "List all notes",
-                    "description": "Returns all saved notes, newest first.",
+                    "summary": "Get a planner job",
+                    "description": "Returns the job with its checkpointed steps. 202 while queued or running, 200 once done or failed.",
+                    "parameters": [
+                        {"name": "job_id", "in": "path", "required": True, "schema": {"type": "string"}}
+                    ],
                     "responses": {
                         "200": {
-                            "description": "List of notes",
+                            "description": "Finished job",
                             "content": {
                                 "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/NotesResponse"}
+                                    "schema": {"$ref": "#/components/schemas/PlannerJobModel"}
                                 }
                             },
-                        }
+                        },
+                        "202": {
+                            "description": "Job still queued or running",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/PlannerJobModel"}
+                                }
+                            },
+                        },
+                        "404": _error_response("job not found"),
+                    },
+                }
+            },
+            "/conversations": {
+                "get": {
+                    "summary": "List conversation days",
+                    "description": "Dates with logged conversations, newest first, with exchange counts. Paginated.",
+                    "parameters": _page_parameters(100),
+                    "responses": {
+                        "200": _list_response("Page of conversation days", "ConversationsResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("invalid cursor"),
+                    },
+                }
+            },
+            "/journal": {
+                "get": {
+                    "summary": "List journal entries",
+                    "description": "Journal entries newest first, or the single entry for ?date=. Paginated.",
+                    "parameters": [
+                        {
+                            "name": "date",
+                            "in": "query",
+                            "required": False,
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "Return only the entry for this date (YYYY-MM-DD)",
+                        },
+                        *_page_parameters(10),
+                    ],
+                    "responses": {
+                        "200": _list_response("Page of journal entries", "JournalResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("invalid date format, use YYYY-MM-DD"),
+                    },
+                }
+            },
+            "/plans": {
+                "get": {
+                    "summary": "List saved plans",
+                    "description": "Saved planner results, newest first. Paginated; full=false sends a short preview instead of the plan text.",
+                    "parameters": [*_page_parameters(), _FULL_PARAMETER],
+                    "responses": {
+                        "200": _list_response("Page of plans", "PlansResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("invalid cursor"),
+                    },
+                }
+            },
+            "/notes": {
+                "get": {
+                    "summary": "List notes",
+                    "description": "Saved notes, newest first. Paginated; full=false sends a short preview instead of the note content.",
+                    "parameters": [*_page_parameters(), _FULL_PARAMETER],
+                    "responses": {
+                        "200": _list_response("Page of notes", "NotesResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("invalid cursor"),
+                    },
+                }
+            },
+            "/notes/search": {
+                "get": {
+                    "summary": "Search notes",
+                    "description": (
+                        "Ranked search over note titles and content. Combines the Mongo text index "
+                        "(whole words, stemmed) with trigram matching for partial words and typos."
+                    ),
+                    "parameters": [
+                        {"name": "q", "in": "query", "required": True, "schema": {"type": "string"}},
+                        {
+                            "name": "limit",
+                            "in": "query",
+                            "required": False,
+                            "schema": {"type": "integer", "minimum": 1, "maximum": 50, "default": 10},
+                        },
+                    ],
+                    "responses": {
+                        "200": _list_response("Matching notes, best first", "NoteSearchResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("q is required"),
                     },
                 }
             },
             "/reminders": {
                 "get": {
                     "summary": "List reminders",
-                    "description": "Returns reminders sorted by datetime ascending. Excludes completed by default.",
+                    "description": "Returns reminders sorted by datetime ascending. Excludes completed by default. Paginated.",
                     "parameters": [
                         {
                             "name": "include_completed",
@@ -151,17 +313,13 @@ def build_spec() -> dict:
                             "required": False,
                             "schema": {"type": "boolean", "default": False},
                             "description": "Include completed reminders",
-                        }
+                        },
+                        *_page_parameters(),
                     ],
                     "responses": {
-                        "200": {
-                            "description": "List of reminders",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/RemindersResponse"}
-                                }
-                            },
-                        }
+                        "200": _list_response("Page of reminders", "RemindersResponse"),
+                        "304": _NOT_MODIFIED,
+                        "400": _error_response("invalid cursor"),
                     },
                 }
             },
@@ -170,6 +328,46 @@ def build_spec() -> dict:
     }
 
 
+_NOT_MODIFIED = {
+    "description": "Not modified — the If-None-Match header matched the current ETag",
+    "headers": {"ETag": {"schema": {"type": "string"}}},
+}
+
+_FULL_PARAMETER = {
+    "name": "full",
+    "in": "query",
+    "required": False,
+    "schema": {"type": "boolean", "default": True},
+    "description": "Send the full text field; false sends a short preview instead",
+}
+
+
+def _page_parameters(default_limit: int = DEFAULT_LIMIT) -> list[dict]:
+    return [
+        {
+            "name": "limit",
+            "in": "query",
+            "required": False,
+            "schema": {"type": "integer", "minimum": 1, "maximum": MAX_LIMIT, "default": default_limit},
+            "description": "Page size",
+        },
+        {
+            "name": "after",
+            "in": "query",
+            "required": False,
+            "schema": {"type": "string"},
+            "description": "next_cursor from the previous page; omit for the first page",
+        },
+    ]
+
+
+def _list_response(description: str, schema: str) -> dict:
+    return {
+        "description": description,
+        "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{schema}"}}},
+    }
+
+
 def _error_response(example: str) -> dict:
     return {
         "description": "Bad request",
@@ -0,0 +1,96 @@
+"""Keyset pagination and projections for the API listing endpoints.
+
+Pages are ordered by a sort field plus _id as a tie-breaker. The cursor
+returned with a page encodes the last row's (sort value, _id); the next page
+asks Mongo for rows strictly past that point, so every page is an index range
+scan, whatever its depth — each listing's sort field is indexed together
+with _id (db/schemas.py), so the tie-breaker is in the index too. Rows are read as raw dicts with a server-side
+projection — only the requested fields cross the wire, and nothing goes
+through Beanie/pydantic.
+
+    GET /notes?limit=20                     → {"notes": [...], "next_cursor": "..."}
+    GET /notes?limit=20&after=<next_cursor> → the following 20
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+PREVIEW_CHARS = 160
+
+
+def page_params(query, default_limit: int = DEFAULT_LIMIT) -> tuple[str | None, int]:
+    """(after, limit) from a request's query string. Raises ValueError for a bad limit."""
+    limit = int(query.get("limit", default_limit))
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+    return query.get("after") or None, limit
+
+
+def wants_full(query) -> bool:
+    """Whether to send large text fields in full — the default; ?full=false asks for previews instead."""
+    return query.get("full", "true").lower() != "false"
+
+
+def preview(field: str) -> dict:
+    """Projection expression for the first PREVIEW_CHARS characters of a text field."""
+    return {"$substrCP": [{"$ifNull": [f"${field}", ""]}, 0, PREVIEW_CHARS]}
+
+
+def encode_cursor(value, doc_id) -> str:
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    raw = json.dumps([value.isoformat(), str(doc_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, doc_id = json.loads(raw)
+        return datetime.fromisoformat(value), ObjectId(doc_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError("invalid cursor") from e
+
+
+async def fetch_page(
+    model,
+    sort_field: str,
+    projection: dict,
+    limit: int,
+    after: str | None = None,
+    descending: bool = True,
+    filter: dict | None = None,
+) -> tuple[list[dict], str | None]:
+    """One page of raw documents from model's collection and the cursor for the next (None at the end).
+
+    sort_field must be a datetime (or date) field, indexed together with the
+    filter for the query to stay a range scan.
+    """
+    query = dict(filter or {})
+    if after is not None:
+        value, doc_id = decode_cursor(after)
+        past = "$lt" if descending else "$gt"
+        query = {"$and": [query, {"$or": [
+            {sort_field: {past: value}},
+            {sort_field: value, "_id": {past: doc_id}},
+        ]}]}
+
+    order = -1 if descending else 1
+    cursor = (
+        model.get_pymongo_collection()
+        .find(query, {**projection, sort_field: 1})
+        .sort([(sort_field, order), ("_id", order)])
+        .limit(limit + 1)
+    )
+    docs = await cursor.to_list(length=limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1][sort_field], docs[-1]["_id"])
@@ -1,21 +1,25 @@
 """Langbox HTTP API — serves the mobile app over Tailscale.
 
 Endpoints:
-  POST /query              — text query through the intent classifier (synchronous)
-  WS   /query/ws           — text query with streaming status + token events
+  POST /query              — text query through the intent classifier (synchronous, optional session_id;
+                             "/planner <task>" queues a planner job and returns 202 + job_id)
+  WS   /query/ws           — text query with streaming status + token events (optional session_id)
   GET  /tts/voices         — list available TTS voice IDs and the default
   GET  /personas           — list available persona IDs
   GET  /persona            — get the active persona
   POST /persona            — set the active persona (body: {"persona": "<id>"})
-  WS   /voice/ws           — WebSocket voice round-trip (audio in → transcribed + done events out)
-  POST /voice              — audio file → synthesised response (optional ?voice_id=)
+  WS   /voice/ws           — WebSocket voice round-trip (audio in → transcribed, status + done events out, optional ?session_id=)
+  POST /voice              — audio file → synthesised response (optional ?voice_id=, ?session_id=)
   GET  /voice/{job_id}     — poll for voice job result (pending | done | error)
   DEL  /voice/{job_id}     — cancel an in-flight voice job
-  WS   /compact            — compact a day's conversations, then auto-writes journal; pushes pending → complete/error (?date=YYYY-MM-DD)
+  WS   /compact            — compact a day's conversations, then auto-writes journal; pushes pending → complete/error (?date=YYYY-MM-DD&session_id=...)
   GET  /conversations      — list all dates that have conversation records (newest first)
   GET  /conversation/{date} — exchanges + compact state for a specific date (YYYY-MM-DD)
   GET  /journal            — list journal entries (?date= or ?limit=)
   GET  /plans              — list saved planner plans
+  POST /planner            — queue a planner job (body: {"task": "..."}) → 202 + job_id
+  GET  /planner/{job_id}   — poll a planner job (queued | running → 202, done | error → 200) with checkpointed steps
+  WS   /planner/{job_id}/ws — planner job progress: replayed steps, then step/synthesising → done/error events
   GET  /notes              — list all notes from MongoDB
   GET  /reminders          — list reminders from MongoDB
   GET  /openapi.json       — OpenAPI 3.0 spec (generated from skills registry)
@@ -48,6 +52,7 @@ _voice_jobs: dict[str, dict] = {}  # job_id → {status, result}
 async def handle_query(request: web.Request) -> web.Response:
     data = await request.json()
     query = data.get("query", "").strip()
+    session_id = data.get("session_id") or None
     if not query:
         return web.json_response({"error": "query is required"}, status=400)
 
@@ -55,19 +60,17 @@ async def handle_query(request: web.Request) -> web.Response:
         task = query[len("/planner"):].strip()
         if not task:
             return web.json_response({"error": "task is required. Usage: /planner <task>"}, status=400)
-        from skills.planner import run_planner
-        response = await run_planner(task)
-        return web.json_response({"response": response})
+        return await _submit_planner_job(task)
 
     from agents.intent_classifier import run_intent_classifier
-    response = await run_intent_classifier(query)
+    response = await run_intent_classifier(query, session_id=session_id)
     return web.json_response({"response": response})
 
 
 async def handle_query_ws(request: web.Request) -> web.WebSocketResponse:
     """WebSocket text query endpoint.
 
-    Client sends: {"query": "..."}
+    Client sends: {"query": "...", "session_id": "..."}   — session_id optional
     Server pushes:
       {"stage": "status",     "message": "Checking weather"}   — intent resolved
       {"stage": "text_chunk", "text":    "..."}                 — streaming token
@@ -91,6 +94,7 @@ async def handle_query_ws(request: web.Request) -> web.WebSocketResponse:
     try:
         data = json.loads(msg.data)
         query = data.get("query", "").strip()
+        session_id = data.get("session_id") or None
     except (json.JSONDecodeError, AttributeError):
         await ws.send_json({"stage": "error", "error": "invalid JSON"})
         await ws.close()
@@ -118,12 +122,12 @@ async def handle_query_ws(request: web.Request) -> web.WebSocketResponse:
                 if not task:
                     queue.put_nowait({"stage": "error", "error": "task is required"})
                     return
-                if on_status:
-                    on_status("Building your plan")
                 from skills.planner import run_planner
-                response = await run_planner(task)
+                response = await run_planner(task, on_status=on_status)
             else:
-                response = await run_intent_classifier(query, on_token=on_token, on_status=on_status)
+                response = await run_intent_classifier(
+                    query, on_token=on_token, on_status=on_status, session_id=session_id,
+                )
             queue.put_nowait({"stage": "done", "text": response})
         except Exception as e:
             logger.error(f"[api/query/ws] pipeline failed: {e}")
@@ -165,7 +169,13 @@ async def handle_query_ws(request: web.Request) -> web.WebSocketResponse:
     return ws
 
 
-def _process_voice_job(job_id: str, audio_in: str, loop: asyncio.AbstractEventLoop, voice_id: str | None = None) -> None:
+def _process_voice_job(
+    job_id: str,
+    audio_in: str,
+    loop: asyncio.AbstractEventLoop,
+    voice_id: str | None = None,
+    session_id: str | None = None,
+) -> None:
     """Blocking pipeline: ffmpeg → Whisper → intent classifier → TTS. Runs in thread pool."""
     import subprocess
     import whisper
@@ -213,7 +223,7 @@ def _process_voice_job(job_id: str, audio_in: str, loop: asyncio.AbstractEventLo
 
         # Intent classifier (async — run via the event loop from this thread)
         from agents.intent_classifier import run_intent_classifier
-        future = asyncio.run_coroutine_threadsafe(run_intent_classifier(transcript), loop)
+        future = asyncio.run_coroutine_threadsafe(run_intent_classifier(transcript, session_id=session_id), loop)
         response_text = future.result()
         _voice_jobs[job_id]["text"] = response_text
 
@@ -253,6 +263,7 @@ async def handle_voice(request: web.Request) -> web.Response:
     from agents.persona import get_active_voice_id
 
     voice_id = request.rel_url.query.get("voice_id") or get_active_voice_id() or active_voice_id
+    session_id = request.rel_url.query.get("session_id") or None
     if voice_id not in voice_ids:
         return web.json_response({"error": f"unknown voice_id '{voice_id}'. Available: {voice_ids}"}, status=400)
 
@@ -274,7 +285,7 @@ async def handle_voice(request: web.Request) -> web.Response:
     _voice_jobs[job_id] = {"status": "pending", "cancel_event": cancel_event}
 
     loop = asyncio.get_event_loop()
-    loop.run_in_executor(_voice_executor, _process_voice_job, job_id, audio_in, loop, voice_id)
+    loop.run_in_executor(_voice_executor, _process_voice_job, job_id, audio_in, loop, voice_id, session_id)
 
     return web.json_response({"job_id": job_id, "status": "pending"}, status=202)
 
@@ -286,6 +297,7 @@ def _process_voice_ws(
     cancel_event: threading.Event,
     send_event,
     on_token,
+    session_id: str | None = None,
 ) -> None:
     """ffmpeg → Whisper → LLM → TTS pipeline for the WebSocket path.
 
@@ -332,7 +344,12 @@ def _process_voice_ws(
 
         from agents.intent_classifier import run_intent_classifier
         future = asyncio.run_coroutine_threadsafe(
-            run_intent_classifier(transcript, on_token=on_token),
+            run_intent_classifier(
+                transcript,
+                on_token=on_token,
+                on_status=lambda message: send_event({"stage": "status", "message": message}),
+                session_id=session_id,
+            ),
             loop,
         )
         response_text = future.result()
@@ -366,6 +383,7 @@ async def handle_voice_ws(request: web.Request) -> web.WebSocketResponse:
     from agents.persona import get_active_voice_id
 
     voice_id = request.rel_url.query.get("voice_id") or get_active_voice_id() or active_voice_id
+    session_id = request.rel_url.query.get("session_id") or None
     ws = web.WebSocketResponse()
     await ws.prepare(request)
 
@@ -401,7 +419,9 @@ async def handle_voice_ws(request: web.Request) -> web.WebSocketResponse:
         # Called from within the event loop (inside run_intent_classifier coroutine)
         queue.put_nowait({"stage": "text_chunk", "text": token})
 
-    loop.run_in_executor(_voice_executor, _process_voice_ws, audio_in, loop, voice_id, cancel_event, send_event, on_token)
+    loop.run_in_executor(
+        _voice_executor, _process_voice_ws, audio_in, loop, voice_id, cancel_event, send_event, on_token, session_id,
+    )
 
     async def pump_events() -> None:
         while True:
@@ -470,10 +490,119 @@ async def handle_voice_result(request: web.Request) -> web.Response:
     return web.json_response(result)
 
 
+# ---------------------------------------------------------------------------
+# Planner jobs
+# ---------------------------------------------------------------------------
+
+async def _submit_planner_job(task: str) -> web.Response:
+    from skills.planner.jobs import PlannerQueueFull, submit_plan
+
+    try:
+        job = await submit_plan(task)
+    except PlannerQueueFull as e:
+        return web.json_response({"error": str(e)}, status=429)
+    return web.json_response({"job_id": str(job.id), "status": job.status}, status=202)
+
+
+def _planner_job_json(job) -> dict:
+    return {
+        "job_id": str(job.id),
+        "task": job.task,
+        "status": job.status,
+        "steps": [step.model_dump() for step in job.steps],
+        "plan": job.plan,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+
+async def handle_planner_submit(request: web.Request) -> web.Response:
+    data = await request.json()
+    task = data.get("task", "").strip()
+    if not task:
+        return web.json_response({"error": "task is required"}, status=400)
+    return await _submit_planner_job(task)
+
+
+async def handle_planner_job(request: web.Request) -> web.Response:
+    from skills.planner.jobs import get_job
+
+    job_id = request.match_info["job_id"]
+    job = await get_job(job_id)
+    if job is None:
+        return web.json_response({"error": "job not found"}, status=404)
+    status = 200 if job.status in ("done", "error") else 202
+    return web.json_response(_planner_job_json(job), status=status)
+
+
+async def handle_planner_job_ws(request: web.Request) -> web.WebSocketResponse:
+    """Push a planner job's progress events until it is done or failed.
+
+    Steps already checkpointed are replayed first, so late subscribers see the full run.
+    """
+    from skills.planner.jobs import get_job, subscribe, unsubscribe
+
+    job_id = request.match_info["job_id"]
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    subscribe(job_id, queue.put_nowait)
+    try:
+        job = await get_job(job_id)
+        if job is None:
+            await ws.send_json({"stage": "error", "error": "job not found"})
+            return ws
+
+        await ws.send_json({"stage": job.status, "job_id": job_id, "task": job.task})
+        for i, step in enumerate(job.steps, 1):
+            await ws.send_json({"stage": "step", "step": i, **step.model_dump()})
+        if job.status == "done":
+            await ws.send_json({"stage": "done", "plan": job.plan})
+            return ws
+        if job.status == "error":
+            await ws.send_json({"stage": "error", "error": job.error})
+            return ws
+
+        sent_steps = len(job.steps)
+
+        async def pump_events() -> None:
+            while True:
+                event = await queue.get()
+                if event["stage"] == "step" and event["step"] <= sent_steps:
+                    continue  # already replayed from the checkpoint
+                await ws.send_json(event)
+                if event["stage"] in ("done", "error"):
+                    return
+
+        async def watch_disconnect() -> None:
+            async for ws_msg in ws:
+                if ws_msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR, WSMsgType.CLOSED):
+                    break
+
+        # A client that disconnects mid-job ends the wait instead of leaving it parked on the queue
+        pump_task = asyncio.create_task(pump_events())
+        watch_task = asyncio.create_task(watch_disconnect())
+        _, pending = await asyncio.wait([pump_task, watch_task], return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    finally:
+        unsubscribe(job_id, queue.put_nowait)
+        if not ws.closed:
+            await ws.close()
+    return ws
+
+
 async def handle_compact_ws(request: web.Request) -> web.WebSocketResponse:
     from datetime import date
-    from db.schemas import Conversations
-    from skills.journal.compact import compact_conversations
+    from db.schemas import ConversationEntry, Conversations
+    from db.versions import CONVERSATIONS, bump_version
+    from skills.journal.compact import claim_compaction, compact_conversations
 
     date_str = request.rel_url.query.get("date")
     ws = web.WebSocketResponse()
@@ -491,21 +620,27 @@ async def handle_compact_ws(request: web.Request) -> web.WebSocketResponse:
         await ws.send_json({"status": "error", "error": f"no conversations found for {for_date}"})
         await ws.close()
         return ws
-    if not doc.exchanges:
+    if await ConversationEntry.find_one(ConversationEntry.date == for_date) is None:
         await ws.send_json({"status": "error", "error": "no exchanges to compact"})
         await ws.close()
         return ws
-    if doc.compact_status == "pending":
+    if not await claim_compaction(for_date):
         await ws.send_json({"status": "error", "error": "compact already in progress"})
         await ws.close()
         return ws
 
-    doc.compact_status = "pending"
-    await doc.save()
+    await bump_version(CONVERSATIONS)
     await ws.send_json({"status": "pending", "date": for_date.isoformat()})
 
     try:
         summary = await compact_conversations(for_date)
+        if for_date == date.today():
+            # Today's exchanges are now in the summary — start the caller's session afresh.
+            # Past days (and /backfill) leave live sessions alone.
+            from skills.conversation.session import use_session
+            from skills.conversation.skill import reset_session
+            async with use_session(request.rel_url.query.get("session_id")):
+                reset_session()
         if not ws.closed:
             await ws.send_json({"status": "complete", "date": for_date.isoformat(), "compacted": summary})
         from skills.journal.journal_writer import write_journal_entry
@@ -520,19 +655,82 @@ async def handle_compact_ws(request: web.Request) -> web.WebSocketResponse:
     return ws
 
 
+async def handle_backfill_ws(request: web.Request) -> web.WebSocketResponse:
+    """Compact, journal and index every day that is behind, streaming progress.
 
-async def handle_conversations(request: web.Request) -> web.Response:
-    from db.schemas import Conversations
+    Query: since / until (YYYY-MM-DD, optional), full=true to rewrite existing journal entries.
+    """
+    from dataclasses import asdict
+    from datetime import date
+    from skills.journal.backfill import run_backfill
 
-    docs = await Conversations.find().sort(-Conversations.date).to_list()
-    return web.json_response({
-        "dates": [doc.date.isoformat() for doc in docs]
-    })
+    query = request.rel_url.query
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+
+    try:
+        since = date.fromisoformat(query["since"]) if query.get("since") else None
+        until = date.fromisoformat(query["until"]) if query.get("until") else None
+    except ValueError:
+        await ws.send_json({"status": "error", "error": "invalid date format, use YYYY-MM-DD"})
+        await ws.close()
+        return ws
 
+    async def progress(event: dict) -> None:
+        # The backfill carries on if the client goes away
+        if not ws.closed:
+            await ws.send_json(event)
 
-async def handle_conversation_detail(request: web.Request) -> web.Response:
-    from datetime import date
+    try:
+        report = await run_backfill(since, until, query.get("full", "false").lower() == "true", progress)
+        if not ws.closed:
+            await ws.send_json({"status": "complete", **asdict(report)})
+    except Exception as e:
+        if not ws.closed:
+            await ws.send_json({"status": "error", "error": str(e)})
+    finally:
+        if not ws.closed:
+            await ws.close()
+
+    return ws
+
+
+async def handle_conversations(request: web.Request) -> web.StreamResponse:
+    from api.conditional import conditional_json
+    from api.pagination import fetch_page, page_params
     from db.schemas import Conversations
+    from db.versions import CONVERSATIONS
+
+    async def render():
+        try:
+            after, limit = page_params(request.rel_url.query, default_limit=100)
+            docs, next_cursor = await fetch_page(
+                Conversations, "date", {"exchange_count": 1, "compact_status": 1}, limit, after,
+            )
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        return {
+            "dates": [doc["date"].date().isoformat() for doc in docs],
+            "days": [
+                {
+                    "date": doc["date"].date().isoformat(),
+                    "exchange_count": doc.get("exchange_count", 0),
+                    "compact_status": doc.get("compact_status", "idle"),
+                }
+                for doc in docs
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    return await conditional_json(request, (CONVERSATIONS,), render)
+
+
+async def handle_conversation_detail(request: web.Request) -> web.StreamResponse:
+    from datetime import date
+    from api.conditional import conditional_json
+    from db.versions import CONVERSATIONS
+    from skills.journal.conversation_log import get_exchanges
 
     date_str = request.match_info["date"]
     try:
@@ -540,102 +738,191 @@ async def handle_conversation_detail(request: web.Request) -> web.Response:
     except ValueError:
         return web.json_response({"error": "invalid date format, use YYYY-MM-DD"}, status=400)
 
-    doc = await Conversations.find_one(Conversations.date == for_date)
-    if doc is None:
-        return web.json_response({
+    async def render():
+        exchanges = await get_exchanges(for_date)
+        return {
             "date": for_date.isoformat(),
-            "exchanges": [],
-        })
+            "exchanges": [
+                {
+                    "timestamp": ex.timestamp.isoformat(),
+                    "question": ex.question,
+                    "answer": ex.answer,
+                }
+                for ex in exchanges
+            ],
+        }
 
-    exchanges = sorted(doc.exchanges, key=lambda ex: ex.timestamp)
-    return web.json_response({
-        "date": for_date.isoformat(),
-        "exchanges": [
-            {
-                "timestamp": ex.timestamp.isoformat(),
-                "question": ex.question,
-                "answer": ex.answer,
-            }
-            for ex in exchanges
-        ],
-    })
+    return await conditional_json(request, (CONVERSATIONS,), render)
 
 
-async def handle_journal_list(request: web.Request) -> web.Response:
+async def handle_journal_list(request: web.Request) -> web.StreamResponse:
     from datetime import date
+    from api.conditional import conditional_json
+    from api.pagination import fetch_page, page_params
     from db.schemas import Journal
+    from db.versions import JOURNAL
+
+    async def render():
+        date_str = request.rel_url.query.get("date")
+        if date_str:
+            try:
+                for_date = date.fromisoformat(date_str)
+            except ValueError:
+                return web.json_response({"error": "invalid date format, use YYYY-MM-DD"}, status=400)
+            entry = await Journal.find_one(Journal.datestamp == for_date)
+            entries = [{"datestamp": entry.datestamp.isoformat(), "summary": entry.summary}] if entry else []
+            return {"entries": entries, "next_cursor": None}
 
-    date_str = request.rel_url.query.get("date")
-    if date_str:
         try:
-            for_date = date.fromisoformat(date_str)
-        except ValueError:
-            return web.json_response({"error": "invalid date format, use YYYY-MM-DD"}, status=400)
-        entry = await Journal.find_one(Journal.datestamp == for_date)
-        entries = [entry] if entry else []
-    else:
-        limit = int(request.rel_url.query.get("limit", "10"))
-        entries = await Journal.find().sort(-Journal.datestamp).limit(limit).to_list()
+            after, limit = page_params(request.rel_url.query, default_limit=10)
+            docs, next_cursor = await fetch_page(Journal, "datestamp", {"summary": 1}, limit, after)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
 
-    return web.json_response({
-        "entries": [
-            {"datestamp": e.datestamp.isoformat(), "summary": e.summary}
-            for e in entries
-        ]
-    })
+        return {
+            "entries": [
+                {"datestamp": d["datestamp"].date().isoformat(), "summary": d["summary"]}
+                for d in docs
+            ],
+            "next_cursor": next_cursor,
+        }
 
+    return await conditional_json(request, (JOURNAL,), render)
 
-async def handle_plans(request: web.Request) -> web.Response:
-    from db.schemas import Plans
-    plans = await Plans.find().sort(-Plans.created_at).to_list()
-    return web.json_response({
-        "plans": [
-            {
-                "id": str(p.id),
-                "ask": p.ask,
-                "plan": p.plan,
-                "created_at": p.created_at.isoformat(),
-            }
-            for p in plans
-        ]
-    })
 
+async def handle_plans(request: web.Request) -> web.StreamResponse:
+    from api.conditional import conditional_json
+    from api.pagination import fetch_page, page_params, preview, wants_full
+    from db.schemas import Plans
+    from db.versions import PLANS
 
-async def handle_notes(request: web.Request) -> web.Response:
+    async def render():
+        full = wants_full(request.rel_url.query)
+        projection = {"ask": 1, "plan": 1} if full else {"ask": 1, "preview": preview("plan")}
+        try:
+            after, limit = page_params(request.rel_url.query)
+            docs, next_cursor = await fetch_page(Plans, "created_at", projection, limit, after)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        return {
+            "plans": [
+                {
+                    "id": str(d["_id"]),
+                    "ask": d["ask"],
+                    **({"plan": d["plan"]} if full else {"preview": d["preview"]}),
+                    "created_at": d["created_at"].isoformat(),
+                }
+                for d in docs
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    return await conditional_json(request, (PLANS,), render)
+
+
+async def handle_notes(request: web.Request) -> web.StreamResponse:
+    from api.conditional import conditional_json
+    from api.pagination import fetch_page, page_params, preview, wants_full
     from db.schemas import Note
-    notes = await Note.find().sort(-Note.created_at).to_list()
-    return web.json_response({
-        "notes": [
-            {
-                "id": str(n.id),
-                "title": n.title,
-                "content": n.content,
-                "category": n.category,
-                "created_at": n.created_at.isoformat(),
-            }
-            for n in notes
-        ]
-    })
-
+    from db.versions import NOTES
 
-async def handle_reminders(request: web.Request) -> web.Response:
+    async def render():
+        full = wants_full(request.rel_url.query)
+        projection = {"title": 1, "category": 1}
+        projection.update({"content": 1} if full else {"preview": preview("content")})
+        try:
+            after, limit = page_params(request.rel_url.query)
+            docs, next_cursor = await fetch_page(Note, "created_at", projection, limit, after)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        return {
+            "notes": [
+                {
+                    "id": str(d["_id"]),
+                    "title": d["title"],
+                    **({"content": d["content"]} if full else {"preview": d["preview"]}),
+                    "category": d.get("category"),
+                    "created_at": d["created_at"].isoformat(),
+                }
+                for d in docs
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    return await conditional_json(request, (NOTES,), render)
+
+
+async def handle_notes_search(request: web.Request) -> web.StreamResponse:
+    from api.conditional import conditional_json
+    from db.versions import NOTES
+    from skills.notes.search import search_notes
+
+    q = request.rel_url.query.get("q", "").strip()
+    if not q:
+        return web.json_response({"error": "q is required"}, status=400)
+    try:
+        limit = int(request.rel_url.query.get("limit", "10"))
+    except ValueError:
+        return web.json_response({"error": "limit must be an integer"}, status=400)
+    if not 1 <= limit <= 50:
+        return web.json_response({"error": "limit must be between 1 and 50"}, status=400)
+
+    async def render():
+        hits = await search_notes(q, limit=limit)
+        return {
+            "results": [
+                {
+                    "id": h.id,
+                    "title": h.title,
+                    "category": h.category,
+                    "created_at": h.created_at.isoformat(),
+                    "score": h.score,
+                }
+                for h in hits
+            ]
+        }
+
+    return await conditional_json(request, (NOTES,), render)
+
+
+async def handle_reminders(request: web.Request) -> web.StreamResponse:
+    from api.conditional import conditional_json
+    from api.pagination import fetch_page, page_params
     from db.schemas import Reminders
-    include_completed = request.rel_url.query.get("include_completed", "false").lower() == "true"
+    from db.versions import REMINDERS
 
-    query = Reminders.find() if include_completed else Reminders.find(Reminders.is_completed == False)
-    reminders = await query.sort(Reminders.reminder_datetime).to_list()
+    async def render():
+        include_completed = request.rel_url.query.get("include_completed", "false").lower() == "true"
+        try:
+            after, limit = page_params(request.rel_url.query)
+            docs, next_cursor = await fetch_page(
+                Reminders,
+                "reminder_datetime",
+                {"description": 1, "is_completed": 1},
+                limit,
+                after,
+                descending=False,
+                filter=None if include_completed else {"is_completed": False},
+            )
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
 
-    return web.json_response({
-        "reminders": [
-            {
-                "id": str(r.id),
-                "description": r.description,
-                "reminder_datetime": r.reminder_datetime.isoformat(),
-                "is_completed": r.is_completed,
-            }
-            for r in reminders
-        ]
-    })
+        return {
+            "reminders": [
+                {
+                    "id": str(d["_id"]),
+                    "description": d["description"],
+                    "reminder_datetime": d["reminder_datetime"].isoformat(),
+                    "is_completed": d.get("is_completed", False),
+                }
+                for d in docs
+            ],
+            "next_cursor": next_cursor,
+        }
+
+    return await conditional_json(request, (REMINDERS,), render)
 
 
 async def handle_tts_voices(request: web.Request) -> web.Response:
@@ -723,7 +1010,8 @@ async def handle_docs(request: web.Request) -> web.Response:
 _CORS_HEADERS = {
     "Access-Control-Allow-Origin": "*",
     "Access-Control-Allow-Methods": "GET, POST, DELETE, OPTIONS",
-    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization, If-None-Match",
+    "Access-Control-Expose-Headers": "ETag",
 }
 
 
@@ -758,11 +1046,16 @@ def create_app() -> web.Application:
     app.router.add_get("/voice/{job_id}", handle_voice_result)
     app.router.add_delete("/voice/{job_id}", handle_voice_cancel)
     app.router.add_get("/compact", handle_compact_ws)
+    app.router.add_get("/backfill/ws", handle_backfill_ws)
     app.router.add_get("/conversations", handle_conversations)
     app.router.add_get("/conversation/{date}", handle_conversation_detail)
     app.router.add_get("/journal", handle_journal_list)
     app.router.add_get("/plans", handle_plans)
+    app.router.add_post("/planner", handle_planner_submit)
+    app.router.add_get("/planner/{job_id}", handle_planner_job)
+    app.router.add_get("/planner/{job_id}/ws", handle_planner_job_ws)
     app.router.add_get("/notes", handle_notes)
+    app.router.add_get("/notes/search", handle_notes_search)
     app.router.add_get("/reminders", handle_reminders)
     app.router.add_get("/openapi.json", handle_openapi)
     app.router.add_get("/docs", handle_docs)
@@ -784,11 +1077,18 @@ if __name__ == "__main__":
 
     async def _main() -> None:
         from db.init import db_init
+        from skills.journal.conversation_log import flush_conversation_log, start_conversation_log
+        from skills.journal.memory_backlog import start_memory_backlog
+        from skills.planner.jobs import start_planner_jobs
         await db_init()
+        await start_planner_jobs()
+        await start_memory_backlog()
+        await start_conversation_log()
         runner = await start_api_server()
         try:
             await asyncio.Event().wait()
         finally:
             await runner.cleanup()
+            await flush_conversation_log()
 
     asyncio.run(_main())
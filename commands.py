@@ -12,7 +12,7 @@ Available commands:
 from utils.log import logger
 
 from agents.persona import get_active_identity
-from skills.conversation.skill import _history
+from skills.conversation.session import current_session
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -20,13 +20,13 @@ from skills.conversation.skill import _history
 
 def _format_history() -> str:
     """Return the current session history as a plain-text string."""
-    messages = list(_history)
-    if not messages:
+    turns = list(current_session().history)
+    if not turns:
         return ""
     lines = []
-    for msg in messages:
-        role = "User" if msg.__class__.__name__ == "HumanMessage" else "Assistant"
-        lines.append(f"{role}: {msg.content}")
+    for turn in turns:
+        role = "User" if turn.role == "user" else "Assistant"
+        lines.append(f"{role}: {turn.content}")
     return "\n".join(lines)
 
 
@@ -35,7 +35,7 @@ def _format_history() -> str:
 # ---------------------------------------------------------------------------
 
 async def cmd_save() -> None:
-    if not _history:
+    if not current_session().history:
         print("[/save] Nothing to save — conversation history is empty.")
         return
 
@@ -59,7 +59,7 @@ async def cmd_save() -> None:
 
 
 async def cmd_clear() -> None:
-    _history.clear()
+    current_session().history.clear()
     print("[/clear] Conversation history cleared.")
 
 
@@ -80,27 +80,31 @@ async def cmd_planner(args: str) -> None:
         return
 
     print(f"[/planner] Running agent on: {task}\n")
-    response = await run_planner(task)
+    response = await run_planner(task, on_status=lambda message: print(f"[/planner] {message}"))
     print(response)
 
 
 async def cmd_analyze() -> None:
     from skills.personalizer.skill import analyze_persona_from_log, get_persona_context
-    from db.schemas import Conversations
     from datetime import date
+    from skills.journal.conversation_log import flush_conversation_log, get_exchanges
 
-    today = date.today()
-    doc = await Conversations.find_one(Conversations.date == today)
-    if not doc or not doc.exchanges:
+    await flush_conversation_log()
+    exchanges = await get_exchanges(date.today())
+    if not exchanges:
         print("[/analyze] No conversations from today to analyse.")
         return
 
-    await analyze_persona_from_log(doc.exchanges)
+    try:
+        await analyze_persona_from_log(exchanges)
+    except Exception as e:
+        print(f"[/analyze] Failed: {e}")
+        return
     context = get_persona_context()
     if context:
-        print(f"[/analyze] Done ({len(doc.exchanges)} exchange(s) scanned).\n{context}")
+        print(f"[/analyze] Done ({len(exchanges)} exchange(s) scanned).\n{context}")
     else:
-        print(f"[/analyze] Done ({len(doc.exchanges)} exchange(s) scanned). No new personal facts found.")
+        print(f"[/analyze] Done ({len(exchanges)} exchange(s) scanned). No new personal facts found.")
 
 
 async def cmd_ctx() -> None:
@@ -122,7 +126,16 @@ async def cmd_ctx() -> None:
     bar = "█" * filled + "░" * (bar_width - filled)
 
     print(f"\n[/ctx] Context usage: {used:,} / {n_ctx:,} tokens ({pct:.1f}%)")
-    print(f"       [{bar}]\n")
+    print(f"       [{bar}]")
+
+    from utils.kv_cache import get_kv_stats
+    stats = get_kv_stats(current_session().id)
+    if stats:
+        print(
+            f"       Last turn: {stats.evaluated:,} prompt tokens evaluated, "
+            f"{stats.reused:,} reused from cache ({stats.mode})"
+        )
+    print()
 
 
 async def cmd_note(args: str) -> None:
@@ -191,11 +204,13 @@ async def cmd_memories(args: str) -> None:
       /memories <query>   — semantic search for relevant memories
     """
     try:
+        from skills.conversation.session import current_session
         from utils.memory_client import _get_memory, search_memories
 
+        user_id = current_session().user_id
         query = args.strip()
         if query:
-            results = search_memories(query, limit=10)
+            results = search_memories(query, user_id, limit=10, token_budget=None)
             if not results:
                 print(f"[/memories] No memories found for '{query}'.")
                 return
@@ -204,7 +219,7 @@ async def cmd_memories(args: str) -> None:
                 print(f"  {i}. {text}")
         else:
             mem = _get_memory()
-            raw = mem.get_all(filters={"user_id": "default"}, top_k=1000)
+            raw = mem.get_all(filters={"user_id": user_id}, top_k=1000)
             results = raw.get("results", raw) if isinstance(raw, dict) else raw
             if not results:
                 print("[/memories] No memories stored yet.")
@@ -225,7 +240,7 @@ async def cmd_pluck_memory(args: str) -> None:
       /pluck-memory 13   — delete memory #13 from /memories output
     """
     try:
-        from utils.memory_client import _get_memory
+        from utils.memory_client import _get_memory, invalidate_memory_cache
 
         arg = args.strip()
         if not arg.isdigit():
@@ -258,13 +273,14 @@ async def cmd_pluck_memory(args: str) -> None:
             return
 
         mem.delete(memory_id)
+        invalidate_memory_cache()
         print(f"[/pluck-memory] Deleted #{index}: {text}")
     except Exception as e:
         print(f"[/pluck-memory] Failed: {e}")
 
 
 async def cmd_compact_memory() -> None:
-    """Deduplicate and merge mem0 memories using the LLM, then replace the store."""
+    """Cluster near-duplicate mem0 memories and merge each cluster using the LLM."""
     from rich.console import Console
     from rich.spinner import Spinner
 
@@ -284,33 +300,37 @@ async def cmd_compact_memory() -> None:
         print(f"[/compact-memory] Failed: {e}")
 
 
+async def cmd_memory_backlog() -> None:
+    """Show the batched mem0 extraction backlog and throughput."""
+    from skills.journal.memory_backlog import BATCH_TURNS, get_backlog_stats
+
+    stats = await get_backlog_stats()
+    oldest = stats["oldest_age_seconds"]
+    print(
+        f"[/memory-backlog] {stats['pending']} exchanges waiting"
+        + (f" (oldest {oldest / 60:.0f} min)" if oldest is not None else "")
+        + f", batches of {BATCH_TURNS}\n"
+        f"  queued {stats['queued']}, skipped (no personal signal) {stats['skipped']}, "
+        f"extracted {stats['processed']} in {stats['batches']} batches, {stats['failures']} failures"
+    )
+    if stats["dead"]:
+        print(f"  {stats['dead']} exchanges dead-lettered after repeated failures (see MemoryBacklog.last_error)")
+    if stats["last_batch_at"]:
+        print(f"  last batch at {stats['last_batch_at']} took {stats['last_batch_seconds']}s")
+
+
 async def cmd_flush_memory() -> None:
     """Delete all mem0 memories with a progress indicator."""
-    import os
     from rich.progress import Progress, BarColumn, TaskProgressColumn, TextColumn
 
     try:
-        from qdrant_client import QdrantClient
+        from utils.memory_client import COLLECTION
+        from utils.vector_store import get_vector_store
 
-        host = os.environ.get("QDRANT_HOST", "localhost")
-        port = int(os.environ.get("QDRANT_PORT", "6333"))
-        client = QdrantClient(host=host, port=port)
+        store = get_vector_store()
 
         # Collect all point IDs first so we know the total
-        all_ids = []
-        offset = None
-        while True:
-            result, next_offset = client.scroll(
-                "langbox_memories",
-                limit=100,
-                offset=offset,
-                with_payload=False,
-                with_vectors=False,
-            )
-            all_ids.extend(p.id for p in result)
-            if next_offset is None:
-                break
-            offset = next_offset
+        all_ids = [p.id for p in store.scroll(COLLECTION)]
 
         if not all_ids:
             print("[/flush-memory] Nothing to delete.")
@@ -327,20 +347,103 @@ async def cmd_flush_memory() -> None:
             batch_size = 50
             for i in range(0, len(all_ids), batch_size):
                 batch = all_ids[i : i + batch_size]
-                client.delete(
-                    "langbox_memories",
-                    points_selector=batch,
-                )
+                store.delete(COLLECTION, batch)
                 progress.advance(task, len(batch))
 
         # Reset mem0 singleton so next call reconnects to the now-empty collection
         import utils.memory_client as _mc
         _mc._memory = None
+        _mc.invalidate_memory_cache()
         print(f"[/flush-memory] {len(all_ids)} memories deleted.")
     except Exception as e:
         print(f"[/flush-memory] Failed: {e}")
 
 
+async def cmd_reindex_journal(args: str) -> None:
+    """Embed new or changed journal entries into the vector index, then verify it."""
+    from rich.console import Console
+
+    full = args.strip() == "--full"
+    console = Console()
+    try:
+        from utils.journal_index import reindex_journal
+
+        with console.status("[bold cyan]Reindexing journal…[/bold cyan]", spinner="dots") as status:
+            report = await reindex_journal(
+                full=full,
+                on_progress=lambda r: status.update(
+                    f"[bold cyan]Reindexing journal… {r.scanned} scanned, {r.embedded} embedded[/bold cyan]"
+                ),
+            )
+
+        if report.resumed_from:
+            print(f"[/reindex-journal] Resumed after {report.resumed_from}.")
+        print(
+            f"[/reindex-journal] Done in {report.seconds}s. {report.scanned} scanned, "
+            f"{report.embedded} embedded, {report.unchanged} unchanged, {report.deleted} orphans removed."
+        )
+        if not report.verified:
+            print(f"[/reindex-journal] {len(report.mismatched)} entries still differ from the index: "
+                  + ", ".join(report.mismatched[:10]))
+    except Exception as e:
+        print(f"[/reindex-journal] Failed: {e}")
+
+
+async def cmd_backfill(args: str) -> None:
+    """Compact, journal and index every day whose summary or journal entry is behind."""
+    from datetime import date
+    from rich.console import Console
+
+    parts = args.split()
+    full = "--full" in parts
+    try:
+        since = date.fromisoformat(parts[parts.index("--since") + 1]) if "--since" in parts else None
+    except (IndexError, ValueError):
+        print("[/backfill] Usage: /backfill [--since YYYY-MM-DD] [--full]")
+        return
+
+    console = Console()
+    try:
+        from skills.journal.backfill import run_backfill
+
+        with console.status("[bold cyan]Backfilling…[/bold cyan]", spinner="dots") as status:
+            report = await run_backfill(
+                since=since,
+                full=full,
+                on_progress=lambda e: status.update(
+                    f"[bold cyan]Backfilling… {e['done']}/{e['total']} days — {e['date']} {e['step']}[/bold cyan]"
+                ),
+            )
+
+        print(
+            f"[/backfill] Done in {report.seconds}s. {report.days} days, "
+            f"{report.compacted} compacted, {report.journaled} journal entries written."
+        )
+        if report.skipped:
+            print(f"[/backfill] Skipped (compaction already in progress): {', '.join(report.skipped)}")
+        for day, error in report.failed.items():
+            print(f"[/backfill] {day} failed: {error}")
+    except Exception as e:
+        print(f"[/backfill] Failed: {e}")
+
+
+async def cmd_export_archive(args: str) -> None:
+    """Write changed days of the conversation log to the Parquet archive."""
+    full = args.strip() == "--full"
+    try:
+        from skills.journal.archive import ARCHIVE_DIR, export_archive
+        from skills.journal.conversation_log import flush_conversation_log
+
+        await flush_conversation_log()
+        report = await export_archive(full=full)
+        print(
+            f"[/export-archive] Done in {report.seconds}s. {len(report.exported)} day(s) written "
+            f"({report.rows} exchanges), {report.unchanged} unchanged → {ARCHIVE_DIR}"
+        )
+    except Exception as e:
+        print(f"[/export-archive] Failed: {e}")
+
+
 async def cmd_help() -> None:
     print(
         "\nAvailable commands:\n"
@@ -352,6 +455,10 @@ async def cmd_help() -> None:
         "  /compact-memory    — deduplicate and merge memories using the LLM\n"
         "  /pluck-memory <n>  — delete memory #n from the /memories list\n"
         "  /flush-memory      — delete all mem0 memories\n"
+        "  /memory-backlog    — show exchanges waiting for memory extraction\n"
+        "  /reindex-journal [--full] — embed new or changed journal entries\n"
+        "  /backfill [--since YYYY-MM-DD] [--full] — compact and journal every day that is behind\n"
+        "  /export-archive [--full] — write the conversation log to Parquet for analysis\n"
         "  /ctx               — show context window usage for the current session\n"
         "  /note [title]      — save a note from the current conversation context\n"
         "  /planner <task>    — run an autonomous multi-step planning agent\n"
@@ -368,6 +475,10 @@ _COMMANDS = {
     "/compact-memory": cmd_compact_memory,
     "/pluck-memory": cmd_pluck_memory,
     "/flush-memory": cmd_flush_memory,
+    "/memory-backlog": cmd_memory_backlog,
+    "/reindex-journal": cmd_reindex_journal,
+    "/backfill": cmd_backfill,
+    "/export-archive": cmd_export_archive,
     "/ctx": cmd_ctx,
     "/note": cmd_note,
     "/planner": cmd_planner,
@@ -1,36 +1,92 @@
 import asyncio
+import logging
 import os
 
 from beanie import init_beanie
 from utils.log import logger
 from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
 
 from db.schemas import (
+  ChangeVersion,
+  ConversationEntry,
+  ConversationSession,
   Conversations,
   Credentials,
   HueConfiguration,
   Journal,
+  JournalIndexState,
   Newsfeed,
   Note,
+  PendingMemory,
+  PlannerJob,
   Plans,
   Reminders,
   ServiceCredentials,
+  ToolMemo,
   UserPersona,
   Weather,
 )
 
-collections = [Conversations, Credentials, HueConfiguration, Journal, Newsfeed, Note, Plans, Reminders, ServiceCredentials, UserPersona, Weather]
+collections = [ChangeVersion, ConversationEntry, ConversationSession, Conversations, Credentials, HueConfiguration, Journal, JournalIndexState, Newsfeed, Note, PendingMemory, PlannerJob, Plans, Reminders, ServiceCredentials, ToolMemo, UserPersona, Weather]
+
+
+def _collection_name(model) -> str:
+  settings = getattr(model, "Settings", None)
+  return getattr(settings, "name", None) or model.__name__
+
+
+async def _index_names(database) -> dict[str, set[str]]:
+  existing = set(await database.list_collection_names())
+  names = {}
+  for model in collections:
+    name = _collection_name(model)
+    names[name] = set(await database[name].index_information()) if name in existing else set()
+  return names
+
+
+def mongo_client(**kwargs) -> AsyncMongoClient:
+  return AsyncMongoClient(
+    f"""mongodb://{os.environ["MONGODB_USER"]}:{os.environ["MONGODB_PASSWORD"]}@{os.environ["MONGODB_HOST"]}:{os.environ["MONGODB_PORT"]}""",
+    timeoutMS=5000,
+    **kwargs,
+  )
 
 
 async def db_init() -> str | None:
   try:
-    client = AsyncMongoClient(
-      f"""mongodb://{os.environ["MONGODB_USER"]}:{os.environ["MONGODB_PASSWORD"]}@{os.environ["MONGODB_HOST"]}:{os.environ["MONGODB_PORT"]}""",
-      timeoutMS=5000,
-    )
+    listeners = []
+    if logger.isEnabledFor(logging.DEBUG):
+      from db.query_check import QueryShapeListener
+      listeners.append(QueryShapeListener())
+
+    client = mongo_client(event_listeners=listeners)
+    for listener in listeners:
+      listener.bind(client.langbox)
 
+    # Beanie creates the indexes declared in each document's Settings; diff to report what is new
+    before = await _index_names(client.langbox)
     await init_beanie(database=client.langbox, document_models=collections)
-    return f"Initiated MongoDB with: {[col.__name__ for col in collections]}"
+    after = await _index_names(client.langbox)
+    built = [f"{name}.{index}" for name in after for index in sorted(after[name] - before[name])]
+    for index in built:
+      logger.info(f"[db] Built index {index}")
+
+    legacy = await Conversations.find({"exchanges.0": {"$exists": True}}).count()
+    if legacy:
+      logger.warning(
+        f"[db] {legacy} day(s) still hold embedded exchanges — run scripts/migrate_conversations.py"
+      )
+    report = f"Initiated MongoDB with: {[col.__name__ for col in collections]}"
+    if built:
+      report += f" — built {len(built)} index(es)"
+    return report
+  except OperationFailure as error:
+    logger.error(error)
+    # 11000: duplicates under a new unique index; 85/86: an older index on the same keys
+    if error.code in (11000, 85, 86):
+      logger.error("[db] A unique index could not be built — run scripts/migrate_conversations.py to dedupe first")
+    exit("Mongo DB failed to start")
   except Exception as error:
     logger.error(error)
     exit("Mongo DB failed to start")
@@ -0,0 +1,88 @@
+"""Debug-mode check for queries that scan a whole collection.
+
+Registered on the Mongo client by db_init when debug logging is on. Every
+distinct query shape — collection, filter fields and sort fields, values
+ignored — is explained once in the background. A plan that falls back to a
+collection scan is logged as a warning naming the shape, so a missing entry in
+a document's Settings.indexes shows up while developing rather than years of
+data later. Queries slower than SLOW_QUERY_MS are logged too.
+"""
+
+import asyncio
+import os
+
+from pymongo import monitoring
+
+from utils.log import logger
+
+SLOW_QUERY_MS = int(os.environ.get("SLOW_QUERY_MS", 100))
+
+_CHECKED = {"find", "count", "distinct"}
+
+
+def _shape(command_name: str, command: dict) -> tuple | None:
+  """(collection, filter fields, sort fields) — or None for unfiltered, unsorted reads, which scan by design."""
+  filter_ = command.get("filter") if command_name == "find" else command.get("query")
+  filter_ = filter_ or {}
+  sort = command.get("sort") or {}
+  if not filter_ and not sort:
+    return None
+  return (command[command_name], tuple(sorted(filter_)), tuple(sort))
+
+
+def _has_collscan(plan: dict) -> bool:
+  if plan.get("stage") == "COLLSCAN":
+    return True
+  children = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+  return any(_has_collscan(child) for child in children)
+
+
+class QueryShapeListener(monitoring.CommandListener):
+  """Flags unindexed query shapes and slow queries (see module docstring)."""
+
+  def __init__(self):
+    self._database = None
+    self._started: dict[int, tuple[str, dict]] = {}
+    self._seen: set[tuple] = set()
+
+  def bind(self, database) -> None:
+    """The database explains run against; set once the client exists."""
+    self._database = database
+
+  def started(self, event: monitoring.CommandStartedEvent) -> None:
+    if event.command_name in _CHECKED:
+      self._started[event.request_id] = (event.command_name, event.command)
+
+  def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+    entry = self._started.pop(event.request_id, None)
+    if entry is None:
+      return
+    command_name, command = entry
+    shape = _shape(command_name, command)
+    elapsed_ms = event.duration_micros / 1000
+    if elapsed_ms > SLOW_QUERY_MS:
+      logger.warning(f"[db] slow {command_name} on {command[command_name]}: {elapsed_ms:.0f} ms {shape}")
+    if shape is None or shape in self._seen or self._database is None:
+      return
+    self._seen.add(shape)
+    try:
+      asyncio.get_running_loop().create_task(self._explain(command_name, command, shape))
+    except RuntimeError:
+      pass  # no event loop (sync client use) — skip the check
+
+  def failed(self, event: monitoring.CommandFailedEvent) -> None:
+    self._started.pop(event.request_id, None)
+
+  async def _explain(self, command_name: str, command: dict, shape: tuple) -> None:
+    query = {key: value for key, value in command.items() if key in (command_name, "filter", "query", "sort", "key")}
+    try:
+      result = await self._database.command({"explain": query, "verbosity": "queryPlanner"})
+    except Exception as e:
+      logger.debug(f"[db] could not explain {shape}: {e}")
+      return
+    plan = result.get("queryPlanner", {}).get("winningPlan", {})
+    if _has_collscan(plan.get("queryPlan", plan)):  # newer servers nest the plan under queryPlan
+      collection, fields, sort = shape
+      logger.warning(
+        f"[db] unindexed query on {collection}: filter {list(fields)} sort {list(sort)} — add it to Settings.indexes"
+      )
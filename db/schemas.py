@@ -1,11 +1,17 @@
 from datetime import date, datetime
 from typing import Literal, Optional
 
+import pymongo
 from beanie import Document
 from pydantic import BaseModel
+from pymongo import IndexModel
 
 NoteCategory = Literal["read", "listen", "watch", "eat", "visit"]
 
+# Daily caches (Weather, Newsfeed) are purged by a Mongo TTL index this long after their datestamp.
+# Changing it needs the existing TTL index dropped first — Mongo will not alter it in place.
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
 
 class HueLight(BaseModel):
   id: int
@@ -28,6 +34,12 @@ class Weather(Document):
   current_temperature: int
   forecast: list[str]
 
+  class Settings:
+    indexes = [
+      IndexModel([("datestamp", pymongo.ASCENDING), ("location", pymongo.ASCENDING)]),
+      IndexModel([("datestamp", pymongo.ASCENDING)], expireAfterSeconds=CACHE_TTL_SECONDS),
+    ]
+
 
 class Credentials(Document):
   hueUsername: str
@@ -38,6 +50,9 @@ class ServiceCredentials(Document):
   service: str
   data: dict  # flexible payload — tokens, usernames, expiry timestamps, etc.
 
+  class Settings:
+    indexes = [IndexModel([("service", pymongo.ASCENDING)])]
+
 
 class HueConfiguration(Document):
   groups: list[HueLightGroup]
@@ -49,6 +64,9 @@ class Newsfeed(Document):
   datestamp: date
   content: str  # Large text field for storing full RSS feed content
 
+  class Settings:
+    indexes = [IndexModel([("datestamp", pymongo.ASCENDING)], expireAfterSeconds=CACHE_TTL_SECONDS)]
+
 
 class Reminders(Document):
   reminder_datetime: datetime  # Main datetime for the reminder
@@ -57,12 +75,90 @@ class Reminders(Document):
   created_at: date
   is_completed: bool = False
 
+  class Settings:
+    # Equality on is_completed first, then the reminder_datetime range and sort
+    indexes = [
+      IndexModel([
+        ("is_completed", pymongo.ASCENDING), ("reminder_datetime", pymongo.ASCENDING), ("_id", pymongo.ASCENDING),
+      ]),
+      # listings that include completed ones; _id is the keyset pagination tie-breaker
+      IndexModel([("reminder_datetime", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]),
+    ]
+
 
 class Plans(Document):
   created_at: datetime
   ask: str
   plan: str
 
+  class Settings:
+    indexes = [IndexModel([("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)])]
+
+
+class PlannerStep(BaseModel):
+  tool: str
+  query: str
+  result: str
+
+
+class PlannerJob(Document):
+  """A queued planner run. Steps are checkpointed as they complete so the job resumes after a restart."""
+  task: str
+  status: Literal["queued", "running", "done", "error"] = "queued"
+  steps: list[PlannerStep] = []
+  plan: Optional[str] = None
+  error: Optional[str] = None
+  created_at: datetime
+  updated_at: datetime
+
+  class Settings:
+    name = "PlannerJobs"
+    indexes = [IndexModel([("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)])]
+
+
+class ChangeVersion(Document):
+  """Monotonic change counter of an API resource (see db/versions.py)."""
+  resource: str
+  version: int = 0
+
+  class Settings:
+    name = "ChangeVersions"
+    indexes = [IndexModel([("resource", pymongo.ASCENDING)], unique=True)]
+
+
+class ToolMemo(Document):
+  """Memoised tool result for planner/ReAct research, keyed by tool + normalised query."""
+  tool: str
+  query_key: str
+  result: str
+  created_at: datetime
+  expires_at: datetime
+
+  class Settings:
+    name = "ToolMemos"
+    indexes = [
+      IndexModel([("tool", pymongo.ASCENDING), ("query_key", pymongo.ASCENDING)], unique=True),
+      IndexModel([("expires_at", pymongo.ASCENDING)], expireAfterSeconds=0),  # Mongo TTL purge
+    ]
+
+
+class PendingMemory(Document):
+  """An exchange waiting for batched mem0 fact extraction."""
+  user_id: str
+  question: str
+  answer: str
+  created_at: datetime
+  attempts: int = 0  # failed extractions; at MEMORY_MAX_ATTEMPTS the row is dead-lettered (kept, never retried)
+  retry_at: Optional[datetime] = None  # backoff after a failure — not retried before this
+  last_error: Optional[str] = None
+
+  class Settings:
+    name = "MemoryBacklog"
+    indexes = [
+      IndexModel([("created_at", pymongo.ASCENDING)]),
+      IndexModel([("user_id", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)]),
+    ]
+
 
 class ConversationExchange(BaseModel):
   timestamp: datetime
@@ -70,16 +166,92 @@ class ConversationExchange(BaseModel):
   answer: str
 
 
+class ExchangeMetrics(BaseModel):
+  """How a turn was served — see utils/turn_metrics.py."""
+  intent: Optional[str] = None
+  skill: Optional[str] = None
+  stages: dict[str, float] = {}  # stage → milliseconds
+  prompt_tokens: int = 0
+  completion_tokens: int = 0
+  cache_hits: dict[str, int] = {}
+  total_ms: float = 0.0
+
+
+class ConversationEntry(Document):
+  """One logged exchange. Stored individually so reads scale with the range asked for, not the day's volume."""
+  date: date
+  timestamp: datetime
+  question: str
+  answer: str
+  user_id: str = "default"
+  metrics: Optional[ExchangeMetrics] = None  # absent for exchanges logged outside a classifier turn
+  compacted: bool = False  # folded into the day's Conversations.compacted summary
+  persona_analysed: bool = False  # through a successful persona extraction (skills/personalizer)
+
+  class Settings:
+    name = "ConversationEntries"
+    indexes = [
+      IndexModel([("date", pymongo.ASCENDING), ("timestamp", pymongo.ASCENDING)]),
+      IndexModel([("compacted", pymongo.ASCENDING), ("date", pymongo.ASCENDING)]),
+    ]
+
+
 class Conversations(Document):
+  """Per-day header: compaction state and exchange count. Exchanges are ConversationEntry documents."""
   date: date
+  exchange_count: int = 0
+  # Legacy embedded exchanges — moved to ConversationEntries by scripts/migrate_conversations.py
   exchanges: list[ConversationExchange] = []
   compacted: Optional[str] = None
+  compacted_through: Optional[datetime] = None  # newest exchange timestamp folded into compacted — a version marker
   compact_status: Literal["idle", "pending", "complete", "error"] = "idle"
+  pending_since: Optional[datetime] = None  # when compact_status became "pending" — the claim's lease start
+
+  class Settings:
+    indexes = [
+      IndexModel([("date", pymongo.ASCENDING)], unique=True),  # one header per day
+      IndexModel([("date", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]),
+    ]
+
+
+class SessionTurn(BaseModel):
+  role: Literal["user", "assistant"]
+  content: str
+
+
+class ConversationSession(Document):
+  """In-memory conversation state of a client session, persisted when evicted from the LRU."""
+  session_id: str
+  history: list[SessionTurn] = []
+  rolling_summary: Optional[str] = None
+  current_topic: Optional[str] = None
+  last_active: datetime
+
+  class Settings:
+    name = "ConversationSessions"
+    indexes = [IndexModel([("session_id", pymongo.ASCENDING)], unique=True)]
 
 
 class Journal(Document):
   datestamp: date
   summary: str
+  written_through: Optional[datetime] = None  # Conversations.compacted_through the entry was written from
+
+  class Settings:
+    indexes = [
+      IndexModel([("datestamp", pymongo.ASCENDING)], unique=True),  # one entry per day
+      IndexModel([("datestamp", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]),
+    ]
+
+
+class JournalIndexState(Document):
+  """Progress of the journal vector reindex — a single document."""
+  watermark: Optional[date] = None  # last journal date whose batch is fully indexed
+  complete: bool = True  # False while a reindex is running or was interrupted
+  updated_at: datetime
+
+  class Settings:
+    name = "JournalIndexState"
 
 
 class Note(Document):
@@ -90,6 +262,15 @@ class Note(Document):
 
   class Settings:
     name = "Notes"
+    indexes = [
+      IndexModel([("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]),
+      IndexModel([("category", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]),
+      IndexModel(
+        [("title", pymongo.TEXT), ("content", pymongo.TEXT)],
+        weights={"title": 5, "content": 1},
+        name="note_text",
+      ),
+    ]
 
 
 class VoiceSettings(Document):
@@ -0,0 +1,48 @@
+"""Per-resource change versions, for conditional GETs on the API listings.
+
+Each API-visible resource has a counter in the ChangeVersions collection that
+every write path bumps after it commits. A response's ETag is derived from the
+versions it depends on, so an unchanged resource is answered with 304 — or
+from the rendered-response cache — after a single small lookup. Counters live
+in Mongo rather than in process so writes from the CLI, Telegram and a
+separately run API server all invalidate the same ETags.
+"""
+
+from pymongo.errors import DuplicateKeyError
+
+from utils.log import logger
+
+NOTES = "notes"
+REMINDERS = "reminders"
+JOURNAL = "journal"
+PLANS = "plans"
+CONVERSATIONS = "conversations"
+
+
+async def bump_version(*resources: str) -> None:
+  """Increment each resource's version. Failures are logged — clients then see stale data until the next bump."""
+  from beanie.operators import Inc
+
+  from db.schemas import ChangeVersion
+
+  for resource in resources:
+    update = Inc({ChangeVersion.version: 1})
+    try:
+      try:
+        await ChangeVersion.find_one(ChangeVersion.resource == resource).update(update, upsert=True)
+      except DuplicateKeyError:
+        # Lost the race to create the counter — it exists now, so increment it
+        await ChangeVersion.find_one(ChangeVersion.resource == resource).update(update)
+    except Exception as e:
+      logger.warning(f"[db] could not bump {resource} version: {e}")
+
+
+async def get_versions(resources: tuple[str, ...]) -> tuple[int, ...]:
+  """Current versions of the resources, in the given order (0 for never written)."""
+  from beanie.operators import In
+
+  from db.schemas import ChangeVersion
+
+  docs = await ChangeVersion.find(In(ChangeVersion.resource, list(resources))).to_list()
+  found = {doc.resource: doc.version for doc in docs}
+  return tuple(found.get(resource, 0) for resource in resources)
@@ -16,6 +16,9 @@ from commands import cmd_save, handle_command
 from db.init import db_init
 from skills.conversation.skill import enable_emote
 from skills.personalizer.skill import start_personalizer
+from skills.journal.conversation_log import flush_conversation_log, start_conversation_log
+from skills.journal.memory_backlog import start_memory_backlog
+from skills.planner.jobs import start_planner_jobs
 from skills.telegram import start_telegram_bot
 from skills.telegram.skill import enable_tts
 
@@ -68,6 +71,9 @@ async def main(debug: bool = False, emote: bool = False):
     await start_api_server()
   
   personalizer_log = await start_personalizer()
+  planner_log = await start_planner_jobs()
+  memory_log = await start_memory_backlog()
+  journal_log = await start_conversation_log()
 
   from rich import box
   from rich.table import Table
@@ -132,6 +138,9 @@ async def main(debug: bool = False, emote: bool = False):
   table.add_row("Voice", get_active_voice_id() or "[dim]default[/dim]")
   table.add_row("Debug", "on" if debug else "off")
   table.add_row("Personalizer", personalizer_log)
+  table.add_row("Planner", planner_log)
+  table.add_row("Memory", memory_log)
+  table.add_row("Journal", journal_log)
   table.add_row("Database", db_init_log)
   if "--telegram" in sys.argv:
     telegram_log = await start_telegram_bot()
@@ -167,6 +176,9 @@ async def main(debug: bool = False, emote: bool = False):
       logger.error(f"An error occurred: {e}")
       print("\nSorry, I encountered an error. Let's try again.\n")
 
+  # Write exchanges still waiting in the write-behind queue (spooled if Mongo is down)
+  await flush_conversation_log()
+
 
 if __name__ == "__main__":
   import asyncio
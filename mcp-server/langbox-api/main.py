@@ -12,12 +12,33 @@ from mcp.server.fastmcp import FastMCP
 mcp = FastMCP("langbox-api", port=8182)
 
 API_BASE = os.getenv("LANGBOX_API_URL", "http://localhost:8000")
+# MCP clients get their own conversation session so they don't share history with the CLI.
+SESSION_ID = os.getenv("LANGBOX_SESSION_ID", "mcp")
+
+
+# The API's largest page size (api/pagination.py MAX_LIMIT)
+PAGE_SIZE = 200
 
 
 def _client() -> httpx.AsyncClient:
     return httpx.AsyncClient(base_url=API_BASE, timeout=120.0)
 
 
+async def _fetch_all(client: httpx.AsyncClient, path: str, key: str, params: dict | None = None) -> list[dict]:
+    """Every row of a paginated listing, following next_cursor to the last page."""
+    rows: list[dict] = []
+    params = {**(params or {}), "limit": PAGE_SIZE}
+    while True:
+        resp = await client.get(path, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        rows.extend(data.get(key, []))
+        cursor = data.get("next_cursor")
+        if not cursor:
+            return rows
+        params["after"] = cursor
+
+
 @mcp.tool()
 async def query(text: str) -> str:
     """Send a natural language query to the Langbox assistant and get a response.
@@ -33,7 +54,7 @@ async def query(text: str) -> str:
         The assistant's natural language response
     """
     async with _client() as client:
-        resp = await client.post("/query", json={"query": text})
+        resp = await client.post("/query", json={"query": text, "session_id": SESSION_ID})
         resp.raise_for_status()
         data = resp.json()
         return data.get("response", "(no response)")
@@ -51,9 +72,7 @@ async def get_notes(category: str | None = None) -> str:
         A formatted list of notes with title, category, and content
     """
     async with _client() as client:
-        resp = await client.get("/notes")
-        resp.raise_for_status()
-        notes = resp.json().get("notes", [])
+        notes = await _fetch_all(client, "/notes", "notes")
 
     if category:
         notes = [n for n in notes if n.get("category") == category]
@@ -82,9 +101,7 @@ async def get_reminders(include_completed: bool = False) -> str:
     """
     async with _client() as client:
         params = {"include_completed": "true"} if include_completed else {}
-        resp = await client.get("/reminders", params=params)
-        resp.raise_for_status()
-        reminders = resp.json().get("reminders", [])
+        reminders = await _fetch_all(client, "/reminders", "reminders", params)
 
     if not reminders:
         return "No reminders found."
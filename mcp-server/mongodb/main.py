@@ -193,14 +193,19 @@ async def search_journal(search_text: str, limit: int = 10) -> str:
   try:
     results = []
 
-    # Search raw exchanges in conversations collection
-    conv_filter = {
+    # Search raw exchanges, stored one document per exchange
+    exchange_filter = {
       "$or": [
-        {"exchanges.question": {"$regex": search_text, "$options": "i"}},
-        {"exchanges.answer": {"$regex": search_text, "$options": "i"}},
-        {"compacted": {"$regex": search_text, "$options": "i"}},
+        {"question": {"$regex": search_text, "$options": "i"}},
+        {"answer": {"$regex": search_text, "$options": "i"}},
       ]
     }
+    exchange_cursor = db.ConversationEntries.find(exchange_filter).sort("timestamp", -1).limit(limit)
+    async for doc in exchange_cursor:
+      results.append(("exchange", serialize_doc(doc)))
+
+    # Search the daily compacted summaries
+    conv_filter = {"compacted": {"$regex": search_text, "$options": "i"}}
     conv_cursor = db.conversations.find(conv_filter).sort("date", -1).limit(limit)
     async for doc in conv_cursor:
       results.append(("conversation", serialize_doc(doc)))
@@ -216,14 +221,13 @@ async def search_journal(search_text: str, limit: int = 10) -> str:
 
     output = f"Found {len(results)} result(s) matching '{search_text}':\n\n"
     for source, entry in results:
-      if source == "conversation":
+      if source == "exchange":
+        output += f"[Exchange] {entry.get('timestamp', 'N/A')}\n"
+        output += f"  Q: {entry.get('question', '')[:120]}\n"
+        output += f"  A: {entry.get('answer', '')[:160]}\n"
+      elif source == "conversation":
         output += f"[Conversation] Date: {entry.get('date', 'N/A')}\n"
-        for ex in entry.get("exchanges", []):
-          q = ex.get("question", "")
-          a = ex.get("answer", "")
-          if search_text.lower() in q.lower() or search_text.lower() in a.lower():
-            output += f"  [{ex.get('timestamp', '')}] Q: {q[:120]}\n"
-            output += f"  [{ex.get('timestamp', '')}] A: {a[:160]}\n"
+        output += f"  {(entry.get('compacted') or '')[:200]}\n"
       else:
         output += f"[Journal] Date: {entry.get('datestamp', 'N/A')}\n"
         output += f"  {entry.get('summary', '')[:200]}\n"
@@ -0,0 +1,93 @@
+"""Benchmark the embedded vector store against Qdrant.
+
+Fills a scratch collection in each backend with random unit vectors (384-dim
+by default, like all-MiniLM), then times upsert and top-k search, with and
+without a payload filter. Qdrant is skipped if the server is unreachable.
+Scratch collections are dropped afterwards.
+
+Usage:
+    uv run python scripts/bench_vector_store.py
+    uv run python scripts/bench_vector_store.py --points 20000 --queries 500
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.vector_store import EmbeddedVectorStore, QdrantVectorStore, VectorPoint  # noqa: E402
+
+COLLECTION = "langbox_bench"
+
+
+def _percentiles(samples: list[float]) -> str:
+    ms = np.asarray(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):.3f} ms · p95 {np.percentile(ms, 95):.3f} ms · p99 {np.percentile(ms, 99):.3f} ms"
+
+
+def _bench(name: str, store, vectors: np.ndarray, queries: np.ndarray, k: int) -> None:
+    dim = vectors.shape[1]
+    try:
+        store.drop_collection(COLLECTION)  # leftovers from an interrupted run
+    except Exception:
+        pass
+    store.ensure_collection(COLLECTION, dim)
+
+    points = [
+        VectorPoint(i, vectors[i].tolist(), {"user_id": "bench" if i % 2 else "other", "n": i})
+        for i in range(len(vectors))
+    ]
+    started = time.perf_counter()
+    for start in range(0, len(points), 1000):
+        store.upsert(COLLECTION, points[start:start + 1000])
+    upsert_s = time.perf_counter() - started
+
+    plain, filtered = [], []
+    for q in queries:
+        vector = q.tolist()
+        t = time.perf_counter()
+        store.search(COLLECTION, vector, limit=k)
+        plain.append(time.perf_counter() - t)
+        t = time.perf_counter()
+        store.search(COLLECTION, vector, limit=k, filters={"user_id": "bench"})
+        filtered.append(time.perf_counter() - t)
+
+    print(f"\n[{name}] {len(points):,} points, dim {dim}")
+    print(f"  upsert          {upsert_s:.2f} s ({len(points) / upsert_s:,.0f} points/s)")
+    print(f"  search top-{k:<3} {_percentiles(plain)}")
+    print(f"  search+filter   {_percentiles(filtered)}")
+    store.drop_collection(COLLECTION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _bench("embedded", EmbeddedVectorStore(tmp), vectors, queries, args.k)
+
+    try:
+        qdrant = QdrantVectorStore()
+        qdrant._client.get_collections()
+    except Exception as e:
+        print(f"\n[qdrant] skipped — server unreachable ({e})")
+        return
+    _bench("qdrant", qdrant, vectors, queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
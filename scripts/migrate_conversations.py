@@ -0,0 +1,123 @@
+"""Move embedded conversation exchanges into the ConversationEntries collection.
+
+Older Conversations documents hold the whole day's exchanges in an embedded
+array. This copies each exchange into its own ConversationEntry document, sets
+the day's exchange_count and then removes the array. Days are migrated one at a
+time and the script can be re-run safely: a day interrupted mid-way is cleaned
+up and copied again.
+
+It first removes duplicates that would stop the unique indexes on
+Conversations.date, ConversationSessions.session_id and Journal.datestamp from
+being built, keeping the most complete document of each. It also drops the
+older non-unique session_id index. This runs before db_init, which builds those
+indexes.
+
+Usage:
+    uv run python scripts/migrate_conversations.py
+    uv run python scripts/migrate_conversations.py --dry-run
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db.init import db_init, mongo_client  # noqa: E402
+
+# collection → (unique key, sort that puts the document to keep first)
+_UNIQUE = {
+    "Conversations": ("date", {"compacted_through": -1, "exchange_count": -1, "_id": 1}),
+    "ConversationSessions": ("session_id", {"last_active": -1, "_id": 1}),
+    "Journal": ("datestamp", {"written_through": -1, "_id": -1}),
+}
+
+
+async def dedupe(dry_run: bool) -> int:
+    """Delete all but the preferred document for each duplicated unique key; return the number of duplicates."""
+    database = mongo_client().langbox
+    found = 0
+    for name, (key, prefer) in _UNIQUE.items():
+        collection = database[name]
+        groups = await (await collection.aggregate([
+            {"$sort": prefer},
+            {"$group": {"_id": f"${key}", "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}},
+        ])).to_list(length=None)
+        extra = sum(g["n"] - 1 for g in groups)
+        found += extra
+        if extra:
+            print(f"{name}: {extra} duplicate(s) across {len(groups)} {key} value(s)")
+        if not dry_run:
+            for g in groups:
+                if name == "Conversations":
+                    # Legacy embedded exchanges move to the kept header, to be migrated with it below
+                    async for doc in collection.find({"_id": {"$in": g["ids"][1:]}, "exchanges.0": {"$exists": True}}):
+                        await collection.update_one(
+                            {"_id": g["ids"][0]}, {"$push": {"exchanges": {"$each": doc["exchanges"]}}}
+                        )
+                await collection.delete_many({"_id": {"$in": g["ids"][1:]}})
+            # An index on the same key without unique=True blocks building the unique one
+            for index, spec in (await collection.index_information()).items():
+                if spec["key"] == [(key, 1)] and not spec.get("unique"):
+                    await collection.drop_index(index)
+                    print(f"{name}: dropped non-unique index {index}")
+
+        if name == "Conversations" and groups and not dry_run:
+            # The kept header's count may be stale — recount from the entries
+            entries = database["ConversationEntries"]
+            for g in groups:
+                count = await entries.count_documents({"date": g["_id"]})
+                await collection.update_one({"_id": g["ids"][0]}, {"$set": {"exchange_count": count}})
+    return found
+
+
+async def migrate(dry_run: bool) -> None:
+    from beanie.operators import In, Set, Unset
+
+    from db.schemas import ConversationEntry, Conversations
+
+    if await dedupe(dry_run) and dry_run:
+        print("Run without --dry-run to remove the duplicates before the exchanges can be listed.")
+        return
+    await db_init()
+    days = await Conversations.find({"exchanges.0": {"$exists": True}}).sort(+Conversations.date).to_list()
+    if not days:
+        print("Nothing to migrate.")
+        return
+
+    total = 0
+    for doc in days:
+        print(f"{doc.date}: {len(doc.exchanges)} exchanges")
+        total += len(doc.exchanges)
+        if dry_run:
+            continue
+
+        # Remove copies left by an interrupted run before copying again
+        timestamps = [ex.timestamp for ex in doc.exchanges]
+        await ConversationEntry.find(
+            ConversationEntry.date == doc.date, In(ConversationEntry.timestamp, timestamps)
+        ).delete()
+        await ConversationEntry.insert_many([
+            ConversationEntry(date=doc.date, timestamp=ex.timestamp, question=ex.question, answer=ex.answer)
+            for ex in doc.exchanges
+        ])
+        count = await ConversationEntry.find(ConversationEntry.date == doc.date).count()
+        await Conversations.find_one(Conversations.id == doc.id).update(
+            Unset({"exchanges": ""}), Set({Conversations.exchange_count: count}),
+        )
+
+    verb = "Would migrate" if dry_run else "Migrated"
+    print(f"{verb} {total} exchanges across {len(days)} day(s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="list what would be migrated")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ from pydantic import BaseModel, Field
 from agents.persona import get_active_identity, get_active_name
 from utils.llm_structured_output import generate_structured_output
 from utils.log import logger
+from utils.observations import SYNTHESIS_DIGEST_CHARS, digest, memoised
 
 MAX_STEPS = 5  # Prevent infinite loops
 
@@ -115,10 +116,10 @@ async def reason_and_act(user_query: str, conversation_context: str, persona: st
   from rich.spinner import Spinner
   from rich.text import Text
 
-  from agents.router import route_intent
+  from agents.router import execute_skill
 
   console = Console(stderr=True, force_terminal=True)
-  observations = []
+  observations = []  # full tool output; prompts only see digests
   full_context = (
     f"{conversation_context}\n\nUser: {user_query}" if conversation_context else user_query
   )
@@ -126,7 +127,9 @@ async def reason_and_act(user_query: str, conversation_context: str, persona: st
   for step_num in range(1, MAX_STEPS + 1):
     # Build prompt with history
     if observations:
-      obs_text = "\n\n".join([f"Observation {i + 1}: {obs}" for i, obs in enumerate(observations)])
+      obs_text = "\n\n".join(
+        f"Observation {i + 1}: {digest(obs, user_query)}" for i, obs in enumerate(observations)
+      )
       prompt = f"{full_context}\n\n{obs_text}\n\nWhat's your next step?"
     else:
       prompt = full_context
@@ -158,7 +161,9 @@ async def reason_and_act(user_query: str, conversation_context: str, persona: st
     # Execute action
     with Live(Spinner("dots", text=Text(f"Using {step.action.lower().replace('_', ' ')}…", style="dim")), console=console, transient=False):
       try:
-        result = await route_intent(intent=step.action, query=step.query)
+        result = await memoised(
+          step.action, step.query, lambda: execute_skill(step.action, step.query)
+        )
         observations.append(result)
         logger.debug(f"[ReAct] Observation: {result[:100]}...")
       except Exception as e:
@@ -192,7 +197,9 @@ async def _synthesize(user_query: str, observations: list[str], persona: str | N
   if persona:
     system += f"\n\n{persona}"
 
-  research = "\n\n".join(f"Finding {i + 1}: {obs}" for i, obs in enumerate(observations))
+  research = "\n\n".join(
+    f"Finding {i + 1}: {digest(obs, user_query, SYNTHESIS_DIGEST_CHARS)}" for i, obs in enumerate(observations)
+  )
   llm = create_llm(temperature=0.7, max_tokens=512)
   response = await llm.ainvoke([
     SystemMessage(content=system),
@@ -0,0 +1,206 @@
+"""Per-client conversation sessions.
+
+Every client — the CLI, each Telegram chat, each mobile app connection, MCP
+clients — gets its own history, rolling summary and topic, keyed by a session id.
+Sessions live in an in-process LRU. When the store is over capacity, or a session
+has been idle too long, it is written to the ConversationSessions collection and
+dropped from memory; the next request for that id rehydrates it lazily.
+
+The active session is carried in a ContextVar, set by use_session() at the entry
+point (run_intent_classifier), so skills read it via current_session() without
+threading an id through every call.
+
+A session is a client connection, not a person: long-term memories (mem0) are
+kept per user, and every session belongs to DEFAULT_USER_ID unless
+SESSION_USERS maps its id to another user, e.g.
+"telegram:123456=alice,app:pixel=alice".
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Literal, NamedTuple
+
+from utils.log import logger
+
+DEFAULT_SESSION_ID = "default"
+DEFAULT_USER_ID = "default"
+
+MAX_HISTORY = 40  # hard cap per session; compression normally keeps it well below this
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", 32))
+SESSION_IDLE_SECONDS = int(os.environ.get("SESSION_IDLE_SECONDS", 3600))
+# session id → user id, for sessions whose memories belong to someone other than DEFAULT_USER_ID
+_SESSION_USERS = dict(
+  pair.strip().rsplit("=", 1) for pair in os.environ.get("SESSION_USERS", "").split(",") if "=" in pair
+)
+
+
+class Turn(NamedTuple):
+  """One message in a session's history."""
+
+  role: Literal["user", "assistant"]
+  content: str
+
+
+@dataclass(slots=True, eq=False)
+class Session:
+  id: str
+  history: deque = field(default_factory=lambda: deque(maxlen=MAX_HISTORY))
+  rolling_summary: str | None = None  # compressed summary of turns dropped from history
+  current_topic: str | None = None
+  last_active: float = field(default_factory=time.monotonic)
+  active_turns: int = 0  # >0 while a request is using the session; never evicted then
+  compress_task: asyncio.Task | None = None
+  turn_cache: dict = field(default_factory=dict)  # per-turn retrieval tasks, keyed by query
+
+  @property
+  def user_id(self) -> str:
+    """Namespace for long-term memories (mem0) — the same user across all of their clients."""
+    return _SESSION_USERS.get(self.id, DEFAULT_USER_ID)
+
+  def reset(self) -> None:
+    from utils import kv_cache
+
+    if self.compress_task is not None and not self.compress_task.done():
+      self.compress_task.cancel()
+    self.compress_task = None
+    kv_cache.drop(self.id)
+    self.current_topic = None
+    self.rolling_summary = None
+    self.history.clear()
+
+
+_sessions: "OrderedDict[str, Session]" = OrderedDict()
+_persisting: dict[str, asyncio.Task] = {}
+_current: ContextVar[Session | None] = ContextVar("conversation_session", default=None)
+
+
+def current_session() -> Session:
+  """Return the session bound to the running request (the CLI session if none)."""
+  session = _current.get()
+  if session is not None:
+    return session
+  session = _sessions.get(DEFAULT_SESSION_ID)
+  if session is None:
+    session = Session(DEFAULT_SESSION_ID)
+    _admit(session)
+  return session
+
+
+async def load_session(session_id: str) -> Session:
+  """Return the live session for this id, rehydrating it from MongoDB if evicted."""
+  session = _sessions.get(session_id)
+  if session is None:
+    pending = _persisting.get(session_id)
+    if pending is not None:
+      await asyncio.shield(pending)
+    restored = await _rehydrate(session_id)
+    # Another request may have loaded the same id while we were waiting
+    session = _sessions.get(session_id) or restored or Session(session_id)
+    _admit(session)
+  _sessions.move_to_end(session_id)
+  session.last_active = time.monotonic()
+  return session
+
+
+@asynccontextmanager
+async def use_session(session_id: str | None):
+  """Bind a session to the enclosed request."""
+  session = await load_session(session_id or DEFAULT_SESSION_ID)
+  session.active_turns += 1
+  token = _current.set(session)
+  try:
+    yield session
+  finally:
+    _current.reset(token)
+    session.active_turns -= 1
+    session.last_active = time.monotonic()
+
+
+def active_session_ids() -> list[str]:
+  return list(_sessions.keys())
+
+
+def _admit(session: Session) -> None:
+  _sessions[session.id] = session
+  _sessions.move_to_end(session.id)
+  _evict()
+
+
+def _evict() -> None:
+  """Evict idle sessions, then least-recently-used ones until under MAX_SESSIONS."""
+  now = time.monotonic()
+  evictable = [s for s in _sessions.values() if s.active_turns == 0]  # LRU order
+  victims = [s for s in evictable if now - s.last_active > SESSION_IDLE_SECONDS]
+  overflow = len(_sessions) - len(victims) - MAX_SESSIONS
+  for session in evictable:
+    if overflow <= 0:
+      break
+    if session not in victims:
+      victims.append(session)
+      overflow -= 1
+
+  from utils import kv_cache
+
+  for session in victims:
+    _sessions.pop(session.id, None)
+    kv_cache.drop(session.id)
+    if session.compress_task is not None and not session.compress_task.done():
+      session.compress_task.cancel()
+    try:
+      _persisting[session.id] = asyncio.get_running_loop().create_task(_persist(session))
+    except RuntimeError:
+      logger.warning(f"[session] No event loop — dropping session '{session.id}' without persisting")
+    logger.debug(f"[session] evicted '{session.id}'")
+
+
+async def _persist(session: Session) -> None:
+  try:
+    from beanie.operators import Set
+    from pymongo.errors import DuplicateKeyError
+
+    from db.schemas import ConversationSession, SessionTurn
+
+    history = [SessionTurn(role=t.role, content=t.content) for t in session.history]
+    fields = {
+      "history": history,
+      "rolling_summary": session.rolling_summary,
+      "current_topic": session.current_topic,
+      "last_active": datetime.now(),
+    }
+    query = ConversationSession.find_one(ConversationSession.session_id == session.id)
+    try:
+      await query.upsert(Set(fields), on_insert=ConversationSession(session_id=session.id, **fields))
+    except DuplicateKeyError:
+      # Another process persisted the same session first — overwrite it
+      await query.update(Set(fields))
+  except Exception:
+    logger.exception(f"[session] Failed to persist session '{session.id}'")
+  finally:
+    _persisting.pop(session.id, None)
+
+
+async def _rehydrate(session_id: str) -> Session | None:
+  try:
+    from db.schemas import ConversationSession
+
+    doc = await ConversationSession.find_one(ConversationSession.session_id == session_id)
+  except Exception:
+    logger.exception(f"[session] Failed to load session '{session_id}'")
+    return None
+  if doc is None:
+    return None
+
+  session = Session(
+    session_id,
+    rolling_summary=doc.rolling_summary,
+    current_topic=doc.current_topic,
+  )
+  session.history.extend(Turn(t.role, t.content) for t in doc.history)
+  logger.debug(f"[session] rehydrated '{session_id}' ({len(session.history)} turns)")
+  return session
@@ -1,17 +1,20 @@
 import asyncio
 import os
 import re
-from collections import deque
 from collections.abc import Callable
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 from utils.log import logger
 
 from agents.agent_factory import create_llm
 from agents.persona import get_active_identity, get_active_name, get_active_preamble
+from skills.conversation.session import MAX_HISTORY, Session, Turn, current_session
+from skills.conversation.temporal import TimeWindow, time_window
+from skills.conversation.think_filter import ThinkFilter
 from skills.personalizer.skill import get_persona_context
 from utils.llm_structured_output import generate_structured_output
+from utils.turn_metrics import cache_hit
 
 
 def _strip_think(text: str) -> str:
@@ -33,21 +36,15 @@ class _TopicResponse(BaseModel):
   topic: str = Field(description="3-5 word label describing the subject of this exchange")
 
 
-# Tracks the active conversation topic so the intent classifier can resolve follow-ups.
-_current_topic: str | None = None
-
-
 def get_current_topic() -> str | None:
-  return _current_topic
+  """Active topic of the current session, so the classifier can resolve follow-ups."""
+  return current_session().current_topic
 
 
 def reset_session() -> None:
-  """Clear in-memory conversation state. Called after compaction so stale topic
-  and history don't bleed into the next session."""
-  global _current_topic, _rolling_summary
-  _current_topic = None
-  _rolling_summary = None
-  _history.clear()
+  """Clear the current session's in-memory state. Called after compaction so stale
+  topic and history don't bleed into the next session."""
+  current_session().reset()
 
 
 # Used when wrapping a skill's raw data output into natural language.
@@ -101,49 +98,101 @@ def _chat_prompt() -> str:
   return base
 
 
-# Shared rolling history of all exchanges (CHAT + wrapped skill responses).
-# Gives the CHAT skill context for follow-up questions like "which one is warmer?",
-# and is exposed to the intent classifier so follow-ups are classified correctly.
-MAX_HISTORY = 20  # 10 exchanges kept in full
-_history: deque = deque(maxlen=MAX_HISTORY)
-_rolling_summary: str | None = None  # compressed summary of messages evicted from _history
+# Each session keeps a rolling history of all exchanges (CHAT + wrapped skill
+# responses). Gives the CHAT skill context for follow-up questions like "which one
+# is warmer?", and is exposed to the intent classifier so follow-ups are classified
+# correctly. Compression is driven by the token budget below; MAX_HISTORY is only a
+# hard cap so nothing is silently evicted if compression falls behind.
+COMPRESS_AT_TOKENS = int(os.environ.get("HISTORY_COMPRESS_TOKENS", 2048))
+
+
+def _estimate_tokens(text: str) -> int:
+  """Cheap token estimate (~4 chars/token) — avoids a tokenizer round-trip per turn."""
+  return len(text) // 4 + 1
+
+
+def _history_tokens(session: Session) -> int:
+  return sum(_estimate_tokens(turn.content) for turn in session.history)
+
 
+def _remember(query: str, answer: str) -> None:
+  """Append an exchange to history and schedule compression if it has grown too large."""
+  session = current_session()
+  session.history.append(Turn("user", query))
+  session.history.append(Turn("assistant", answer))
+  _schedule_compression(session)
 
-async def _compress_oldest() -> None:
-  """Summarise the oldest half of _history into _rolling_summary before they get evicted."""
-  global _rolling_summary
 
-  messages = list(_history)
-  half = len(messages) // 2
-  to_compress = messages[:half]
-  if not to_compress:
+def _schedule_compression(session: Session) -> None:
+  """Start a background compression once history outgrows its token budget.
+
+  At most one compression runs per session; the response path never waits on it.
+  """
+  if session.compress_task is not None and not session.compress_task.done():
     return
+  if _history_tokens(session) < COMPRESS_AT_TOKENS and len(session.history) < MAX_HISTORY - 2:
+    return
+  session.compress_task = asyncio.create_task(_compress_oldest(session))
 
-  active_name = get_active_name()
-  lines = []
-  for msg in to_compress:
-    role = "User" if msg.__class__.__name__ == "HumanMessage" else active_name
-    lines.append(f"{role}: {msg.content}")
-  excerpt = "\n".join(lines)
-
-  existing = f"Previous summary:\n{_rolling_summary}\n\n" if _rolling_summary else ""
-  prompt = (
-    f"{existing}Add the following exchanges to the summary. "
-    f"Write in first person as {active_name}. Be concise — capture topics, conclusions, and anything the user shared about themselves.\n\n"
-    f"{excerpt}"
-  )
 
-  llm = _get_llm(temperature=0.3, max_tokens=256)
-  response = await llm.ainvoke([
-    SystemMessage(content=f"{get_active_identity()} You are maintaining a running summary of your conversation with the user."),
-    HumanMessage(content=prompt),
-  ])
-  _rolling_summary = _strip_think(response.content)
+async def _compress_oldest(session: Session) -> None:
+  """Summarise the oldest half of the session's history into its rolling summary.
+
+  Waits for the model to go idle, builds the new summary from a snapshot, then
+  swaps it in and drops the summarised messages in one step (no await between),
+  so a turn never sees the summary and the messages it covers at the same time.
+  """
+  from utils.idle import wait_until_idle
+
+  try:
+    await wait_until_idle()
+
+    messages = list(session.history)
+    half = len(messages) // 2
+    half -= half % 2  # keep user/assistant pairs together
+    to_compress = messages[:half]
+    if not to_compress:
+      return
+    base_summary = session.rolling_summary
+
+    active_name = get_active_name()
+    lines = []
+    for turn in to_compress:
+      role = "User" if turn.role == "user" else active_name
+      lines.append(f"{role}: {turn.content}")
+    excerpt = "\n".join(lines)
+
+    existing = f"Previous summary:\n{base_summary}\n\n" if base_summary else ""
+    prompt = (
+      f"{existing}Add the following exchanges to the summary. "
+      f"Write in first person as {active_name}. Be concise — capture topics, conclusions, and anything the user shared about themselves.\n\n"
+      f"{excerpt}"
+    )
+
+    llm = _get_llm(temperature=0.3, max_tokens=256)
+    response = await llm.ainvoke([
+      SystemMessage(content=f"{get_active_identity()} You are maintaining a running summary of your conversation with the user."),
+      HumanMessage(content=prompt),
+    ])
+
+    if session.rolling_summary is not base_summary:
+      logger.debug("[conversation] session changed during compression — discarding summary")
+      return
+
+    compressed_ids = {id(turn) for turn in to_compress}
+    session.rolling_summary = _strip_think(response.content)
+    while session.history and id(session.history[0]) in compressed_ids:
+      session.history.popleft()
+    logger.debug(f"[conversation] compressed {len(to_compress)} messages into rolling summary")
+  except asyncio.CancelledError:
+    raise
+  except Exception:
+    logger.exception("[conversation] History compression failed")
 
 
 def get_recent_history(n: int = 4) -> list[tuple[str, str]]:
   """Return the last n exchanges as (user, assistant) string pairs."""
-  messages = list(_history)
+  messages = list(current_session().history)
   pairs = []
   i = 0
   while i + 1 < len(messages) and len(pairs) < n:
@@ -163,33 +212,49 @@ def _get_llm(temperature: float = 0.7, max_tokens: int = 1024):
   )
 
 
+async def _stream_visible(
+  llm,
+  messages: list,
+  on_token: Callable[[str], None],
+  on_status: Callable[[str], None] | None = None,
+) -> tuple[str, str]:
+  """Stream llm output to on_token with think blocks suppressed as they arrive.
+
+  Emits a "Thinking" status instead of the hidden reasoning. Returns the visible
+  text and the raw generated text (think blocks included).
+  """
+  on_thinking = (lambda: on_status("Thinking")) if on_status is not None else None
+  think = ThinkFilter(on_token, on_thinking=on_thinking)
+  raw = []
+  async for chunk in llm.astream(messages):
+    raw.append(chunk.content)
+    think.feed(chunk.content)
+  think.flush()
+  if think.think_chunks:
+    logger.debug(f"[conversation] suppressed {think.think_chunks} think chunks, streamed {think.visible_chunks}")
+  return think.text, "".join(raw)
+
+
 async def handle_conversation(
   user_query: str,
   handler_response: str,
   on_token: Callable[[str], None] | None = None,
+  on_status: Callable[[str], None] | None = None,
 ) -> str:
   """Wrap a skill's raw output into natural language — stateless, no session memory.
 
   When on_token is provided (voice WebSocket path), streams tokens via ChatLlamaCpp
   instead of waiting for the full structured output. Topic update is skipped in this
-  mode since the response is free-form text.
+  mode since the response is free-form text. Think blocks are filtered out of the
+  stream; on_status receives "Thinking" while the model reasons.
   """
-  global _current_topic
-
   system_prompt = _data_prompt(handler_response)
 
   if on_token is not None:
     llm = _get_llm(temperature=0.7, max_tokens=768)
     messages = [SystemMessage(content=system_prompt), HumanMessage(content=user_query)]
-    full_text = ""
-    async for chunk in llm.astream(messages):
-      token = chunk.content
-      if token:
-        full_text += token
-        on_token(token)
-    final = _strip_think(full_text)
-    _history.append(HumanMessage(content=user_query))
-    _history.append(AIMessage(content=final))
+    final, _ = await _stream_visible(llm, messages, on_token, on_status)
+    _remember(user_query, final)
     return final
 
   result = await asyncio.to_thread(
@@ -201,23 +266,19 @@ async def handle_conversation(
     max_tokens=768,
   )
   final = _strip_think(result.answer)
-  _current_topic = result.topic
-  logger.debug(f"[conversation] topic='{_current_topic}'")
+  current_session().current_topic = result.topic
+  logger.debug(f"[conversation] topic='{result.topic}'")
 
   # Store in shared history so CHAT can reference this exchange
-  _history.append(HumanMessage(content=user_query))
-  _history.append(AIMessage(content=final))
+  _remember(user_query, final)
 
   return final
 
 
-async def _fetch_relevant_memories(query: str) -> str:
-  """Return semantically relevant memories for this query, or empty string."""
-  if len(query.split()) < 4:
-    return ""
+async def _search_memories(query: str, user_id: str) -> str:
   try:
     from utils.memory_client import search_memories
-    memories = await asyncio.to_thread(search_memories, query)
+    memories = await asyncio.to_thread(search_memories, query, user_id)
     if not memories:
       return ""
     lines = "\n".join(f"- {m}" for m in memories)
@@ -227,45 +288,188 @@ async def _fetch_relevant_memories(query: str) -> str:
     return ""
 
 
-async def handle_chat(query: str, on_token: Callable[[str], None] | None = None) -> str:
-  """CHAT intent — responds with full conversation history for follow-up awareness.
+# Approx. tokens of journal excerpts injected into a CHAT prompt
+JOURNAL_TOKEN_BUDGET = int(os.environ.get("JOURNAL_TOKEN_BUDGET", 300))
+_JOURNAL_RESULTS = 3
+
+
+async def _search_journal(query: str, window: TimeWindow) -> str:
+  """Journal entries for a query that looks back in time, digested to fit JOURNAL_TOKEN_BUDGET."""
+  try:
+    from utils.journal_index import search_recent_journal
+    from utils.observations import digest
+
+    entries = await asyncio.to_thread(
+      search_recent_journal, query, _JOURNAL_RESULTS, window.since, window.until,
+    )
+    if not entries:
+      return ""
+    # Split the budget evenly; each narrative is cut to its most relevant sentences
+    share = JOURNAL_TOKEN_BUDGET * 4 // len(entries)
+    lines = [
+      f"- {e['datestamp']}: {digest(e['narrative'], query, max_chars=share)}"
+      for e in sorted(entries, key=lambda e: e["datestamp"])
+    ]
+    return "## From my journal of past days:\n" + "\n".join(lines)
+  except Exception:
+    logger.exception("[chat] Journal search failed")
+    return ""
+
+
+def _journal_key(query: str) -> str:
+  return "journal:" + query
+
 
-  When on_token is provided (voice WebSocket path), streams tokens via ChatLlamaCpp.
+# Wording that makes memories likely to matter: the user, the assistant, or a shared past
+_PERSONAL_CUE = re.compile(
+  r"\b(?:i|i'm|i've|i'd|me|my|mine|we|us|our|you|your|remember|recall|again|last time)\b", re.IGNORECASE,
+)
+
+
+def worth_prefetching(query: str) -> bool:
+  """Cheap guess, before classification, whether a query is conversational enough to start retrieval for.
+
+  "What's the weather in Leeds" or "pause spotify" skip the speculative search;
+  CHAT still searches on demand if it ends up handling them.
+  """
+  return len(query.split()) >= 4 and (bool(_PERSONAL_CUE.search(query)) or time_window(query) is not None)
+
+
+def prefetch_memories(query: str) -> None:
+  """Start memory (and, for queries about past days, journal) retrieval in the background.
+
+  Called as soon as a query arrives so the embedding + vector search overlaps
+  with intent classification instead of adding to CHAT latency.
   """
-  global _current_topic
+  session = current_session()
+  if len(query.split()) >= 4 and query not in session.turn_cache:
+    session.turn_cache[query] = asyncio.create_task(_search_memories(query, session.user_id))
+  _prefetch_journal(query)
 
+
+def _prefetch_journal(query: str) -> None:
+  """Start a journal search only if the query names a past window or uses recall wording."""
+  session = current_session()
+  key = _journal_key(query)
+  if key not in session.turn_cache:
+    window = time_window(query)
+    if window is not None:
+      session.turn_cache[key] = asyncio.create_task(_search_journal(query, window))
+
+
+def clear_turn_cache() -> None:
+  """Drop the session's per-turn retrieval results, cancelling any still in flight."""
+  session = current_session()
+  for task in session.turn_cache.values():
+    if not task.done():
+      task.cancel()
+  session.turn_cache.clear()
+
+
+async def _fetch_relevant_memories(query: str) -> str:
+  """Return semantically relevant memories for this query, or empty string."""
+  if len(query.split()) < 4:
+    return ""
+  if query in current_session().turn_cache:
+    cache_hit("memory_prefetch")
+  prefetch_memories(query)
+  return await asyncio.shield(current_session().turn_cache[query])
+
+
+async def _fetch_relevant_journal(query: str) -> str:
+  """Return journal excerpts if the query refers to past days or conversations, else empty string."""
+  _prefetch_journal(query)
+  task = current_session().turn_cache.get(_journal_key(query))
+  if task is None:
+    return ""
+  return await asyncio.shield(task)
+
+
+async def _assemble_chat_context(query: str) -> tuple[str, str]:
+  """Build the (system, user) prompt pair for a CHAT turn.
+
+  Memory and journal retrieval run concurrently with each other and with the
+  local prompt assembly; if the classifier already prefetched them for this
+  query, the cached tasks are reused.
+
+  The prompt is ordered from most to least stable — instructions, persona,
+  summary, history, then per-turn memories and the query — so consecutive turns
+  share a long prefix and the session's cached KV state can be reused.
+  """
+  session = current_session()
+  memories_task = asyncio.ensure_future(_fetch_relevant_memories(query))
+  journal_task = asyncio.ensure_future(_fetch_relevant_journal(query))
+
+  system = _chat_prompt()
+  persona = get_persona_context()
+  if persona:
+    logger.debug(persona)
+    system = system + "\n\n" + persona
+
+  if session.rolling_summary:
+    system = system + "\n\n## Summary of earlier in this conversation:\n" + session.rolling_summary
+
+  # Serialize history into a single string for structured output
+  active_name = get_active_name()
+  history_lines = []
+  for turn in list(session.history):
+    role = "User" if turn.role == "user" else active_name
+    history_lines.append(f"{role}: {turn.content}")
+  sections = []
+  if history_lines:
+    sections.append("## Conversation so far:\n" + "\n".join(history_lines))
+
+  memories, journal = await asyncio.gather(memories_task, journal_task)
+  if journal:
+    logger.debug(f"[CHAT] Injecting journal: {journal[:120]}")
+    sections.append(journal)
+  if memories:
+    logger.debug(f"[CHAT] Injecting memories: {memories[:120]}")
+    sections.append(memories)
+
+  user_prompt = "\n\n".join(sections + [f"User: {query}"]) if sections else query
+  return system, user_prompt
+
+
+def _kv_backend():
+  """The llama.cpp backend module when session KV reuse is available, else None."""
+  if os.environ.get("LANGBOX_LLM_BACKEND", "llamacpp") != "llamacpp":
+    return None
+  from utils import llm_structured_output_llamacpp
+  return llm_structured_output_llamacpp
+
+
+async def handle_chat(
+  query: str,
+  on_token: Callable[[str], None] | None = None,
+  on_status: Callable[[str], None] | None = None,
+) -> str:
+  """CHAT intent — responds with full conversation history for follow-up awareness.
+
+  When on_token is provided (voice WebSocket path), streams tokens via ChatLlamaCpp
+  with think blocks filtered out; on_status receives "Thinking" while the model reasons.
+  """
   from skills.conversation.reasoning_engine import reason_and_act, should_use_reasoning
 
   # Streaming path for voice WebSocket — bypass structured output and reasoning engine
   if on_token is not None:
-    if len(_history) >= MAX_HISTORY - 2:
-      await _compress_oldest()
-    system = _chat_prompt()
-    persona = get_persona_context()
-    if persona:
-      system = system + "\n\n" + persona
-    if _rolling_summary:
-      system = system + "\n\n## Summary of earlier in this conversation:\n" + _rolling_summary
-    history_lines = []
-    for msg in list(_history):
-      role = "User" if isinstance(msg, HumanMessage) else get_active_name()
-      history_lines.append(f"{role}: {msg.content}")
-    user_prompt = ("## Conversation so far:\n" + "\n".join(history_lines) + f"\n\nUser: {query}"
-                   if history_lines else query)
+    session = current_session()
+    system, user_prompt = await _assemble_chat_context(query)
+    backend = _kv_backend()
     llm = _get_llm(temperature=0.7, max_tokens=1024)
     messages = [SystemMessage(content=system), HumanMessage(content=user_prompt)]
-    full_text = ""
-    async for chunk in llm.astream(messages):
-      token = chunk.content
-      if token:
-        full_text += token
-        on_token(token)
-    final = _strip_think(full_text)
-    _history.append(HumanMessage(content=query))
-    _history.append(AIMessage(content=final))
+    if backend:
+      # The model is held from restore to save so no other generation can clobber the session's KV state
+      async with backend.hold_session_kv(session.id) as streamed:
+        final, raw = await _stream_visible(llm, messages, on_token, on_status)
+        streamed.completion_tokens = backend.count_tokens(raw)
+    else:
+      final, _ = await _stream_visible(llm, messages, on_token, on_status)
+    _remember(query, final)
     return final
 
-  # Check if query needs multi-step reasoning
+  # Check if query needs multi-step reasoning (a synchronous keyword check). Memory retrieval
+  # overlaps with classification when the classifier prefetched it; otherwise it starts below.
   recent_history = get_recent_history(n=4)
   if should_use_reasoning(query, recent_history):
     logger.info("[CHAT] Using ReAct reasoning engine")
@@ -273,6 +477,9 @@ async def handle_chat(query: str, on_token: Callable[[str], None] | None = None)
     for user_msg, assistant_msg in recent_history:
       context_lines.append(f"User: {user_msg}")
       context_lines.append(f"Assistant: {assistant_msg[:400]}")
+    memories = await _fetch_relevant_memories(query)
+    if memories:
+      context_lines.insert(0, memories + "\n")
     conversation_context = "\n".join(context_lines)
 
     persona = get_persona_context()
@@ -287,42 +494,15 @@ async def handle_chat(query: str, on_token: Callable[[str], None] | None = None)
       pydantic_model=_TopicResponse,
       max_tokens=50,
     )
-    _current_topic = topic_result.topic
-    logger.debug(f"[chat/reasoning] topic='{_current_topic}'")
+    current_session().current_topic = topic_result.topic
+    logger.debug(f"[chat/reasoning] topic='{topic_result.topic}'")
 
-    _history.append(HumanMessage(content=query))
-    _history.append(AIMessage(content=final))
+    _remember(query, final)
     return final
 
-  # Compress oldest history before it gets evicted
-  if len(_history) >= MAX_HISTORY - 2:
-    await _compress_oldest()
-
   # Normal CHAT flow (simple conversation, no reasoning needed)
   logger.debug("[CHAT] Using standard conversation flow")
-  system = _chat_prompt()
-  persona = get_persona_context()
-  if persona:
-    logger.debug(persona)
-    system = system + "\n\n" + persona
-
-  if _rolling_summary:
-    system = system + "\n\n## Summary of earlier in this conversation:\n" + _rolling_summary
-
-  memories = await _fetch_relevant_memories(query)
-  if memories:
-    logger.debug(f"[CHAT] Injecting memories: {memories[:120]}")
-    system = system + "\n\n" + memories
-
-  # Serialize history into a single string for structured output
-  history_lines = []
-  for msg in list(_history):
-    role = "User" if isinstance(msg, HumanMessage) else get_active_name()
-    history_lines.append(f"{role}: {msg.content}")
-  if history_lines:
-    user_prompt = "## Conversation so far:\n" + "\n".join(history_lines) + f"\n\nUser: {query}"
-  else:
-    user_prompt = query
+  system, user_prompt = await _assemble_chat_context(query)
 
   result = await asyncio.to_thread(
     generate_structured_output,
@@ -331,13 +511,13 @@ async def handle_chat(query: str, on_token: Callable[[str], None] | None = None)
     system_prompt=system,
     pydantic_model=_ChatResponse,
     max_tokens=1024,
+    session_key=current_session().id,
   )
   final = _strip_think(result.answer)
-  _current_topic = result.topic
-  logger.debug(f"[chat] topic='{_current_topic}'")
+  current_session().current_topic = result.topic
+  logger.debug(f"[chat] topic='{result.topic}'")
 
-  _history.append(HumanMessage(content=query))
-  _history.append(AIMessage(content=final))
+  _remember(query, final)
 
   return final
 
@@ -363,7 +543,7 @@ async def generate_greeting() -> str:
     if not user_name:
       try:
         from utils.memory_client import search_memories
-        memories = await asyncio.to_thread(search_memories, "user name")
+        memories = await asyncio.to_thread(search_memories, "user name", current_session().user_id)
         if memories:
           user_name = memories[0]  # use the top hit as a rough name hint
       except Exception:
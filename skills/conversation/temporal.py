@@ -0,0 +1,106 @@
+"""Cheap detector for references to past conversations and days.
+
+Gates journal retrieval in CHAT: only queries that point back in time ("what
+did we talk about last week?", "remember when I mentioned the trip?") pay for
+a journal search. Pure regex, no model call.
+
+Phrases that are past by themselves ("yesterday", "last Friday", "two weeks
+ago") always count. Phrases that can as well look ahead ("on Friday", "this
+week", "this month", "lately") only count next to past-tense or recall
+wording, so "remind me on Friday" or "what's on this week?" search nothing.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import NamedTuple
+
+
+class TimeWindow(NamedTuple):
+  """Inclusive date range a query refers to. Both None means "some time in the past"."""
+
+  since: date | None
+  until: date | None
+
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "couple of": 2, "few": 3}
+
+_AGO = re.compile(
+  r"\b(\d+|an?|one|two|three|four|five|six|couple of|few)\s+(day|week|month)s?\s+ago\b", re.IGNORECASE
+)
+_LAST_WEEKDAY = re.compile(r"\b(?:last|this past)\s+(" + "|".join(_WEEKDAYS) + r")\b", re.IGNORECASE)
+_ON_WEEKDAY = re.compile(r"\bon\s+(" + "|".join(_WEEKDAYS) + r")\b", re.IGNORECASE)
+_DAY_BEFORE_YESTERDAY = re.compile(r"\bday before yesterday\b", re.IGNORECASE)
+_YESTERDAY = re.compile(r"\byesterday\b|\blast night\b", re.IGNORECASE)
+_LAST_WEEKEND = re.compile(r"\b(?:last|this past)\s+weekend\b", re.IGNORECASE)
+_THIS_WEEK = re.compile(r"\bthis\s+week\b", re.IGNORECASE)
+_LAST_WEEK = re.compile(r"\b(?:last|past|previous)\s+(?:week|few days|couple of days)\b|\bthe other day\b", re.IGNORECASE)
+_THIS_MONTH = re.compile(r"\bthis\s+month\b", re.IGNORECASE)
+_LAST_MONTH = re.compile(r"\b(?:last|past|previous)\s+month\b", re.IGNORECASE)
+_RECENTLY = re.compile(r"\b(?:recently|lately)\b", re.IGNORECASE)
+# Recall without a date: look through the whole journal
+_RECALL = re.compile(
+  r"\bremember when\b|\blast time\b|\bbefore,? (?:you|I) (?:said|mentioned)\b"
+  r"|\b(?:did|have) (?:we|I) (?:ever )?(?:talk|talked|discuss|discussed|chat|chatted|speak|spoke)\b"
+  r"|\b(?:we|I) (?:talked|discussed|chatted|spoke) about\b"
+  r"|\b(?:you|I) (?:told|mentioned to) (?:me|you)\b",
+  re.IGNORECASE,
+)
+# Past-tense or recall wording that turns an ambiguous phrase into a look back
+_PAST = re.compile(
+  r"\b(?:did|was|were|had|been|said|told|mentioned|talked|discussed|spoke|chatted|asked|went|happened"
+  r"|remember|recall|earlier)\b"
+  r"|\b(?:i|we|you|they)\s+\w+[a-df-z]ed\b",  # "we tried", "I worked" — not "I need"
+  re.IGNORECASE,
+)
+
+
+def time_window(query: str, today: date | None = None) -> TimeWindow | None:
+  """Return the past window the query refers to, or None if it does not look back in time."""
+  today = today or date.today()
+  yesterday = today - timedelta(days=1)
+
+  if _DAY_BEFORE_YESTERDAY.search(query):
+    day = today - timedelta(days=2)
+    return TimeWindow(day, day)
+  if _YESTERDAY.search(query):
+    return TimeWindow(yesterday, yesterday)
+
+  m = _AGO.search(query)
+  if m:
+    word = m.group(1).lower()
+    n = int(word) if word.isdigit() else _NUMBERS[word]
+    unit = m.group(2).lower()
+    if unit == "day":
+      day = today - timedelta(days=n)
+      return TimeWindow(day, day)
+    # "two weeks ago" is fuzzy — allow a few days either side
+    days, slack = (7 * n, 3) if unit == "week" else (30 * n, 10)
+    return TimeWindow(today - timedelta(days=days + slack), min(today - timedelta(days=days - slack), yesterday))
+
+  past = bool(_PAST.search(query) or _RECALL.search(query))
+  m = _LAST_WEEKDAY.search(query) or (_ON_WEEKDAY.search(query) if past else None)
+  if m:
+    back = (today.weekday() - _WEEKDAYS.index(m.group(1).lower())) % 7 or 7
+    day = today - timedelta(days=back)
+    return TimeWindow(day, day)
+
+  if _LAST_WEEKEND.search(query):
+    sunday = today - timedelta(days=(today.weekday() + 1) % 7 or 7)
+    return TimeWindow(sunday - timedelta(days=1), sunday)
+  if _LAST_WEEK.search(query):
+    return TimeWindow(today - timedelta(days=7), yesterday)
+  if _LAST_MONTH.search(query):
+    return TimeWindow(today - timedelta(days=31), yesterday)
+  if past:
+    # Calendar periods run from their first day up to today, so they never miss today's entry
+    if _THIS_WEEK.search(query):
+      return TimeWindow(today - timedelta(days=today.weekday()), today)
+    if _THIS_MONTH.search(query):
+      return TimeWindow(today.replace(day=1), today)
+    if _RECENTLY.search(query):
+      return TimeWindow(today - timedelta(days=7), today)
+
+  if _RECALL.search(query):
+    return TimeWindow(None, None)
+  return None
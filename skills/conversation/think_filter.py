@@ -0,0 +1,99 @@
+"""Incremental <think>…</think> filter for streamed model output.
+
+Reasoning models emit a hidden reasoning block before the answer. _strip_think
+removes it from finished text, but on the streaming paths tokens go straight to
+the WebSocket and the TTS pipeline as they arrive. ThinkFilter sits between the
+model stream and on_token: a two-state machine (visible / thinking) over chunks
+that holds back only as many characters as could be the start of a tag split
+across chunks.
+
+    think = ThinkFilter(on_token, on_thinking=lambda: on_status("Thinking"))
+    async for chunk in llm.astream(messages):
+        think.feed(chunk.content)
+    think.flush()
+    final = think.text
+"""
+
+from collections.abc import Callable
+
+_OPEN = "<think>"
+_CLOSE = "</think>"
+
+
+def _partial_tag_len(buffer: str, tag: str) -> int:
+  """Length of the longest suffix of buffer that is a proper prefix of tag."""
+  for n in range(min(len(tag) - 1, len(buffer)), 0, -1):
+    if buffer.endswith(tag[:n]):
+      return n
+  return 0
+
+
+class ThinkFilter:
+  """Forwards visible text to on_token and suppresses think blocks as they stream."""
+
+  def __init__(self, on_token: Callable[[str], None], on_thinking: Callable[[], None] | None = None):
+    self._on_token = on_token
+    self._on_thinking = on_thinking
+    self._buffer = ""
+    self._thinking = False
+    self._at_start = True  # strip whitespace before the answer and after a think block
+    self._parts: list[str] = []
+    self.think_chunks = 0  # chunks (≈ tokens) that carried only hidden reasoning
+    self.visible_chunks = 0
+
+  @property
+  def text(self) -> str:
+    """Visible text emitted so far."""
+    return "".join(self._parts).strip()
+
+  def feed(self, chunk: str) -> None:
+    if not chunk:
+      return
+    was_thinking = self._thinking
+    self._buffer += chunk
+    emitted = False
+
+    while self._buffer:
+      if self._thinking:
+        end = self._buffer.find(_CLOSE)
+        if end == -1:
+          # Drop reasoning text, but keep a possible split closing tag
+          keep = _partial_tag_len(self._buffer, _CLOSE)
+          self._buffer = self._buffer[len(self._buffer) - keep:]
+          break
+        self._buffer = self._buffer[end + len(_CLOSE):]
+        self._thinking = False
+        self._at_start = True
+      else:
+        start = self._buffer.find(_OPEN)
+        if start == -1:
+          keep = _partial_tag_len(self._buffer, _OPEN)
+          emitted |= self._emit(self._buffer[: len(self._buffer) - keep])
+          self._buffer = self._buffer[len(self._buffer) - keep:]
+          break
+        emitted |= self._emit(self._buffer[:start])
+        self._buffer = self._buffer[start + len(_OPEN):]
+        self._thinking = True
+        if self._on_thinking is not None:
+          self._on_thinking()
+
+    if emitted:
+      self.visible_chunks += 1
+    elif was_thinking or self._thinking:
+      self.think_chunks += 1
+
+  def flush(self) -> None:
+    """Emit any held-back text at end of stream. An unclosed think block is dropped."""
+    if not self._thinking and self._buffer:
+      self._emit(self._buffer)
+    self._buffer = ""
+
+  def _emit(self, text: str) -> bool:
+    if self._at_start:
+      text = text.lstrip()
+    if not text:
+      return False
+    self._at_start = False
+    self._parts.append(text)
+    self._on_token(text)
+    return True
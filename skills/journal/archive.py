@@ -0,0 +1,197 @@
+"""Columnar archive of the conversation log, for offline analysis and replay.
+
+Each day's ConversationEntry documents, with their turn metrics, are written
+to one Parquet file per day:
+
+    $LANGBOX_DATA_DIR/archive/date=YYYY-MM-DD/exchanges.parquet
+
+Like compaction, export is incremental: each file records the exchange count
+it was written from, and a day is only rewritten when its Conversations header
+reports a different count. Loading goes through pyarrow.dataset, so a date
+range only opens the partitions it covers and only the requested columns are
+read.
+
+    table = load_archive(since=date(2026, 9, 1), columns=["skill", "total_ms"])
+    frame = table.to_pandas()
+    chat = stage_ms(table, "route")[table["skill"].to_numpy(zero_copy_only=False) == "CHAT"]
+
+Requires pyarrow (and pandas for .to_pandas()), imported only when used.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from utils.log import logger
+from utils.vector_store import DATA_DIR
+
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+_FILE = "exchanges.parquet"
+_COUNT_KEY = b"langbox.exchange_count"
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            "pyarrow is required for the conversation archive. Install with: uv pip install pyarrow"
+        )
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema([
+        ("timestamp", pa.timestamp("ms")),
+        ("user_id", pa.string()),
+        ("question", pa.string()),
+        ("answer", pa.string()),
+        ("intent", pa.string()),
+        ("skill", pa.string()),
+        ("total_ms", pa.float64()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("stages", pa.map_(pa.string(), pa.float64())),
+        ("cache_hits", pa.map_(pa.string(), pa.int64())),
+    ])
+
+
+def _partition(for_date: date) -> str:
+    return os.path.join(ARCHIVE_DIR, f"date={for_date.isoformat()}", _FILE)
+
+
+def _exported_count(path: str) -> int | None:
+    if not os.path.exists(path):
+        return None
+    pa = _pyarrow()
+    metadata = pa.parquet.read_schema(path).metadata or {}
+    return int(metadata[_COUNT_KEY]) if _COUNT_KEY in metadata else None
+
+
+@dataclass
+class ArchiveReport:
+    exported: list[str] = field(default_factory=list)  # days (re)written
+    unchanged: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+async def _write_day(for_date: date, count: int) -> int:
+    from db.schemas import ConversationEntry
+
+    pa = _pyarrow()
+    docs = await ConversationEntry.get_pymongo_collection().find(
+        {"date": datetime.combine(for_date, datetime.min.time())},
+        {"timestamp": 1, "user_id": 1, "question": 1, "answer": 1, "metrics": 1},
+    ).sort([("timestamp", 1)]).to_list(length=None)
+
+    rows = []
+    for doc in docs:
+        metrics = doc.get("metrics") or {}
+        rows.append({
+            "timestamp": doc["timestamp"],
+            "user_id": doc.get("user_id", "default"),
+            "question": doc["question"],
+            "answer": doc["answer"],
+            "intent": metrics.get("intent"),
+            "skill": metrics.get("skill"),
+            "total_ms": metrics.get("total_ms"),
+            "prompt_tokens": metrics.get("prompt_tokens"),
+            "completion_tokens": metrics.get("completion_tokens"),
+            "stages": list((metrics.get("stages") or {}).items()),
+            "cache_hits": list((metrics.get("cache_hits") or {}).items()),
+        })
+
+    schema = _schema(pa).with_metadata({_COUNT_KEY: str(count).encode()})
+    table = pa.Table.from_pylist(rows, schema=schema)
+    path = _partition(for_date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written aside and renamed, so a reader never sees half a file ("_" files are skipped by load_archive)
+    tmp = os.path.join(os.path.dirname(path), "_" + _FILE + ".tmp")
+    pa.parquet.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(rows)
+
+
+async def export_archive(since: date | None = None, full: bool = False, on_progress=None) -> ArchiveReport:
+    """Write the Parquet partition of every day whose exchange count changed since its last export.
+
+    full=True rewrites every day. on_progress, if given, is called with the
+    report after each day.
+    """
+    from db.schemas import Conversations
+
+    _pyarrow()
+    started = time.monotonic()
+    report = ArchiveReport()
+
+    match = {"exchange_count": {"$gt": 0}}
+    if since is not None:
+        match["date"] = {"$gte": datetime.combine(since, datetime.min.time())}
+    headers = await Conversations.get_pymongo_collection().find(
+        match, {"date": 1, "exchange_count": 1}
+    ).sort([("date", 1)]).to_list(length=None)
+
+    for header in headers:
+        day = header["date"].date()
+        count = header["exchange_count"]
+        if not full and _exported_count(_partition(day)) == count:
+            report.unchanged += 1
+            continue
+        report.rows += await _write_day(day, count)
+        report.exported.append(day.isoformat())
+        if on_progress is not None:
+            on_progress(report)
+
+    report.seconds = round(time.monotonic() - started, 1)
+    logger.info(
+        f"[archive] {len(report.exported)} day(s) exported ({report.rows} rows), "
+        f"{report.unchanged} unchanged in {report.seconds}s"
+    )
+    return report
+
+
+def load_archive(
+    since: date | None = None,
+    until: date | None = None,
+    columns: list[str] | None = None,
+):
+    """The archived exchanges in [since, until] as a pyarrow Table, with a "date" column.
+
+    Only partitions inside the range are opened and only the given columns read.
+    """
+    pa = _pyarrow()
+    ds = pa.dataset
+    if not os.path.isdir(ARCHIVE_DIR):
+        return _schema(pa).empty_table()
+
+    dataset = ds.dataset(
+        ARCHIVE_DIR,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+    )
+    condition = None
+    if since is not None:
+        condition = ds.field("date") >= since.isoformat()
+    if until is not None:
+        upper = ds.field("date") <= until.isoformat()
+        condition = upper if condition is None else condition & upper
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def stage_ms(table, stage: str):
+    """A stage's duration per exchange as a float NumPy array (NaN where it did not run)."""
+    import pyarrow.compute as pc
+
+    values = pc.map_lookup(table["stages"], stage, "first")
+    return values.to_numpy(zero_copy_only=False)
+
+
+def replay_queries(since: date | None = None, until: date | None = None, intent: str | None = None) -> list[str]:
+    """Archived user queries in time order, optionally for one intent — input for benchmark replays."""
+    table = load_archive(since, until, columns=["date", "timestamp", "question", "intent"])
+    rows = sorted(table.to_pylist(), key=lambda row: row["timestamp"])
+    return [row["question"] for row in rows if intent is None or row["intent"] == intent]
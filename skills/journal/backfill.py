@@ -0,0 +1,217 @@
+"""Catch up compaction, journal writing and journal indexing over many days.
+
+Each day is a dependency chain — compact (fold new exchanges into the day's
+summary) → write the Journal entry → index it — and days run concurrently, at
+most BACKFILL_CONCURRENCY at a time, each model step waiting for the
+assistant to be idle first (utils/idle.py).
+
+What a day needs is read from the database, not from a progress file:
+
+- compaction, when the day has ConversationEntry rows not yet flagged
+  compacted — found from the entries themselves, so a day whose Conversations
+  header was never written (a flusher that died between the two writes) is
+  still caught, and its header created before it is claimed;
+- a journal entry, when none exists or it was written from an older summary
+  (Journal.written_through differs from compacted_through).
+
+Every step records its own result, so an interrupted backfill simply finds
+less to do when run again, and a finished one finds nothing.
+"""
+
+import asyncio
+import inspect
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from utils.log import logger
+
+BACKFILL_CONCURRENCY = int(os.environ.get("BACKFILL_CONCURRENCY", 2))
+
+_lock: asyncio.Lock | None = None
+
+
+@dataclass
+class BackfillDay:
+    date: date
+    compact: bool
+    journal: bool
+    has_header: bool = True
+
+
+@dataclass
+class BackfillReport:
+    days: int = 0
+    compacted: int = 0
+    journaled: int = 0
+    skipped: list[str] = field(default_factory=list)  # days already being compacted elsewhere
+    failed: dict[str, str] = field(default_factory=dict)  # date → error
+    seconds: float = 0.0
+
+
+def _as_datetime(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+async def find_backlog(since: date | None = None, until: date | None = None, full: bool = False) -> list[BackfillDay]:
+    """Days in [since, until] that need compaction or a journal entry, oldest first.
+
+    full=True also rewrites every existing journal entry (e.g. after a model change).
+    """
+    from db.schemas import ConversationEntry, Conversations, Journal
+
+    window = {}
+    if since is not None:
+        window["$gte"] = _as_datetime(since)
+    if until is not None:
+        window["$lte"] = _as_datetime(until)
+    match = {"date": window} if window else {}
+
+    # Days with exchanges not yet folded into their summary — a walk over the (compacted, date) index
+    uncompacted = {
+        doc["_id"]
+        async for doc in await ConversationEntry.get_pymongo_collection().aggregate([
+            {"$match": {"compacted": {"$ne": True}, **match}},
+            {"$group": {"_id": "$date"}},
+        ])
+    }
+    headers = {
+        doc["date"]: doc
+        for doc in await Conversations.get_pymongo_collection().find(
+            match, {"date": 1, "compacted": 1, "compacted_through": 1}
+        ).to_list(length=None)
+    }
+    journals = {
+        doc["datestamp"]: doc.get("written_through")
+        for doc in await Journal.get_pymongo_collection().find(
+            {"datestamp": window} if window else {}, {"datestamp": 1, "written_through": 1}
+        ).to_list(length=None)
+    }
+
+    backlog = []
+    for day in headers.keys() | uncompacted:
+        header = headers.get(day, {})
+        compact = day in uncompacted
+        if not compact and not header.get("compacted"):
+            continue  # nothing to summarise, so nothing to journal
+        if day not in journals:
+            journal = True
+        else:
+            # Entries written before the watermark existed carry no written_through; leave them unless full
+            written = journals[day]
+            journal = compact or full or (written is not None and written != header.get("compacted_through"))
+        if compact or journal:
+            backlog.append(BackfillDay(day.date(), compact, journal, has_header=day in headers))
+    backlog.sort(key=lambda d: d.date)
+    return backlog
+
+
+async def _ensure_header(for_date: date) -> None:
+    """Create the day's Conversations header from its entries if the log flusher never wrote it."""
+    from beanie.operators import Max
+    from pymongo.errors import DuplicateKeyError
+
+    from db.schemas import ConversationEntry, Conversations
+
+    count = await ConversationEntry.find(ConversationEntry.date == for_date).count()
+    update = Max({Conversations.exchange_count: count})
+    try:
+        await Conversations.find_one(Conversations.date == for_date).upsert(
+            update, on_insert=Conversations(date=for_date, exchange_count=count),
+        )
+    except DuplicateKeyError:
+        # The log flusher created it in the meantime
+        await Conversations.find_one(Conversations.date == for_date).update(update)
+        return
+    logger.info(f"[backfill] {for_date} had exchanges but no header — created one ({count} exchanges)")
+
+
+async def _run_day(day: BackfillDay, report: BackfillReport, emit) -> None:
+    from db.versions import CONVERSATIONS, bump_version
+    from skills.journal.compact import claim_compaction, compact_conversations
+    from skills.journal.journal_writer import write_journal_entry
+    from utils.idle import wait_until_idle
+    from utils.journal_index import index_journal_entry
+
+    stamp = day.date.isoformat()
+    try:
+        if day.compact:
+            await wait_until_idle()
+            if not day.has_header:
+                await _ensure_header(day.date)
+            if not await claim_compaction(day.date):
+                report.skipped.append(stamp)
+                await emit(stamp, "compact", "skipped")
+                return
+            await bump_version(CONVERSATIONS)
+            await emit(stamp, "compact", "running")
+            await compact_conversations(day.date)
+            report.compacted += 1
+
+        await wait_until_idle()
+        await emit(stamp, "journal", "running")
+        narrative = await write_journal_entry(day.date, index=False)
+        report.journaled += 1
+
+        await emit(stamp, "index", "running")
+        await asyncio.to_thread(index_journal_entry, day.date, narrative)
+        await emit(stamp, "done", "complete")
+    except Exception as e:
+        logger.error(f"[backfill] {stamp} failed: {e}")
+        report.failed[stamp] = str(e)
+        await emit(stamp, "failed", "error", error=str(e))
+
+
+async def run_backfill(
+    since: date | None = None,
+    until: date | None = None,
+    full: bool = False,
+    on_progress=None,
+) -> BackfillReport:
+    """Process every day find_backlog returns. Only one backfill runs at a time.
+
+    on_progress, if given, is called (and awaited when it returns an awaitable)
+    with an event dict: {"date", "step", "status", "done", "total"} plus
+    "error" for failures. Raises RuntimeError if a backfill is already running.
+    """
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    if _lock.locked():
+        raise RuntimeError("a backfill is already running")
+
+    async with _lock:
+        started = time.monotonic()
+        report = BackfillReport()
+        backlog = await find_backlog(since, until, full)
+        report.days = len(backlog)
+        logger.info(f"[backfill] {len(backlog)} day(s) to process, {BACKFILL_CONCURRENCY} at a time")
+        finished = 0
+
+        async def emit(stamp: str, step: str, status: str, **extra) -> None:
+            nonlocal finished
+            if status in ("complete", "error", "skipped"):
+                finished += 1
+            if on_progress is None:
+                return
+            result = on_progress({
+                "date": stamp, "step": step, "status": status, "done": finished, "total": len(backlog), **extra,
+            })
+            if inspect.isawaitable(result):
+                await result
+
+        semaphore = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+
+        async def bounded(day: BackfillDay) -> None:
+            async with semaphore:
+                await _run_day(day, report, emit)
+
+        await asyncio.gather(*(bounded(day) for day in backlog))
+
+        report.seconds = round(time.monotonic() - started, 1)
+        logger.info(
+            f"[backfill] Done in {report.seconds}s: {report.compacted} compacted, "
+            f"{report.journaled} journaled, {len(report.failed)} failed"
+        )
+        return report
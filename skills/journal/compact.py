@@ -1,10 +1,14 @@
 """Compact a day's conversation exchanges into a plain-language summary."""
 
 import os
-from datetime import date
+from datetime import date, datetime, timedelta
+
+from beanie.operators import In, Set
 
 from agents.persona import AGENT_NAME
-from db.schemas import Conversations
+from db.schemas import ConversationEntry, Conversations
+from db.versions import CONVERSATIONS, bump_version
+from skills.journal.conversation_log import get_exchanges
 from utils.log import logger
 
 _COMPACT_PROMPT = f"""You are summarising a day's conversation log between a user and their personal assistant {AGENT_NAME}.
@@ -13,36 +17,123 @@ decisions made, and anything the user expressed interest in or asked to follow u
 Be specific — include names, numbers, and topics mentioned. Do not add commentary or opinions."""
 
 _COMPACT_APPEND_PROMPT = f"""You are updating a running summary of a day's conversation between a user and their personal assistant {AGENT_NAME}.
-You have a previous summary and a full conversation log. Produce a single updated summary (3-10 sentences) that incorporates
+You have the previous summary and the exchanges that happened since it was written. Produce a single updated summary (3-10 sentences) that incorporates
 any new topics, decisions, or details not already covered by the previous summary.
 Keep all existing facts. Add new ones. Do not repeat yourself. Write in third person. No commentary or opinions."""
 
+_CHUNK_PROMPT = f"""You are taking notes on one part of a day's conversation log between a user and their personal assistant {AGENT_NAME}.
+Write concise, factual notes (2-6 sentences) in third person covering the topics, decisions, names, and numbers in this part.
+Do not add commentary or opinions."""
 
-async def compact_conversations(for_date: date) -> str:
-    """Summarise exchanges for the given date, save back to the document, and return the summary.
+# A delta longer than this is summarised in chunks first (map), then the notes are folded in (reduce).
+CHUNK_CHARS = int(os.environ.get("COMPACT_CHUNK_CHARS", 12000))
+# A "pending" claim older than this is taken to belong to a run that died and may be taken over.
+LEASE_SECONDS = int(os.environ.get("COMPACT_LEASE_SECONDS", 1800))
+
+
+def _format_log(exchanges: list) -> str:
+    lines = []
+    for ex in exchanges:
+        ts = ex.timestamp.strftime("%H:%M")
+        lines.append(f"[{ts}] User: {ex.question}")
+        lines.append(f"[{ts}] {AGENT_NAME}: {ex.answer}")
+    return "\n".join(lines)
+
+
+def _chunk(exchanges: list) -> list[list]:
+    """Split exchanges into consecutive runs whose log fits CHUNK_CHARS (a single huge exchange stands alone)."""
+    chunks, current, size = [], [], 0
+    for ex in exchanges:
+        length = len(ex.question) + len(ex.answer) + 40
+        if current and size + length > CHUNK_CHARS:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(ex)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _summarise(llm, system: str, content: str) -> str:
+    from langchain_core.messages import HumanMessage, SystemMessage
 
-    If a previous summary exists, merges it with the full log into an updated summary.
-    Raises ValueError for missing/empty documents.
+    response = await llm.ainvoke([SystemMessage(content=system), HumanMessage(content=content)])
+    return response.content.strip()
+
+
+async def claim_compaction(for_date: date) -> bool:
+    """Mark the day's compaction pending unless another run holds a live claim.
+
+    The check and the write are one update, so /compact and /backfill cannot
+    both claim a day. A claim older than LEASE_SECONDS is expired rather than
+    honoured, so a process killed mid-compaction does not block the day forever.
+    Returns False when the day has no header or is already claimed.
+    """
+    from beanie.operators import Or
+
+    now = datetime.now()
+    result = await Conversations.find_one(
+        Conversations.date == for_date,
+        Or(
+            Conversations.compact_status != "pending",
+            Conversations.pending_since == None,  # noqa: E711 — claims made before the lease existed
+            Conversations.pending_since < now - timedelta(seconds=LEASE_SECONDS),
+        ),
+    ).update(Set({Conversations.compact_status: "pending", Conversations.pending_since: now}))
+    return result.modified_count == 1
+
+
+async def _analyse_persona(for_date: date) -> None:
+    """Run persona extraction over the day's exchanges not yet analysed, compacted or not.
+
+    Persona keeps its own per-entry progress (persona_analysed), so a failure is
+    logged and retried on the next compaction of the day — a day whose persona
+    the model cannot parse must not block its summary, journal and index.
+    """
+    from skills.personalizer.skill import analyze_persona_from_log
+
+    try:
+        exchanges = await ConversationEntry.find(
+            ConversationEntry.date == for_date, {"persona_analysed": {"$ne": True}}
+        ).sort(+ConversationEntry.timestamp).to_list()
+        if exchanges:
+            await analyze_persona_from_log(exchanges)
+    except Exception as e:
+        logger.warning(f"[compact] Persona analysis failed for {for_date}, continuing: {e}")
+
+
+async def compact_conversations(for_date: date) -> str:
+    """Fold the exchanges added since the last compaction into the day's summary and return it.
+
+    Each ConversationEntry is flagged compacted once it has been folded in, so
+    each run reads and sends only the unflagged exchanges together with the
+    previous summary — its cost follows new activity, not the size of the day.
+    The flag marks exactly the rows that were read, so an exchange inserted
+    late by another process's write-behind flusher, or replayed from a spool,
+    is picked up by the next run rather than skipped by a timestamp watermark.
+    A delta longer than CHUNK_CHARS is first summarised chunk by chunk and the
+    chunk notes are folded in instead.
+
+    Returns the existing summary unchanged when nothing new has been logged.
+    Raises ValueError for missing/empty documents (status is reset to 'idle' first).
     Raises RuntimeError if the LLM call fails (status is set to 'error' before raising).
     """
     doc = await Conversations.find_one(Conversations.date == for_date)
     if doc is None:
         raise ValueError(f"No conversations document found for {for_date}")
-    if not doc.exchanges:
+    await _analyse_persona(for_date)
+    exchanges = await get_exchanges(for_date, uncompacted=True)
+    if not exchanges:
+        if doc.compacted:
+            await doc.set({Conversations.compact_status: "complete"})
+            await bump_version(CONVERSATIONS)
+            return doc.compacted
+        await doc.set({Conversations.compact_status: "idle"})
+        await bump_version(CONVERSATIONS)
         raise ValueError(f"No exchanges to compact for {for_date}")
 
     try:
-        from skills.personalizer.skill import analyze_persona_from_log
-        await analyze_persona_from_log(doc.exchanges)
-
-        lines = [f"Conversation log for {for_date}:"]
-        for ex in doc.exchanges:
-            ts = ex.timestamp.strftime("%H:%M")
-            lines.append(f"[{ts}] User: {ex.question}")
-            lines.append(f"[{ts}] {AGENT_NAME}: {ex.answer}")
-        log_text = "\n".join(lines)
-
-        from langchain_core.messages import HumanMessage, SystemMessage
         from agents.agent_factory import create_llm
 
         llm = create_llm(
@@ -54,31 +145,43 @@ async def compact_conversations(for_date: date) -> str:
             repeat_penalty=1,
         )
 
-        if doc.compacted:
-            system = _COMPACT_APPEND_PROMPT
-            user_content = f"## Previous summary\n{doc.compacted}\n\n## Full conversation log\n{log_text}"
+        chunks = _chunk(exchanges)
+        if len(chunks) == 1:
+            delta = f"Conversation log for {for_date}:\n{_format_log(exchanges)}"
         else:
-            system = _COMPACT_PROMPT
-            user_content = log_text
-
-        response = await llm.ainvoke([
-            SystemMessage(content=system),
-            HumanMessage(content=user_content),
-        ])
-        summary = response.content.strip()
-
-        doc.compacted = summary
-        doc.compact_status = "complete"
-        await doc.save()
-        logger.info(f"[compact] Compacted {len(doc.exchanges)} exchanges for {for_date}")
-
-        from skills.conversation.skill import reset_session
-        reset_session()
+            # Map: notes per chunk. Reduce: the notes stand in for the raw log below.
+            notes = []
+            for i, chunk in enumerate(chunks, 1):
+                notes.append(await _summarise(llm, _CHUNK_PROMPT, f"Part {i} of {len(chunks)}:\n{_format_log(chunk)}"))
+            delta = "Notes on the conversation, in order:\n" + "\n\n".join(notes)
+            logger.debug(f"[compact] {len(exchanges)} new exchanges summarised in {len(chunks)} chunks")
 
+        if doc.compacted:
+            summary = await _summarise(
+                llm, _COMPACT_APPEND_PROMPT, f"## Previous summary\n{doc.compacted}\n\n## Since then\n{delta}",
+            )
+        else:
+            summary = await _summarise(llm, _COMPACT_PROMPT, delta)
+
+        # Targeted $set — the log flusher updates exchange_count on the same document concurrently
+        through = max(ex.timestamp for ex in exchanges)
+        if doc.compacted_through is not None:
+            through = max(through, doc.compacted_through)
+        await doc.set({
+            Conversations.compacted: summary,
+            Conversations.compacted_through: through,
+            Conversations.compact_status: "complete",
+        })
+        # After the summary is saved: a crash in between re-folds these, it never drops them
+        await ConversationEntry.find(In(ConversationEntry.id, [ex.id for ex in exchanges])).update(
+            Set({ConversationEntry.compacted: True})
+        )
+        await bump_version(CONVERSATIONS)
+        logger.info(f"[compact] Folded {len(exchanges)} new exchanges into the summary for {for_date}")
         return summary
 
     except Exception as e:
         logger.error(f"[compact] Failed for {for_date}: {e}")
-        doc.compact_status = "error"
-        await doc.save()
+        await doc.set({Conversations.compact_status: "error"})
+        await bump_version(CONVERSATIONS)
         raise RuntimeError(str(e)) from e
@@ -0,0 +1,212 @@
+"""Write-behind logging of exchanges to the ConversationEntries collection.
+
+Logging used to load the day's document, append in Python and save the whole
+array back — on the response path, with a cost that grew through the day and
+a lost-update race between the CLI, Telegram and API writers. Now
+log_exchange() only queues the exchange in memory. A background flusher
+inserts everything queued since its last run as individual ConversationEntry
+documents, shortly after the reply has gone out, and upserts each day's
+Conversations header (compaction state, exchange count).
+
+Each exchange gets its ObjectId when it is queued, so replaying a batch after a
+partial failure cannot log it twice.
+
+If MongoDB is unavailable the unwritten exchanges are kept in a JSONL spool
+under LANGBOX_DATA_DIR and replayed before the next flush, so they survive
+outages and restarts.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime
+
+from utils.log import logger
+from utils.vector_store import DATA_DIR
+
+# Exchanges arriving within this window are written together.
+FLUSH_DELAY_SECONDS = float(os.environ.get("CONVERSATION_FLUSH_SECONDS", 2))
+SPOOL_PATH = os.path.join(DATA_DIR, "conversation_spool.jsonl")
+_RETRY_SECONDS = 30
+
+_pending: list[dict] = []
+_wake: asyncio.Event | None = None
+_worker: asyncio.Task | None = None
+_flush_lock: asyncio.Lock | None = None
+
+
+def log_exchange(question: str, answer: str, user_id: str = "default", metrics: dict | None = None) -> None:
+    """Queue an exchange for today's conversation log. Returns immediately."""
+    from bson import ObjectId
+
+    _pending.append({
+        "id": str(ObjectId()),
+        "timestamp": datetime.now().isoformat(),
+        "question": question,
+        "answer": answer,
+        "user_id": user_id,
+        "metrics": metrics,
+    })
+    _ensure_worker()
+    _wake.set()
+
+
+async def start_conversation_log() -> str:
+    """Start the flusher and replay exchanges spooled by a previous run."""
+    _ensure_worker()
+    spooled = len(_read_spool())
+    if spooled:
+        _wake.set()
+        return f"[journal] Conversation log started ({spooled} spooled exchanges to replay)."
+    return "[journal] Conversation log started."
+
+
+async def flush_conversation_log() -> int:
+    """Write spooled and queued exchanges now. Returns how many were written (0 on failure)."""
+    global _flush_lock
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+
+    async with _flush_lock:
+        batch = _pending[:]
+        del _pending[:]
+        spooled = _read_spool()
+        if not spooled and not batch:
+            return 0
+
+        by_day = defaultdict(list)
+        for entry in spooled + batch:
+            by_day[entry["timestamp"][:10]].append(entry)
+        written = []
+        for day in sorted(by_day):
+            try:
+                await _append(by_day[day])
+            except Exception as e:
+                unwritten = [entry for d in sorted(by_day) if d >= day for entry in by_day[d]]
+                logger.warning(f"[journal] Could not write {len(unwritten)} exchanges, spooling: {e}")
+                _replace_spool(unwritten)
+                break
+            written.extend(by_day[day])
+        else:
+            if spooled:
+                os.remove(SPOOL_PATH)
+
+    # Facts are extracted into mem0 later, in idle-time batches (see memory_backlog.py)
+    for entry in written:
+        await _store_memory(entry["question"], entry["answer"], entry["user_id"])
+    return len(written)
+
+
+def _ensure_worker() -> None:
+    global _wake, _worker
+    if _wake is None:
+        _wake = asyncio.Event()
+    if _worker is None or _worker.done():
+        # A fresh context: the worker outlives the request that starts it, so it must not
+        # inherit that request's session or turn metrics
+        _worker = asyncio.create_task(_work(), context=contextvars.Context())
+
+
+async def _work() -> None:
+    while True:
+        await _wake.wait()
+        _wake.clear()
+        # Let the reply go out and any burst of turns collect before writing
+        await asyncio.sleep(FLUSH_DELAY_SECONDS)
+        written = await flush_conversation_log()
+        if not written and os.path.exists(SPOOL_PATH):
+            await asyncio.sleep(_RETRY_SECONDS)
+            _wake.set()
+
+
+async def get_exchanges(for_date: date, uncompacted: bool = False) -> list:
+    """A day's ConversationEntry documents in time order, optionally only those not yet compacted.
+
+    A range scan over the (date, timestamp) index.
+    """
+    from db.schemas import ConversationEntry
+
+    query = ConversationEntry.find(ConversationEntry.date == for_date)
+    if uncompacted:
+        # Entries logged before the flag existed have no field at all
+        query = query.find({"compacted": {"$ne": True}})
+    return await query.sort(+ConversationEntry.timestamp).to_list()
+
+
+async def _append(entries: list[dict]) -> None:
+    """Insert one day's entries and upsert its Conversations header. Safe to replay."""
+    from beanie import PydanticObjectId
+    from beanie.operators import Max
+    from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+    from db.schemas import ConversationEntry, Conversations
+    from db.versions import CONVERSATIONS, bump_version
+
+    docs = []
+    for e in entries:
+        moment = datetime.fromisoformat(e["timestamp"])
+        docs.append(ConversationEntry(
+            id=PydanticObjectId(e["id"]) if e.get("id") else None,
+            date=moment.date(),
+            timestamp=moment,
+            question=e["question"],
+            answer=e["answer"],
+            user_id=e.get("user_id", "default"),
+            metrics=e.get("metrics"),
+        ))
+    day = docs[0].date
+    try:
+        await ConversationEntry.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        # Entries already written by an earlier, partly failed flush are fine
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+    count = await ConversationEntry.find(ConversationEntry.date == day).count()
+    # $max keeps the count monotonic when several processes flush the same day
+    update = Max({Conversations.exchange_count: count})
+    try:
+        await Conversations.find_one(Conversations.date == day).update(update, upsert=True)
+    except DuplicateKeyError:
+        # Lost the race to create the day's header — it exists now, so update it
+        await Conversations.find_one(Conversations.date == day).update(update)
+    await bump_version(CONVERSATIONS)
+    logger.debug(f"[journal] logged {len(entries)} exchanges for {day}")
+
+
+async def _store_memory(question: str, answer: str, user_id: str) -> None:
+    try:
+        from skills.journal.memory_backlog import enqueue_exchange
+        await enqueue_exchange(question, answer, user_id)
+    except Exception:
+        logger.exception("[journal] Failed to queue memory extraction")
+
+
+def _read_spool() -> list[dict]:
+    if not os.path.exists(SPOOL_PATH):
+        return []
+    entries = []
+    with open(SPOOL_PATH) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning("[journal] Skipping corrupt spool line")  # e.g. torn by a crash mid-write
+    return entries
+
+
+def _replace_spool(entries: list[dict]) -> None:
+    """Atomically replace the spool with exactly these entries."""
+    os.makedirs(os.path.dirname(SPOOL_PATH), exist_ok=True)
+    tmp = SPOOL_PATH + ".tmp"
+    with open(tmp, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, SPOOL_PATH)
@@ -4,8 +4,12 @@ import asyncio
 import os
 from datetime import date
 
+from beanie.operators import Set
+from pymongo.errors import DuplicateKeyError
+
 from agents.persona import AGENT_NAME
 from db.schemas import Conversations, Journal
+from db.versions import JOURNAL, bump_version
 from utils.log import logger
 
 _JOURNAL_PROMPT = f"""You are {AGENT_NAME}, a personal AI assistant. Write a short journal entry (3-6 sentences)
@@ -14,11 +18,12 @@ Be warm, reflective, and curious. Reference the user by name if you know it.
 Note anything interesting, surprising, or worth remembering. Write naturally — this is your private journal."""
 
 
-async def write_journal_entry(for_date: date) -> str:
+async def write_journal_entry(for_date: date, index: bool = True) -> str:
     """Write AIDA's first-person journal entry for the given date.
 
     Reads Conversations.compacted, calls the LLM, saves a Journal document,
-    then fires persona analysis in the background.
+    then indexes it for semantic search in the background (index=False leaves
+    indexing to the caller).
 
     Returns the journal summary string.
     """
@@ -43,18 +48,23 @@ async def write_journal_entry(for_date: date) -> str:
     ])
     narrative = response.content.strip()
 
-    existing = await Journal.find_one(Journal.datestamp == for_date)
-    if existing is None:
-        await Journal(datestamp=for_date, summary=narrative).insert()
-    else:
-        existing.summary = narrative
-        await existing.save()
+    fields = {Journal.summary: narrative, Journal.written_through: doc.compacted_through}
+    entry = Journal.find_one(Journal.datestamp == for_date)
+    try:
+        await entry.upsert(
+            Set(fields),
+            on_insert=Journal(datestamp=for_date, summary=narrative, written_through=doc.compacted_through),
+        )
+    except DuplicateKeyError:
+        # A concurrent /compact or /backfill wrote the day's entry first — overwrite it
+        await entry.update(Set(fields))
 
+    await bump_version(JOURNAL)
     logger.info(f"[journal] Written entry for {for_date}")
 
     # Index in Qdrant for semantic journal search (fire-and-forget)
-    import asyncio
-    asyncio.create_task(_index_journal(for_date, narrative))
+    if index:
+        asyncio.create_task(_index_journal(for_date, narrative))
 
     return narrative
 
@@ -0,0 +1,204 @@
+"""Idle-time, batched mem0 fact extraction.
+
+Every mem0 add() is a full extraction generation plus a dedup pass on the local
+model. Running one per exchange makes memory writes compete with the next live
+query. Instead, exchanges that carry a personal signal are written to the
+MemoryBacklog collection (so nothing is lost on restart) and a background worker
+drains it once the model is idle, extracting facts from BATCH_TURNS exchanges
+per mem0 call.
+
+A batch whose extraction fails is retried with exponential backoff while the
+worker moves on to other exchanges, so one bad batch cannot stall everyone
+else's. After MAX_ATTEMPTS failures its exchanges are dead-lettered: left in
+the collection with their last error for inspection, but never retried.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from datetime import datetime, timedelta
+
+from utils.log import logger
+
+BATCH_TURNS = int(os.environ.get("MEMORY_BATCH_TURNS", 6))
+# Drain a partial batch after this long even if fewer than BATCH_TURNS are waiting.
+MAX_WAIT_SECONDS = int(os.environ.get("MEMORY_BATCH_MAX_WAIT", 300))
+MAX_ATTEMPTS = int(os.environ.get("MEMORY_MAX_ATTEMPTS", 5))
+_RETRY_SECONDS = 60  # first backoff after a failure, doubled for each further one
+
+_wake: asyncio.Event | None = None
+_worker: asyncio.Task | None = None
+
+_stats = {
+    "queued": 0,  # exchanges written to the backlog this run
+    "skipped": 0,  # exchanges dropped by the personal-signal pre-filter
+    "processed": 0,  # exchanges extracted
+    "batches": 0,
+    "failures": 0,
+    "dead_lettered": 0,  # exchanges set aside after MAX_ATTEMPTS failures this run
+    "last_batch_seconds": None,
+    "last_batch_at": None,
+}
+
+
+# Rows not dead-lettered ("attempts" is missing on rows queued before it existed)
+_LIVE = {"attempts": {"$not": {"$gte": MAX_ATTEMPTS}}}
+
+
+def _due() -> dict:
+    """Live rows whose backoff, if any, has passed."""
+    return {**_LIVE, "retry_at": {"$not": {"$gt": datetime.now()}}}
+
+
+def _has_personal_signal(question: str) -> bool:
+    from skills.personalizer.skill import _PERSONAL_SIGNAL
+
+    return bool(_PERSONAL_SIGNAL.search(question))
+
+
+async def enqueue_exchange(question: str, answer: str, user_id: str = "default") -> None:
+    """Queue an exchange for fact extraction, unless it carries no personal signal."""
+    if not _has_personal_signal(question):
+        _stats["skipped"] += 1
+        return
+
+    from db.schemas import PendingMemory
+
+    await PendingMemory(user_id=user_id, question=question, answer=answer, created_at=datetime.now()).insert()
+    _stats["queued"] += 1
+    _ensure_worker()
+    _wake.set()
+
+
+async def start_memory_backlog() -> str:
+    """Start the extraction worker; exchanges left from a previous run are picked up."""
+    from db.schemas import PendingMemory
+
+    _ensure_worker()
+    try:
+        pending = await PendingMemory.find(_LIVE).count()
+    except Exception as e:
+        logger.warning(f"[memory_backlog] Could not count backlog: {e}")
+        return "[memory] Extraction worker started."
+    if pending:
+        _wake.set()
+        return f"[memory] Extraction worker started ({pending} exchanges waiting)."
+    return "[memory] Extraction worker started."
+
+
+async def get_backlog_stats() -> dict:
+    """Backlog size and throughput counters for this process."""
+    from db.schemas import PendingMemory
+
+    stats = dict(_stats)
+    try:
+        stats["pending"] = await PendingMemory.find(_LIVE).count()
+        stats["dead"] = await PendingMemory.find({"attempts": {"$gte": MAX_ATTEMPTS}}).count()
+        oldest = await PendingMemory.find(_LIVE).sort(+PendingMemory.created_at).first_or_none()
+        stats["oldest_age_seconds"] = (datetime.now() - oldest.created_at).total_seconds() if oldest else None
+    except Exception as e:
+        logger.warning(f"[memory_backlog] Could not read backlog: {e}")
+        stats["pending"] = None
+        stats["dead"] = None
+        stats["oldest_age_seconds"] = None
+    return stats
+
+
+def _ensure_worker() -> None:
+    global _wake, _worker
+    if _wake is None:
+        _wake = asyncio.Event()
+    if _worker is None or _worker.done():
+        # A fresh context: the worker outlives the request that starts it, so it must not
+        # inherit that request's session or turn metrics
+        _worker = asyncio.create_task(_work(), context=contextvars.Context())
+
+
+async def _work() -> None:
+    from utils.idle import wait_until_idle
+
+    while True:
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=MAX_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+        try:
+            while await _ready():
+                await wait_until_idle()
+                if not await _drain_one_batch():
+                    break
+        except Exception:
+            _stats["failures"] += 1
+            logger.exception("[memory_backlog] could not read the backlog — will retry")
+            await asyncio.sleep(_RETRY_SECONDS)
+            _wake.set()
+
+
+async def _ready() -> bool:
+    """A full batch is due, or the oldest due exchange has waited long enough."""
+    from db.schemas import PendingMemory
+
+    oldest = await PendingMemory.find(_due()).sort(+PendingMemory.created_at).first_or_none()
+    if oldest is None:
+        return False
+    if (datetime.now() - oldest.created_at).total_seconds() >= MAX_WAIT_SECONDS:
+        return True
+    return await PendingMemory.find(_due()).count() >= BATCH_TURNS
+
+
+async def _drain_one_batch() -> bool:
+    """Extract facts from the oldest due batch of one user's exchanges. False if none is due."""
+    from beanie.operators import In
+
+    from db.schemas import PendingMemory
+    from utils.memory_client import add_exchanges
+
+    oldest = await PendingMemory.find(_due()).sort(+PendingMemory.created_at).first_or_none()
+    if oldest is None:
+        return False
+    batch = await (
+        PendingMemory.find(_due(), PendingMemory.user_id == oldest.user_id)
+        .sort(+PendingMemory.created_at)
+        .limit(BATCH_TURNS)
+        .to_list()
+    )
+
+    started = time.monotonic()
+    try:
+        await asyncio.to_thread(add_exchanges, [(p.question, p.answer) for p in batch], oldest.user_id)
+    except Exception as e:
+        await _record_failure(batch, e)
+        return True
+    # Only remove once extraction has succeeded, so a crash mid-batch retries it
+    await PendingMemory.find(In(PendingMemory.id, [p.id for p in batch])).delete()
+
+    elapsed = time.monotonic() - started
+    _stats["processed"] += len(batch)
+    _stats["batches"] += 1
+    _stats["last_batch_seconds"] = round(elapsed, 2)
+    _stats["last_batch_at"] = datetime.now().isoformat(timespec="seconds")
+    logger.debug(f"[memory_backlog] extracted {len(batch)} exchanges for '{oldest.user_id}' in {elapsed:.1f}s")
+    return True
+
+
+async def _record_failure(batch: list, error: Exception) -> None:
+    """Count a failed extraction on each exchange and back it off, or dead-letter it at MAX_ATTEMPTS."""
+    _stats["failures"] += 1
+    user_id = batch[0].user_id
+    dead = 0
+    for p in batch:
+        attempts = p.attempts + 1
+        if attempts >= MAX_ATTEMPTS:
+            dead += 1
+        retry_at = datetime.now() + timedelta(seconds=_RETRY_SECONDS * 2 ** (attempts - 1))
+        await p.set({"attempts": attempts, "retry_at": retry_at, "last_error": str(error)[:500]})
+    _stats["dead_lettered"] += dead
+    if dead:
+        logger.error(
+            f"[memory_backlog] {dead} exchange(s) for '{user_id}' failed {MAX_ATTEMPTS} times — dead-lettered: {error}"
+        )
+    else:
+        logger.warning(f"[memory_backlog] batch of {len(batch)} for '{user_id}' failed, backing off: {error}")
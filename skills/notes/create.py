@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 from utils.log import logger
 
 from db.schemas import Note, NoteCategory
+from db.versions import NOTES, bump_version
 from utils.llm_structured_output import generate_structured_output
 
 
@@ -46,6 +47,7 @@ async def handle_create_note(query: str) -> str:
         category=extracted.category,
     )
     await note.insert()
+    await bump_version(NOTES)
 
     tag = f" [{extracted.category}]" if extracted.category else ""
     logger.debug(f"[notes] created '{extracted.title}'{tag}")
@@ -61,6 +63,7 @@ async def handle_create_note_from_context(title: str, content: str, category: Op
         category=category,
     )
     await note.insert()
+    await bump_version(NOTES)
 
     tag = f" [{category}]" if category else ""
     logger.debug(f"[notes] created from context '{title}'{tag}")
@@ -5,6 +5,8 @@ import re
 from utils.log import logger
 
 from db.schemas import Note
+from db.versions import NOTES, bump_version
+from skills.notes.search import search_notes
 
 
 async def handle_delete_note(query: str) -> str:
@@ -18,18 +20,27 @@ async def handle_delete_note(query: str) -> str:
     if not search:
         return "Please specify which note you'd like to delete."
 
+    # Deleting is destructive, so only a title match counts — never a content or fuzzy guess
     notes = await Note.find(
-        {"title": {"$regex": search, "$options": "i"}}
+        {"title": {"$regex": re.escape(search), "$options": "i"}}
     ).to_list()
 
     if not notes:
+        hits = await search_notes(search, limit=5)
+        if hits:
+            suggestions = ", ".join(f'"{h.title}"' for h in hits)
+            return f"No note titled \"{search}\". Did you mean: {suggestions}? Say the title to delete it."
         return f"No note found matching \"{search}\"."
 
     if len(notes) > 1:
-        matches = ", ".join(f'"{n.title}"' for n in notes[:5])
-        return f"Multiple notes match \"{search}\": {matches}. Please be more specific."
+        exact = [n for n in notes if n.title.lower() == search.lower()]
+        if len(exact) != 1:
+            matches = ", ".join(f'"{n.title}"' for n in notes[:5])
+            return f"Multiple notes match \"{search}\": {matches}. Please be more specific."
+        notes = exact
 
     note = notes[0]
     await note.delete()
+    await bump_version(NOTES)
     logger.debug(f"[notes] deleted '{note.title}'")
     return f"Deleted note: **{note.title}**"
@@ -4,7 +4,10 @@ import re
 
 from utils.log import logger
 
+from beanie import PydanticObjectId
+
 from db.schemas import Note
+from skills.notes.search import pick_note, search_notes
 
 
 async def handle_read_note(query: str) -> str:
@@ -19,19 +22,18 @@ async def handle_read_note(query: str) -> str:
     if not search:
         return "Please specify which note you'd like to read."
 
-    # Case-insensitive partial title match
-    notes = await Note.find(
-        {"title": {"$regex": search, "$options": "i"}}
-    ).sort(-Note.created_at).to_list()
-
-    if not notes:
+    hits = await search_notes(search, limit=5)
+    if not hits:
         return f"No note found matching \"{search}\"."
 
-    if len(notes) > 1:
-        matches = ", ".join(f'"{n.title}"' for n in notes[:5])
+    best = pick_note(hits)
+    if best is None:
+        matches = ", ".join(f'"{h.title}"' for h in hits)
         return f"Multiple notes match \"{search}\": {matches}. Please be more specific."
 
-    note = notes[0]
+    note = await Note.get(PydanticObjectId(best.id))
+    if note is None:
+        return f"No note found matching \"{search}\"."
     tag = f" [{note.category}]" if note.category else ""
     date_str = note.created_at.strftime("%Y-%m-%d %H:%M")
     logger.debug(f"[notes] read '{note.title}'")
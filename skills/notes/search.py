@@ -0,0 +1,151 @@
+"""Ranked note search over title and content.
+
+Two indexes are combined:
+
+- a Mongo text index on title (weighted) and content — whole words, stemmed,
+  ranked by textScore;
+- an in-process trigram index — fuzzy and partial matches ("groc" finds
+  "Grocery list", typos still land), scored as the share of the query's
+  trigrams found in the title or content.
+
+The trigram index is built once from a projection of the Notes collection and
+rebuilt only when the notes change version moves (see db/versions.py), so a
+lookup is a few set intersections even at thousands of notes.
+"""
+
+import re
+from datetime import datetime
+from typing import NamedTuple
+
+from utils.log import logger
+
+_TEXT_WEIGHT = 0.5
+_TRIGRAM_WEIGHT = 0.5
+_CONTENT_DISCOUNT = 0.6  # a trigram match in the body counts for less than one in the title
+_TITLE_CONTAINS_BONUS = 0.5
+_MIN_TRIGRAM = 0.3  # fraction of query trigrams that must match for a fuzzy-only hit
+_CLEAR_LEAD = 1.5  # top hit must outscore the next by this factor to be picked unambiguously
+
+
+class NoteHit(NamedTuple):
+    id: str
+    title: str
+    category: str | None
+    created_at: datetime
+    score: float
+
+
+def _trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in re.findall(r"\w+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _TrigramIndex:
+    def __init__(self, docs: list[dict], version: int):
+        self.version = version
+        self.notes = docs
+        self.title_grams: dict[str, set[int]] = {}
+        self.content_grams: dict[str, set[int]] = {}
+        for i, doc in enumerate(docs):
+            for gram in _trigrams(doc.get("title", "")):
+                self.title_grams.setdefault(gram, set()).add(i)
+            for gram in _trigrams(doc.get("content", "")):
+                self.content_grams.setdefault(gram, set()).add(i)
+
+    def scores(self, query: str) -> dict[int, float]:
+        grams = _trigrams(query)
+        if not grams:
+            return {}
+        title_hits: dict[int, int] = {}
+        content_hits: dict[int, int] = {}
+        for gram in grams:
+            for i in self.title_grams.get(gram, ()):
+                title_hits[i] = title_hits.get(i, 0) + 1
+            for i in self.content_grams.get(gram, ()):
+                content_hits[i] = content_hits.get(i, 0) + 1
+        scores = {}
+        for i in title_hits.keys() | content_hits.keys():
+            score = max(
+                title_hits.get(i, 0) / len(grams),
+                _CONTENT_DISCOUNT * content_hits.get(i, 0) / len(grams),
+            )
+            if score >= _MIN_TRIGRAM:
+                scores[i] = score
+        return scores
+
+
+_index: _TrigramIndex | None = None
+
+
+async def _trigram_index() -> _TrigramIndex:
+    global _index
+    from db.schemas import Note
+    from db.versions import NOTES, get_versions
+
+    (version,) = await get_versions((NOTES,))
+    if _index is None or _index.version != version:
+        docs = await Note.get_pymongo_collection().find(
+            {}, {"title": 1, "content": 1, "category": 1, "created_at": 1}
+        ).to_list(length=None)
+        _index = _TrigramIndex(docs, version)
+        logger.debug(f"[notes] trigram index built over {len(docs)} notes (version {version})")
+    return _index
+
+
+async def _text_scores(query: str, limit: int) -> dict[str, float]:
+    """Mongo text-index scores by note id, normalised to [0, 1]."""
+    from db.schemas import Note
+
+    cursor = Note.get_pymongo_collection().find(
+        {"$text": {"$search": query}}, {"score": {"$meta": "textScore"}}
+    ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+    docs = await cursor.to_list(length=limit)
+    if not docs:
+        return {}
+    top = max(doc["score"] for doc in docs)
+    return {str(doc["_id"]): doc["score"] / top for doc in docs}
+
+
+async def search_notes(query: str, limit: int = 10) -> list[NoteHit]:
+    """Notes matching query, best first."""
+    query = query.strip()
+    if not query:
+        return []
+
+    index = await _trigram_index()
+    try:
+        text = await _text_scores(query, limit * 3)
+    except Exception as e:
+        # e.g. the text index is still being built
+        logger.warning(f"[notes] text search failed, using trigram matches only: {e}")
+        text = {}
+
+    by_id = {str(doc["_id"]): doc for doc in index.notes}
+    combined: dict[str, float] = {
+        str(index.notes[i]["_id"]): _TRIGRAM_WEIGHT * score for i, score in index.scores(query).items()
+    }
+    for note_id, score in text.items():
+        if note_id in by_id:
+            combined[note_id] = combined.get(note_id, 0.0) + _TEXT_WEIGHT * score
+
+    needle = query.lower()
+    hits = []
+    for note_id, score in combined.items():
+        doc = by_id[note_id]
+        if needle in doc.get("title", "").lower():
+            score += _TITLE_CONTAINS_BONUS
+        hits.append(NoteHit(note_id, doc.get("title", ""), doc.get("category"), doc["created_at"], round(score, 4)))
+    hits.sort(key=lambda h: (-h.score, -h.created_at.timestamp()))
+    return hits[:limit]
+
+
+def pick_note(hits: list[NoteHit]) -> NoteHit | None:
+    """The hit a read/delete request clearly means, or None when it is ambiguous."""
+    if not hits:
+        return None
+    if len(hits) == 1 or hits[0].score >= _CLEAR_LEAD * hits[1].score:
+        return hits[0]
+    return None
@@ -1,8 +1,14 @@
 """Persona builder — extracts user facts from a day's conversation log before compaction.
 
 Runs as part of the compaction flow, on the raw exchanges, before they are summarised.
-Uses a fast regex pre-filter to skip the LLM entirely when no personal signals are present.
-Merges new findings into the existing UserPersona document in MongoDB.
+A regex pre-filter picks out the exchanges where the user says something about
+themselves; only those, with the exchange before each for context, reach the LLM,
+and the LLM is skipped entirely when none match. Each ConversationEntry is
+flagged persona_analysed once it has been through a successful run, so
+exchanges are only ever analysed once. A failed run raises and leaves its
+exchanges unflagged; compaction logs the failure and carries on, and the
+exchanges are analysed again on a later run. Findings are merged into the
+UserPersona document in a single atomic update.
 
 The persona is injected into AIDA's CHAT system prompt so she can address the user naturally.
 """
@@ -28,7 +34,7 @@ class PersonaUpdate(BaseModel):
     dislikes: list[str] = []
 
 
-_EXTRACT_PROMPT = """You are a silent observer analysing a day's conversation log between a user and their AI assistant.
+_EXTRACT_PROMPT = """You are a silent observer analysing excerpts from a conversation log between a user and their AI assistant.
 
 IMPORTANT: The assistant may be wrong or hallucinating. Only extract facts the USER themselves expressed.
 
@@ -75,21 +81,33 @@ def _build_persona_context(persona) -> str:
 # Merge logic
 # ---------------------------------------------------------------------------
 
-def _build_changes(existing, update: PersonaUpdate) -> dict:
+def _merge_pipeline(update: PersonaUpdate) -> list[dict] | None:
+    """Update pipeline merging update into the stored persona, or None if it holds nothing.
+
+    Scalar fields are only filled when still empty; list items are appended
+    when not already present. Evaluated server-side, so concurrent merges
+    cannot lose each other's findings.
+    """
     changes = {}
 
     for field in ("name", "location", "communication_style"):
         val = getattr(update, field)
-        if val and val != "unknown" and not getattr(existing, field):
-            changes[field] = val
+        if val and val != "unknown":
+            changes[field] = {"$ifNull": [f"${field}", {"$literal": val}]}
 
     for field in ("likes", "dislikes"):
-        current: list = getattr(existing, field) or []
-        new_items = [x for x in getattr(update, field) if x not in current]
-        if new_items:
-            changes[field] = current + new_items
+        items = list(dict.fromkeys(getattr(update, field)))
+        if items:
+            current = {"$ifNull": [f"${field}", []]}
+            changes[field] = {"$concatArrays": [
+                current,
+                {"$filter": {"input": {"$literal": items}, "cond": {"$not": [{"$in": ["$$this", current]}]}}},
+            ]}
 
-    return changes
+    if not changes:
+        return None
+    changes["last_updated"] = datetime.now()
+    return [{"$set": changes}]
 
 
 # ---------------------------------------------------------------------------
@@ -106,6 +124,35 @@ _PERSONAL_SIGNAL = re.compile(
 )
 
 
+# Exchanges before each matching one that are sent along for context
+_CONTEXT_EXCHANGES = 1
+# Assistant answers are only context — facts come from the user — so they are cut short
+_ANSWER_CHARS = 200
+
+
+def _excerpt(exchanges: list) -> tuple[str, int]:
+    """The lines worth sending to the LLM and the number of matching exchanges."""
+    matches = [i for i, ex in enumerate(exchanges) if _PERSONAL_SIGNAL.search(ex.question)]
+    if not matches:
+        return "", 0
+
+    keep: set[int] = set()
+    for i in matches:
+        keep.update(range(max(0, i - _CONTEXT_EXCHANGES), i + 1))
+
+    lines = []
+    previous = None
+    for i in sorted(keep):
+        if previous is not None and i != previous + 1:
+            lines.append("...")
+        ex = exchanges[i]
+        lines.append(f"User: {ex.question}")
+        answer = ex.answer if len(ex.answer) <= _ANSWER_CHARS else ex.answer[:_ANSWER_CHARS] + "…"
+        lines.append(f"Assistant: {answer}")
+        previous = i
+    return "\n".join(lines), len(matches)
+
+
 # ---------------------------------------------------------------------------
 # Extraction
 # ---------------------------------------------------------------------------
@@ -127,45 +174,51 @@ def _extract_sync(log: str) -> PersonaUpdate:
 # Public entry point — called before compaction so raw exchanges are not lost
 # ---------------------------------------------------------------------------
 
-async def analyze_persona_from_log(exchanges: list) -> None:
-    """Extract user facts from a day's raw exchanges and merge into UserPersona."""
-    global _cached_persona_context
+async def _mark_analysed(exchanges: list) -> None:
+    from beanie.operators import In, Set
 
-    all_user_text = " ".join(ex.question for ex in exchanges)
-    if not _PERSONAL_SIGNAL.search(all_user_text):
-        return
+    from db.schemas import ConversationEntry
 
-    lines = []
-    for ex in exchanges:
-        lines.append(f"User: {ex.question}")
-        lines.append(f"Assistant: {ex.answer}")
-    log = "\n".join(lines)
-
-    try:
-        from db.schemas import UserPersona
-
-        loop = asyncio.get_running_loop()
-        update = await loop.run_in_executor(None, lambda: _extract_sync(log))
-
-        existing = await UserPersona.find_one()
-        if existing is None:
-            existing = await UserPersona(last_updated=datetime.now()).insert()
+    await ConversationEntry.find(In(ConversationEntry.id, [ex.id for ex in exchanges])).update(
+        Set({ConversationEntry.persona_analysed: True})
+    )
 
-        changes = _build_changes(existing, update)
-        if not changes:
-            return
 
-        changes["last_updated"] = datetime.now()
+async def analyze_persona_from_log(exchanges: list) -> None:
+    """Extract user facts from raw exchanges not yet analysed and merge them into UserPersona.
 
-        from beanie.operators import Set
-        await existing.update(Set(changes))
+    Raises if extraction or the merge fails, leaving the exchanges unflagged for the next run.
+    """
+    global _cached_persona_context
 
-        updated = await UserPersona.find_one()
-        _cached_persona_context = _build_persona_context(updated)
-        logger.debug(f"[personalizer] Persona updated: {list(changes.keys())}")
+    exchanges = [ex for ex in exchanges if not ex.persona_analysed]
+    if not exchanges:
+        return
 
-    except Exception as e:
-        logger.error(f"[personalizer] Update failed: {e}")
+    log, matched = _excerpt(exchanges)
+    if matched:
+        loop = asyncio.get_running_loop()
+        try:
+            update = await loop.run_in_executor(None, lambda: _extract_sync(log))
+        except Exception as e:
+            logger.error(f"[personalizer] Update failed: {e}")
+            raise
+
+        pipeline = _merge_pipeline(update)
+        if pipeline is not None:
+            from pymongo import ReturnDocument
+
+            from db.schemas import UserPersona
+
+            doc = await UserPersona.get_pymongo_collection().find_one_and_update(
+                {}, pipeline, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+            doc.pop("_id", None)
+            _cached_persona_context = _build_persona_context(UserPersona.model_validate(doc))
+            logger.debug(f"[personalizer] Persona merged from {matched} of {len(exchanges)} exchanges")
+
+    # Only after a successful extraction, so a failed run is retried next time
+    await _mark_analysed(exchanges)
 
 
 async def start_personalizer() -> str | None:
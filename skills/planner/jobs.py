@@ -0,0 +1,210 @@
+"""Persisted planner jobs with a bounded work queue.
+
+A plan takes minutes, so runs are queued instead of holding callers. Each job
+is a PlannerJob document; every completed batch of tool calls is checkpointed
+onto it, so a job interrupted by a restart resumes from its last finished
+step rather than starting over. A single worker drains the queue — the planner
+shares the local model with everything else, so jobs run one at a time.
+
+Progress is pushed to subscribers as events:
+
+    {"stage": "queued", "position": 2}
+    {"stage": "running"}
+    {"stage": "step", "step": 3, "tool": "WEATHER", "query": "...", "result": "..."}
+    {"stage": "synthesising"}
+    {"stage": "done", "plan": "..."}
+    {"stage": "error", "error": "..."}
+"""
+
+import asyncio
+import contextvars
+import os
+from collections.abc import Callable
+from datetime import datetime
+
+from utils.log import logger
+
+MAX_QUEUED_JOBS = int(os.environ.get("PLANNER_QUEUE_SIZE", 8))
+
+_NO_DATA = "The planner could not gather any information for this task."
+
+_queue: asyncio.Queue | None = None
+_worker: asyncio.Task | None = None
+_waiters: dict[str, list[asyncio.Future]] = {}
+_listeners: dict[str, set[Callable[[dict], None]]] = {}
+
+
+class PlannerQueueFull(Exception):
+    pass
+
+
+def _ensure_worker() -> asyncio.Queue:
+    global _queue, _worker
+    if _queue is None:
+        _queue = asyncio.Queue()
+    if _worker is None or _worker.done():
+        # A fresh context: the worker outlives the request that starts it, so it must not
+        # inherit that request's session or turn metrics
+        _worker = asyncio.create_task(_work(), context=contextvars.Context())
+    return _queue
+
+
+async def submit_plan(task: str):
+    """Persist a new job and queue it. Raises PlannerQueueFull when the backlog is at capacity."""
+    from db.schemas import PlannerJob
+
+    queue = _ensure_worker()
+    if queue.qsize() >= MAX_QUEUED_JOBS:
+        raise PlannerQueueFull(
+            f"The planner already has {queue.qsize()} plans waiting. Please try again once one finishes."
+        )
+    now = datetime.now()
+    job = await PlannerJob(task=task, created_at=now, updated_at=now).insert()
+    queue.put_nowait(str(job.id))
+    logger.debug(f"[planner/jobs] queued {job.id}: {task}")
+    _publish(str(job.id), {"stage": "queued", "position": queue.qsize() - 1})
+    return job
+
+
+async def get_job(job_id: str):
+    """Return the job document, or None for an unknown or malformed id."""
+    from beanie import PydanticObjectId
+    from bson.errors import InvalidId
+    from db.schemas import PlannerJob
+
+    try:
+        return await PlannerJob.get(PydanticObjectId(job_id))
+    except InvalidId:
+        return None
+
+
+async def wait_for_plan(job_id: str):
+    """Wait until the job is done or failed and return its final document (None if unknown)."""
+    # Register before reading so a job finishing during the read still wakes us
+    future = asyncio.get_running_loop().create_future()
+    _waiters.setdefault(job_id, []).append(future)
+    job = await get_job(job_id)
+    if job is None or job.status in ("done", "error"):
+        waiters = _waiters.get(job_id, [])
+        if future in waiters:
+            waiters.remove(future)
+        if not waiters:
+            _waiters.pop(job_id, None)
+        return job
+    return await future
+
+
+def subscribe(job_id: str, listener: Callable[[dict], None]) -> None:
+    """Call listener with every progress event of the job (from the event loop)."""
+    _listeners.setdefault(job_id, set()).add(listener)
+
+
+def unsubscribe(job_id: str, listener: Callable[[dict], None]) -> None:
+    listeners = _listeners.get(job_id)
+    if listeners is not None:
+        listeners.discard(listener)
+        if not listeners:
+            _listeners.pop(job_id, None)
+
+
+async def start_planner_jobs() -> str:
+    """Start the worker and re-queue jobs left unfinished by the previous run."""
+    from db.schemas import PlannerJob
+
+    queue = _ensure_worker()
+    try:
+        pending = await PlannerJob.find(
+            {"status": {"$in": ["queued", "running"]}}
+        ).sort(+PlannerJob.created_at).to_list()
+    except Exception as e:
+        logger.warning(f"[planner/jobs] Could not load unfinished jobs: {e}")
+        return "[planner] Job queue started (resume failed)."
+
+    for job in pending:
+        queue.put_nowait(str(job.id))
+    if pending:
+        logger.info(f"[planner/jobs] resuming {len(pending)} unfinished job(s)")
+        return f"[planner] Resumed {len(pending)} unfinished job(s)."
+    return "[planner] Job queue started."
+
+
+def _publish(job_id: str, event: dict) -> None:
+    for listener in list(_listeners.get(job_id, ())):
+        try:
+            listener(event)
+        except Exception as e:
+            logger.warning(f"[planner/jobs] listener failed for {job_id}: {e}")
+
+
+def _finish(job) -> None:
+    job_id = str(job.id)
+    if job.status == "done":
+        _publish(job_id, {"stage": "done", "plan": job.plan})
+    else:
+        _publish(job_id, {"stage": "error", "error": job.error})
+    for future in _waiters.pop(job_id, []):
+        if not future.done():
+            future.set_result(job)
+
+
+async def _work() -> None:
+    while True:
+        job_id = await _queue.get()
+        try:
+            await _run_job(job_id)
+        except Exception:
+            logger.exception(f"[planner/jobs] worker failed on {job_id}")
+        finally:
+            _queue.task_done()
+
+
+async def _run_job(job_id: str) -> None:
+    from db.schemas import PlannerStep, Plans
+    from db.versions import PLANS, bump_version
+    from skills.planner.skill import execute_plan
+
+    job = await get_job(job_id)
+    if job is None or job.status in ("done", "error"):
+        return
+
+    job.status = "running"
+    job.updated_at = datetime.now()
+    await job.save()
+    _publish(job_id, {"stage": "running"})
+
+    steps = [(s.tool, s.query, s.result) for s in job.steps]
+
+    async def checkpoint(new_steps: list[tuple[str, str, str]]) -> None:
+        for tool, query, result in new_steps:
+            job.steps.append(PlannerStep(tool=tool, query=query, result=result))
+            _publish(job_id, {
+                "stage": "step",
+                "step": len(job.steps),
+                "tool": tool,
+                "query": query,
+                "result": result[:400],
+            })
+        job.updated_at = datetime.now()
+        await job.save()
+
+    try:
+        plan = await execute_plan(
+            job.task,
+            steps,
+            on_steps=checkpoint,
+            on_synthesise=lambda: _publish(job_id, {"stage": "synthesising"}),
+        )
+        if plan is None:
+            job.status, job.error = "error", _NO_DATA
+        else:
+            await Plans(created_at=datetime.now(), ask=job.task, plan=plan).insert()
+            await bump_version(PLANS)
+            logger.debug("[planner] plan saved to database")
+            job.status, job.plan = "done", plan
+    except Exception as e:
+        logger.error(f"[planner/jobs] job {job_id} failed: {e}")
+        job.status, job.error = "error", f"The planner failed: {e}"
+
+    job.updated_at = datetime.now()
+    await job.save()
+    _finish(job)
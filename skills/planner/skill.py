@@ -1,19 +1,20 @@
 """Reliable outlines-based planner — constrained tool selection loop."""
 
 import asyncio
-import inspect
 import os
-from datetime import datetime
+from collections.abc import Awaitable, Callable
 from typing import Literal
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from utils.log import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from agents.agent_factory import create_llm
 from utils.llm_structured_output import generate_structured_output
+from utils.observations import SYNTHESIS_DIGEST_CHARS, digest, memoised
 
-MAX_STEPS = 10
+MAX_STEPS = 10  # total tool calls per plan
+MAX_BATCH = 4  # independent tool calls the planner may issue in one step
 
 # Skills exposed to the planner. HOME_CONTROL is excluded — it has real-world
 # side effects (turns lights on/off) that should not happen autonomously.
@@ -37,6 +38,24 @@ _TOOL_DESCRIPTIONS = {
     "DONE": "Stop gathering information — enough data has been collected to write the plan",
 }
 
+# Per-tool limits for concurrent calls within a batch. Web-backed tools tolerate
+# a little parallelism; anything else runs one call at a time.
+_TOOL_CONCURRENCY = {
+    "SEARCH": 2,
+    "INFORMATION_QUERY": 2,
+    "NEWSFEED": 2,
+}
+# Seconds before a single tool call is abandoned and reported as timed out.
+_TOOL_TIMEOUTS = {
+    "SEARCH": 45,
+    "INFORMATION_QUERY": 30,
+    "FINANCE_STOCKS": 20,
+    "WEATHER": 20,
+    "NEWSFEED": 30,
+    "REMINDER": 15,
+}
+_DEFAULT_TOOL_TIMEOUT = 30
+
 _SELECT_TOOL_PROMPT = """You are a planning agent working step by step to complete a task.
 
 Your task: {task}
@@ -48,12 +67,14 @@ Steps completed so far:
 {steps_so_far}
 
 Rules:
-- Call one tool at a time with a focused, specific query
+- Give each tool call a focused, specific query
+- Calls that do not depend on each other's results (e.g. weather in one city, news about another) can be made together in one step, up to {max_batch} at once
+- If a call needs the result of another, make it in a later step
 - Do not repeat the same tool+query combination
 - Use DONE when you have enough information to write a complete plan
-- You have a maximum of {remaining} steps remaining
+- You have a maximum of {remaining} tool calls remaining
 
-Decide the next tool to call."""
+Decide the next tool calls to make."""
 
 _SYNTHESIZE_PROMPT = """You are a planning assistant. Using the research data below, produce the right output for the user's task.
 
@@ -67,53 +88,105 @@ class PlannerAction(BaseModel):
     query: str
 
 
-_lock = asyncio.Lock()
+class PlannerBatch(BaseModel):
+    actions: list[PlannerAction] = Field(min_length=1, max_length=MAX_BATCH)
+
+
+_tool_semaphores: dict[str, asyncio.Semaphore] = {}
 
 
 def _format_tool_list() -> str:
     return "\n".join(f"- {name}: {desc}" for name, desc in _TOOL_DESCRIPTIONS.items())
 
 
-def _format_steps(steps: list[tuple[str, str, str]]) -> str:
+def _format_steps(task: str, steps: list[tuple[str, str, str]]) -> str:
     if not steps:
         return "None yet."
     lines = []
     for i, (tool, query, result) in enumerate(steps, 1):
         lines.append(f"Step {i} — {tool}: {query}")
-        lines.append(f"  Result: {result[:400]}")
+        lines.append(f"  Result: {digest(result, f'{task} {query}')}")
     return "\n".join(lines)
 
 
-async def _select_next_action(task: str, steps: list[tuple[str, str, str]]) -> PlannerAction:
+async def _select_next_actions(task: str, steps: list[tuple[str, str, str]]) -> list[PlannerAction]:
+    """Ask the model for the next batch of independent tool calls."""
+    remaining = MAX_STEPS - len(steps)
     prompt = _SELECT_TOOL_PROMPT.format(
         task=task,
         tool_list=_format_tool_list(),
-        steps_so_far=_format_steps(steps),
-        remaining=MAX_STEPS - len(steps),
+        steps_so_far=_format_steps(task, steps),
+        max_batch=min(MAX_BATCH, remaining),
+        remaining=remaining,
     )
-    return await asyncio.to_thread(
+    batch = await asyncio.to_thread(
         generate_structured_output,
         model_name=os.environ["MODEL_GENERALIST"],
         user_prompt=prompt,
-        system_prompt="You are a planning agent. Choose the next tool to call.",
-        pydantic_model=PlannerAction,
-        max_tokens=100,
+        system_prompt="You are a planning agent. Choose the next tool calls to make.",
+        pydantic_model=PlannerBatch,
+        max_tokens=100 * MAX_BATCH,
     )
+    return batch.actions
+
+
+def _dedupe_batch(
+    actions: list[PlannerAction], steps: list[tuple[str, str, str]], limit: int
+) -> list[PlannerAction]:
+    """Drop calls already made (in earlier steps or earlier in the batch) and cap to limit."""
+    seen = {(tool, query.strip().lower()) for tool, query, _ in steps}
+    batch = []
+    for action in actions:
+        key = (action.tool, action.query.strip().lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(action)
+    return batch[:limit]
+
+
+def _tool_semaphore(tool: str) -> asyncio.Semaphore:
+    sem = _tool_semaphores.get(tool)
+    if sem is None:
+        sem = _tool_semaphores[tool] = asyncio.Semaphore(_TOOL_CONCURRENCY.get(tool, 1))
+    return sem
+
+
+async def _call_with_limits(tool: str, query: str) -> str:
+    """Run one raw tool call under its concurrency limit and deadline.
 
+    Results are memoised (see utils/observations.py). Failures and timeouts are
+    not; they become the step's result text so the rest of the batch and the
+    plan carry on.
+    """
+    timeout = _TOOL_TIMEOUTS.get(tool, _DEFAULT_TOOL_TIMEOUT)
 
-async def _call_skill(tool: str, query: str) -> str:
-    from skills.registry import SKILL_MAP
+    async def call() -> str:
+        from agents.router import execute_skill
 
-    skill = SKILL_MAP.get(tool)
-    if not skill:
-        return f"Tool {tool} not found."
-    if inspect.iscoroutinefunction(skill.handle):
-        return await skill.handle(query=query)
-    return skill.handle(query=query)
+        async with _tool_semaphore(tool):
+            return await asyncio.wait_for(execute_skill(tool, query), timeout=timeout)
+
+    try:
+        return await memoised(tool, query, call)
+    except asyncio.TimeoutError:
+        logger.warning(f"[planner] {tool}({query!r}) timed out after {timeout}s")
+        return f"{tool} did not respond within {timeout} seconds."
+    except Exception as e:
+        logger.error(f"[planner] {tool}({query!r}) failed: {e}")
+        return f"{tool} failed: {e}"
+
+
+async def _run_batch(actions: list[PlannerAction]) -> list[str]:
+    """Execute independent actions concurrently. Results are in batch order."""
+    return await asyncio.gather(*(_call_with_limits(a.tool, a.query) for a in actions))
 
 
 async def _synthesize(task: str, steps: list[tuple[str, str, str]]) -> str:
-    data = "\n\n".join(f"[{tool} — {query}]\n{result}" for tool, query, result in steps)
+    data = "\n\n".join(
+        f"[{tool} — {query}]\n{digest(result, f'{task} {query}', SYNTHESIS_DIGEST_CHARS)}"
+        for tool, query, result in steps
+    )
     llm = create_llm(temperature=0.5).bind(max_tokens=3072)
     response = await llm.ainvoke([
         SystemMessage(content=_SYNTHESIZE_PROMPT),
@@ -122,35 +195,98 @@ async def _synthesize(task: str, steps: list[tuple[str, str, str]]) -> str:
     return response.content.strip()
 
 
-async def run_planner(task: str) -> str:
-    from db.schemas import Plans
-
-    if _lock.locked():
-        return "A planning task is already in progress. Please wait until it finishes."
-
-    async with _lock:
-        logger.debug(f"[planner] starting: {task}")
-        steps: list[tuple[str, str, str]] = []
-
-        for step_num in range(1, MAX_STEPS + 1):
-            action = await _select_next_action(task, steps)
+async def execute_plan(
+    task: str,
+    steps: list[tuple[str, str, str]],
+    on_steps: Callable[[list[tuple[str, str, str]]], Awaitable[None]] | None = None,
+    on_synthesise: Callable[[], None] | None = None,
+) -> str | None:
+    """Run the tool-selection loop from the given completed steps, then synthesise.
+
+    steps may already hold results from an earlier, interrupted run — the loop
+    continues from there. on_steps is awaited with each batch of new steps as it
+    completes (the job runner checkpoints them), on_synthesise is called before the
+    final plan is written. Returns None when no
+    information could be gathered.
+    """
+    logger.debug(f"[planner] starting: {task} ({len(steps)} steps already done)")
+
+    step_num = 0
+    while len(steps) < MAX_STEPS:
+        step_num += 1
+        actions = await _select_next_actions(task, steps)
+        done = any(a.tool == "DONE" for a in actions)
+        tools = [a for a in actions if a.tool != "DONE"]
+
+        batch = _dedupe_batch(tools, steps, MAX_STEPS - len(steps))
+        if not batch:
+            logger.debug("[planner] agent decided DONE" if done else "[planner] only repeated calls proposed — stopping")
+            break
+        for action in batch:
             logger.debug(f"[planner] step {step_num} → {action.tool}({action.query!r})")
 
-            if action.tool == "DONE":
-                logger.debug("[planner] agent decided DONE")
-                break
-
-            result = await _call_skill(action.tool, action.query)
-            logger.debug(f"[planner] step {step_num} ← {result[:300]}")
-            steps.append((action.tool, action.query, result))
-
-        if not steps:
-            return "The planner could not gather any information for this task."
+        results = await _run_batch(batch)
+        new_steps = [(action.tool, action.query, result) for action, result in zip(batch, results)]
+        for tool, _, result in new_steps:
+            logger.debug(f"[planner] step {step_num} ← {tool}: {result[:300]}")
+        steps.extend(new_steps)
+        if on_steps is not None:
+            await on_steps(new_steps)
 
-        logger.debug("[planner] synthesising final plan")
-        plan = await _synthesize(task, steps)
+        if done:
+            # DONE alongside other calls: use their results, then write the plan
+            logger.debug("[planner] agent decided DONE")
+            break
 
-        await Plans(created_at=datetime.now(), ask=task, plan=plan).insert()
-        logger.debug("[planner] plan saved to database")
-
-        return plan
+    if not steps:
+        return None
+
+    logger.debug("[planner] synthesising final plan")
+    if on_synthesise is not None:
+        on_synthesise()
+    return await _synthesize(task, steps)
+
+
+async def run_planner(task: str, on_status: Callable[[str], None] | None = None) -> str:
+    """Queue a planner job and wait for its plan.
+
+    Callers that should not block (API, Telegram) use skills.planner.jobs directly.
+    """
+    from skills.planner.jobs import PlannerQueueFull, submit_plan, subscribe, unsubscribe, wait_for_plan
+
+    try:
+        job = await submit_plan(task)
+    except PlannerQueueFull as e:
+        return str(e)
+
+    job_id = str(job.id)
+    listener = None
+    if on_status is not None:
+        def listener(event: dict) -> None:
+            message = describe_event(event)
+            if message:
+                on_status(message)
+        subscribe(job_id, listener)
+    try:
+        job = await wait_for_plan(job_id)
+    finally:
+        if listener is not None:
+            unsubscribe(job_id, listener)
+    if job is None:
+        return "The planning job could not be found."
+    return job.plan if job.status == "done" else job.error
+
+
+def describe_event(event: dict) -> str | None:
+    """One-line human-readable status for a job progress event."""
+    stage = event.get("stage")
+    if stage == "queued":
+        ahead = event.get("position", 0)
+        return f"Plan queued ({ahead} ahead)" if ahead else "Plan queued"
+    if stage == "running":
+        return "Building your plan"
+    if stage == "step":
+        return f"{event['tool']}: {event['query']}"
+    if stage == "synthesising":
+        return "Writing the plan"
+    return None
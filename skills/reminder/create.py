@@ -5,6 +5,7 @@ from datetime import datetime
 from utils.log import logger
 
 from db.schemas import Reminders
+from db.versions import REMINDERS, bump_version
 from skills.reminder.parser import format_reminder_display, parse_reminder_date
 
 
@@ -29,6 +30,7 @@ async def handle_create_reminder(datetime_str: str, description: str) -> str:
     )
     logger.debug(new_reminder)
     await new_reminder.insert()
+    await bump_version(REMINDERS)
 
     display_time = format_reminder_display(parsed_datetime)
     logger.debug(f"Reminder saved: {description} at {display_time}")
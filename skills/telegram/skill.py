@@ -1,3 +1,4 @@
+import asyncio
 import os
 import tempfile
 
@@ -62,6 +63,22 @@ async def _transcribe_message(update: Update, context: ContextTypes.DEFAULT_TYPE
             os.remove(tmp_path)
 
 
+async def _deliver_plan(update: Update, job_id: str, audio_reply: bool) -> None:
+    """Wait for a queued planner job and send its result to the chat."""
+    from skills.planner.jobs import wait_for_plan
+
+    try:
+        job = await wait_for_plan(job_id)
+        response = job.plan if job and job.status == "done" else (job.error if job else "The planning job was lost.")
+        if audio_reply or _tts_enabled:
+            await _reply_audio(update, response)
+        else:
+            await update.message.reply_text(await _fit_response(response))
+    except Exception as e:
+        logger.error(f"Telegram planner delivery error: {e}")
+        await update.message.reply_text("Sorry, the plan could not be delivered.")
+
+
 async def _process_query(update: Update, context: ContextTypes.DEFAULT_TYPE, user_text: str, audio_reply: bool = False) -> None:
     """Run intent classification or planner on user_text and reply."""
     from agents.intent_classifier import run_intent_classifier
@@ -71,14 +88,22 @@ async def _process_query(update: Update, context: ContextTypes.DEFAULT_TYPE, use
 
     try:
         if user_text.startswith("@planner"):
-            from skills.planner import run_planner
             task = user_text[len("@planner"):].strip()
             if not task:
                 await update.message.reply_text("Please provide a task. Example: @planner check the weather and set a reminder for 8am")
                 return
-            response = await run_planner(task)
-        else:
-            response = await run_intent_classifier(user_text)
+            from skills.planner.jobs import PlannerQueueFull, submit_plan
+            try:
+                job = await submit_plan(task)
+            except PlannerQueueFull as e:
+                await update.message.reply_text(str(e))
+                return
+            # Plans take minutes — acknowledge now and deliver the result when the job finishes
+            await update.message.reply_text("On it — I'll send the plan when it's ready.")
+            asyncio.create_task(_deliver_plan(update, str(job.id), audio_reply))
+            return
+
+        response = await run_intent_classifier(user_text, session_id=f"telegram:{chat_id}")
 
         if audio_reply or _tts_enabled:
             await _reply_audio(update, response)
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from skills.conversation.temporal import TimeWindow, time_window
+
+WEDNESDAY = date(2026, 10, 14)
+MONDAY = date(2026, 10, 12)
+
+
+@pytest.mark.parametrize(
+  ("query", "today", "expected"),
+  [
+    # Past by themselves
+    ("what did we talk about yesterday", WEDNESDAY, TimeWindow(date(2026, 10, 13), date(2026, 10, 13))),
+    ("and the day before yesterday?", WEDNESDAY, TimeWindow(date(2026, 10, 12), date(2026, 10, 12))),
+    ("that thing from three days ago", WEDNESDAY, TimeWindow(date(2026, 10, 11), date(2026, 10, 11))),
+    ("two weeks ago I had an idea", WEDNESDAY, TimeWindow(date(2026, 9, 27), date(2026, 10, 3))),
+    ("what happened last friday", WEDNESDAY, TimeWindow(date(2026, 10, 9), date(2026, 10, 9))),
+    ("this past monday", WEDNESDAY, TimeWindow(date(2026, 10, 12), date(2026, 10, 12))),
+    ("how was last weekend", WEDNESDAY, TimeWindow(date(2026, 10, 10), date(2026, 10, 11))),
+    ("summarise last week", WEDNESDAY, TimeWindow(date(2026, 10, 7), date(2026, 10, 13))),
+    ("summarise last month", WEDNESDAY, TimeWindow(date(2026, 9, 13), date(2026, 10, 13))),
+    # Ambiguous phrases need past-tense or recall wording
+    ("remind me on friday to call mum", WEDNESDAY, None),
+    ("what did we discuss on friday", WEDNESDAY, TimeWindow(date(2026, 10, 9), date(2026, 10, 9))),
+    ("what's on this week", WEDNESDAY, None),
+    ("what did we cover this week", WEDNESDAY, TimeWindow(MONDAY, WEDNESDAY)),
+    ("what did we cover this week", MONDAY, TimeWindow(MONDAY, MONDAY)),
+    ("plans for this month", WEDNESDAY, None),
+    ("what did I spend this month", WEDNESDAY, TimeWindow(date(2026, 10, 1), WEDNESDAY)),
+    ("I need a break lately", WEDNESDAY, None),
+    ("what have I been reading lately", WEDNESDAY, TimeWindow(date(2026, 10, 7), WEDNESDAY)),
+    # Recall without a date searches the whole journal
+    ("remember when we planned the trip", WEDNESDAY, TimeWindow(None, None)),
+    ("did we ever talk about sourdough", WEDNESDAY, TimeWindow(None, None)),
+    # Not about the past
+    ("what's the weather like", WEDNESDAY, None),
+    ("set a timer for ten minutes", WEDNESDAY, None),
+  ],
+)
+def test_time_window(query, today, expected):
+  assert time_window(query, today=today) == expected
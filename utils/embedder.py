@@ -7,11 +7,14 @@ and reuses it across memory_client and journal_index.
 from __future__ import annotations
 
 import os
+import threading
+from contextlib import contextmanager
 from typing import Optional
 
 from utils.log import logger
 
 _model: Optional["Llama"] = None
+_lock = threading.Lock()
 
 EMBEDDING_DIM = int(os.environ.get("EMBEDDING_DIM", "384"))
 
@@ -36,14 +39,33 @@ def get_model():
     return _model
 
 
+@contextmanager
+def _quiet_model():
+    """Serialise model calls and silence llama.cpp's stderr output while they run.
+
+    Callers embed from worker threads concurrently (memory search, journal
+    search, reindexing); the model and the fd-2 redirection are not thread-safe.
+    """
+    with _lock:
+        old_err = os.dup(2)
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 2)
+        try:
+            yield get_model()
+        finally:
+            os.dup2(old_err, 2)
+            os.close(old_err)
+            os.close(devnull)
+
+
 def embed(text: str) -> list[float]:
-    import os as _os
-    old_err = _os.dup(2)
-    devnull = _os.open(_os.devnull, _os.O_WRONLY)
-    _os.dup2(devnull, 2)
-    try:
-        return get_model().embed(text)
-    finally:
-        _os.dup2(old_err, 2)
-        _os.close(old_err)
-        _os.close(devnull)
+    with _quiet_model() as model:
+        return model.embed(text)
+
+
+def embed_batch(texts: list[str]) -> list[list[float]]:
+    """Embed several texts in one model call."""
+    if not texts:
+        return []
+    with _quiet_model() as model:
+        return model.embed(texts)
@@ -0,0 +1,62 @@
+"""Foreground/background arbitration for the shared model.
+
+The assistant runs a single local model. Work on the user-visible response
+path wraps itself in `foreground()`; background work (history compression,
+memory extraction, backfills) awaits `wait_until_idle()` first so it only
+touches the model when no live query is being served.
+
+    async with foreground():
+        ...  # classify, route, generate
+
+    await wait_until_idle()  # background task
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+# Seconds of quiet after the last foreground turn before the model counts as idle.
+IDLE_GRACE_SECONDS = 1.5
+
+_active: int = 0
+_last_active: float = 0.0
+_idle_event: asyncio.Event | None = None
+
+
+def _event() -> asyncio.Event:
+    global _idle_event
+    if _idle_event is None:
+        _idle_event = asyncio.Event()
+        _idle_event.set()
+    return _idle_event
+
+
+def is_idle() -> bool:
+    """True when no foreground turn is running and the grace period has elapsed."""
+    return _active == 0 and time.monotonic() - _last_active >= IDLE_GRACE_SECONDS
+
+
+@asynccontextmanager
+async def foreground():
+    """Mark the enclosed block as user-facing model work."""
+    global _active, _last_active
+    _active += 1
+    _event().clear()
+    try:
+        yield
+    finally:
+        _active -= 1
+        _last_active = time.monotonic()
+        if _active == 0:
+            _event().set()
+
+
+async def wait_until_idle(grace: float = IDLE_GRACE_SECONDS) -> None:
+    """Block until no foreground turn has run for `grace` seconds."""
+    event = _event()
+    while True:
+        await event.wait()
+        remaining = grace - (time.monotonic() - _last_active)
+        if remaining <= 0 and event.is_set():
+            return
+        await asyncio.sleep(max(remaining, 0.05))
@@ -1,4 +1,4 @@
-"""Qdrant index for AIDA's journal entries.
+"""Vector index for AIDA's journal entries.
 
 Stores each journal narrative as a vector so the journal can be searched
 semantically ("what did I write about Gokhan's interest in AI?") rather than
@@ -6,42 +6,36 @@ scanned chronologically.
 
 The Journal MongoDB document remains the canonical store. This is a secondary
 index — write here after writing to MongoDB, search here for retrieval.
+The backend (Qdrant or embedded) is chosen by utils/vector_store.py.
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import os
-from datetime import date
-from typing import Optional
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
 
 from utils.log import logger
 
-_client: Optional["QdrantClient"] = None
-
 COLLECTION = "langbox_journal"
 
+_ready = False
 
-def _get_client():
-    global _client
-    if _client is None:
-        from qdrant_client import QdrantClient
-        from qdrant_client.models import Distance, VectorParams
 
-        _client = QdrantClient(
-            host=os.environ.get("QDRANT_HOST", "localhost"),
-            port=int(os.environ.get("QDRANT_PORT", "6333")),
-        )
-        existing = {c.name for c in _client.get_collections().collections}
-        if COLLECTION not in existing:
-            from utils.embedder import EMBEDDING_DIM
-            _client.create_collection(
-                collection_name=COLLECTION,
-                vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
-            )
-            logger.info(f"[journal_index] Created Qdrant collection '{COLLECTION}'")
+def _get_store():
+    global _ready
+    from utils.vector_store import get_vector_store
 
-    return _client
+    store = get_vector_store()
+    if not _ready:
+        from utils.embedder import EMBEDDING_DIM
+        store.ensure_collection(COLLECTION, EMBEDDING_DIM)
+        _ready = True
+    return store
 
 
 def _date_to_id(d: date) -> int:
@@ -49,24 +43,28 @@ def _date_to_id(d: date) -> int:
     return int(hashlib.md5(str(d).encode()).hexdigest(), 16) % (2**62)
 
 
+def _content_hash(narrative: str) -> str:
+    """Hash of the narrative and the embedding model — either changing means re-embedding."""
+    model = os.environ.get("MODEL_EMBEDDING", "")
+    return hashlib.md5(f"{model}\0{narrative}".encode()).hexdigest()
+
+
+def _payload(datestamp: date, narrative: str) -> dict:
+    return {"datestamp": str(datestamp), "narrative": narrative, "content_hash": _content_hash(narrative)}
+
+
 def index_journal_entry(datestamp: date, narrative: str) -> None:
-    """Upsert a journal entry into Qdrant. Safe to call multiple times for the same date."""
+    """Upsert a journal entry into the vector store. Safe to call multiple times for the same date."""
     try:
-        from qdrant_client.models import PointStruct
         from utils.embedder import embed
+        from utils.vector_store import VectorPoint
 
-        client = _get_client()
         vector = embed(narrative)
-        client.upsert(
-            collection_name=COLLECTION,
-            points=[
-                PointStruct(
-                    id=_date_to_id(datestamp),
-                    vector=vector,
-                    payload={"datestamp": str(datestamp), "narrative": narrative},
-                )
-            ],
+        _get_store().upsert(
+            COLLECTION,
+            [VectorPoint(_date_to_id(datestamp), vector, _payload(datestamp, narrative))],
         )
+        invalidate_journal_cache()
         logger.info(f"[journal_index] Indexed entry for {datestamp}")
     except Exception:
         logger.exception("[journal_index] Failed to index journal entry")
@@ -76,15 +74,255 @@ def search_journal(query: str, limit: int = 3) -> list[dict]:
     """Return semantically relevant journal entries.
 
     Each result is a dict with 'datestamp' (str) and 'narrative' (str) keys.
-    Returns [] on failure or if Qdrant is unavailable.
+    Returns [] on failure or if the vector store is unavailable.
     """
     try:
         from utils.embedder import embed
 
-        client = _get_client()
-        vector = embed(query)
-        hits = client.search(collection_name=COLLECTION, query_vector=vector, limit=limit)
+        hits = _get_store().search(COLLECTION, embed(query), limit=limit)
         return [h.payload for h in hits]
     except Exception:
         logger.exception("[journal_index] Search failed")
         return []
+
+
+# ---------------------------------------------------------------------------
+# Recent-entry cache
+# ---------------------------------------------------------------------------
+
+RECENT_ENTRIES = int(os.environ.get("JOURNAL_CACHE_ENTRIES", 90))
+_RECENT_TTL_SECONDS = 600
+_MIN_SIMILARITY = 0.25  # floor for undated recall
+_MIN_DATED_SIMILARITY = 0.1  # lower floor inside a date window, which has already narrowed the candidates
+
+_recent: "_RecentJournal | None" = None
+
+
+class _RecentJournal:
+    """The newest RECENT_ENTRIES journal vectors as a NumPy matrix, newest first."""
+
+    def __init__(self):
+        import numpy as np
+
+        points = [
+            p for p in _get_store().scroll(COLLECTION, with_vectors=True)
+            if p.vector and p.payload.get("datestamp")
+        ]
+        points.sort(key=lambda p: p.payload["datestamp"], reverse=True)
+        # Fewer points than the cap means the cache holds the whole journal
+        self.complete = len(points) <= RECENT_ENTRIES
+        points = points[:RECENT_ENTRIES]
+        self.loaded_at = time.monotonic()
+        self.payloads = [p.payload for p in points]
+        self.dates = [date.fromisoformat(p.payload["datestamp"]) for p in points]
+        vectors = np.asarray([p.vector for p in points], dtype=np.float32).reshape(len(points), -1)
+        self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def covers(self, since: date | None) -> bool:
+        """Whether every entry on or after since is in the cache (since=None: the whole journal)."""
+        if self.complete:
+            return True
+        return since is not None and bool(self.dates) and self.dates[-1] <= since
+
+
+def _get_recent() -> _RecentJournal:
+    global _recent
+    from utils.turn_metrics import cache_hit
+
+    if _recent is None or time.monotonic() - _recent.loaded_at > _RECENT_TTL_SECONDS:
+        _recent = _RecentJournal()
+    else:
+        cache_hit("journal_recent")
+    return _recent
+
+
+def invalidate_journal_cache() -> None:
+    """Drop the cached recent vectors after the index was written."""
+    global _recent
+    _recent = None
+
+
+def search_recent_journal(
+    query: str,
+    limit: int = 3,
+    since: date | None = None,
+    until: date | None = None,
+) -> list[dict]:
+    """Return journal entries relevant to query, optionally restricted to [since, until].
+
+    Scored in-process against the cached newest entries when they cover the
+    window, otherwise against the vector store. Entries below _MIN_SIMILARITY
+    are dropped, or below the lower _MIN_DATED_SIMILARITY when a window is
+    given — a window narrows the candidates but unrelated days still stay out. Each result is the entry's payload plus a
+    'score' key. Returns [] on failure.
+    """
+    try:
+        import numpy as np
+
+        from utils.embedder import embed
+
+        cache = _get_recent()
+        vector = embed(query)
+        dated = since is not None or until is not None
+        floor = _MIN_DATED_SIMILARITY if dated else _MIN_SIMILARITY
+
+        def in_window(d: date) -> bool:
+            return (since is None or d >= since) and (until is None or d <= until)
+
+        if cache.covers(since):
+            if not cache.payloads:
+                return []
+            q = np.asarray(vector, dtype=np.float32)
+            q /= max(float(np.linalg.norm(q)), 1e-12)
+            scores = cache.vectors @ q
+            candidates = [
+                i for i, d in enumerate(cache.dates)
+                if in_window(d) and scores[i] >= floor
+            ]
+            candidates.sort(key=lambda i: -scores[i])
+            return [{**cache.payloads[i], "score": float(scores[i])} for i in candidates[:limit]]
+
+        # Window reaches past the cache — over-fetch from the store and filter by date
+        hits = _get_store().search(COLLECTION, vector, limit=limit * 10 if dated else limit)
+        results = []
+        for h in hits:
+            d = date.fromisoformat(h.payload["datestamp"])
+            if in_window(d) and h.score >= floor:
+                results.append({**h.payload, "score": h.score})
+        return results[:limit]
+    except Exception:
+        logger.exception("[journal_index] Recent search failed")
+        return []
+
+
+# ---------------------------------------------------------------------------
+# Bulk reindex
+# ---------------------------------------------------------------------------
+
+REINDEX_BATCH = 32
+REINDEX_CONCURRENCY = 4  # upserts in flight while the next batch is embedded
+
+
+@dataclass
+class ReindexReport:
+    scanned: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deleted: int = 0  # index points with no Journal document
+    resumed_from: date | None = None
+    mismatched: list[str] = field(default_factory=list)  # dates whose hash still differs after the run
+    seconds: float = 0.0
+
+    @property
+    def verified(self) -> bool:
+        return not self.mismatched
+
+
+async def reindex_journal(full: bool = False, on_progress=None) -> ReindexReport:
+    """Bring the journal vector index in line with the Journal collection.
+
+    Streams Journal documents in date order with a Mongo cursor. Entries whose
+    content hash (narrative + embedding model) already matches the index are
+    skipped; the rest are embedded REINDEX_BATCH at a time and upserted with up
+    to REINDEX_CONCURRENCY upserts in flight. After each batch the watermark
+    (last date done) is saved, so an interrupted run resumes where it stopped.
+    full=True ignores the watermark and rechecks every entry.
+
+    Finally the index is verified against Mongo: orphaned points are deleted
+    and any date whose hash still differs is reported. on_progress, if given,
+    is called with the report after every batch.
+    """
+    from db.schemas import Journal, JournalIndexState
+    from utils.embedder import embed_batch
+    from utils.vector_store import VectorPoint
+
+    started = time.monotonic()
+    report = ReindexReport()
+    store = _get_store()
+
+    state = await JournalIndexState.find_one()
+    if state is None:
+        state = JournalIndexState(updated_at=datetime.now())
+    if state.watermark is not None and not state.complete and not full:
+        report.resumed_from = state.watermark
+    state.complete = False
+    state.updated_at = datetime.now()
+    await state.save()
+
+    indexed = await asyncio.to_thread(
+        lambda: {p.payload.get("datestamp"): p.payload.get("content_hash") for p in store.scroll(COLLECTION)}
+    )
+
+    # Upserts in flight, oldest first, each with the last date of its batch
+    in_flight: deque[tuple[asyncio.Task | None, date]] = deque()
+
+    async def settle(limit: int) -> None:
+        """Wait until at most limit upserts are in flight; advance the watermark past finished ones."""
+        while in_flight and (len(in_flight) > limit or in_flight[0][0] is None or in_flight[0][0].done()):
+            task, mark = in_flight.popleft()
+            if task is not None:
+                await task  # re-raises if the upsert failed — the watermark stays put
+            state.watermark = mark
+        state.updated_at = datetime.now()
+        await state.save()
+
+    async def flush(batch: list) -> None:
+        pending = [d for d in batch if indexed.get(str(d.datestamp)) != _content_hash(d.summary)]
+        report.unchanged += len(batch) - len(pending)
+        task = None
+        if pending:
+            vectors = await asyncio.to_thread(embed_batch, [d.summary for d in pending])
+            points = [
+                VectorPoint(_date_to_id(d.datestamp), v, _payload(d.datestamp, d.summary))
+                for d, v in zip(pending, vectors)
+            ]
+            task = asyncio.create_task(asyncio.to_thread(store.upsert, COLLECTION, points))
+            report.embedded += len(pending)
+        in_flight.append((task, batch[-1].datestamp))
+        await settle(REINDEX_CONCURRENCY)
+        if on_progress is not None:
+            on_progress(report)
+
+    query = Journal.find(Journal.datestamp > report.resumed_from) if report.resumed_from else Journal.find()
+    batch = []
+    async for doc in query.sort(+Journal.datestamp):
+        report.scanned += 1
+        batch.append(doc)
+        if len(batch) >= REINDEX_BATCH:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    await settle(0)
+
+    await _verify(report)
+    invalidate_journal_cache()
+
+    state.complete = True
+    state.updated_at = datetime.now()
+    await state.save()
+    report.seconds = round(time.monotonic() - started, 2)
+    logger.info(
+        f"[journal_index] reindex: {report.scanned} scanned, {report.embedded} embedded, "
+        f"{report.unchanged} unchanged, {report.deleted} orphans removed in {report.seconds}s"
+    )
+    return report
+
+
+async def _verify(report: ReindexReport) -> None:
+    """Compare index payload hashes with every Journal document; drop orphaned points."""
+    from db.schemas import Journal
+
+    store = _get_store()
+    expected = {}
+    async for doc in Journal.find():
+        expected[str(doc.datestamp)] = _content_hash(doc.summary)
+
+    points = await asyncio.to_thread(store.scroll, COLLECTION)
+    orphans = [p.id for p in points if p.payload.get("datestamp") not in expected]
+    if orphans:
+        await asyncio.to_thread(store.delete, COLLECTION, orphans)
+        report.deleted = len(orphans)
+
+    indexed = {p.payload.get("datestamp"): p.payload.get("content_hash") for p in points}
+    report.mismatched = sorted(d for d, h in expected.items() if indexed.get(d) != h)
@@ -0,0 +1,88 @@
+"""Per-session llama.cpp KV state for incremental chat turns.
+
+The generalist Llama instance is shared by the classifier, skills and CHAT, so
+by the time a session's next turn arrives its KV cache has been overwritten.
+Saving the state after a session's turn and restoring it before the next one
+lets llama.cpp's longest-prefix matching skip everything already evaluated —
+only the newly appended turn is processed. If the prompt prefix changed
+(rolling summary rewritten, history compressed), llama.cpp only reuses the
+common prefix, which is the rebuild fallback.
+
+States are large (they hold the KV cells), so only a few are kept, LRU.
+All functions must be called with llm_lock held.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Literal, NamedTuple
+
+from utils.log import logger
+
+ENABLED = os.environ.get("KV_SESSION_CACHE", "1") != "0"
+MAX_KV_SESSIONS = int(os.environ.get("KV_CACHE_SESSIONS", 2))
+
+
+class KVStats(NamedTuple):
+  """Prompt tokens for the last turn of a session: newly evaluated vs served from cache."""
+
+  evaluated: int
+  reused: int
+  mode: Literal["continue", "rebuild"]
+
+
+_states: "OrderedDict[str, object]" = OrderedDict()  # session key → LlamaState
+_prompt_lens: dict[str, int] = {}  # prompt length of the session's previous turn
+_stats: dict[str, KVStats] = {}
+
+
+def restore(llm, key: str) -> list[int]:
+  """Load the session's saved state into llm. Returns the tokens it holds."""
+  state = _states.get(key)
+  if state is None:
+    return []
+  _states.move_to_end(key)
+  llm.load_state(state)
+  return list(llm.input_ids[: llm.n_tokens])
+
+
+def save(llm, key: str) -> None:
+  """Snapshot llm's current state for the session, evicting the oldest if needed."""
+  _states[key] = llm.save_state()
+  _states.move_to_end(key)
+  while len(_states) > MAX_KV_SESSIONS:
+    evicted, _ = _states.popitem(last=False)
+    _prompt_lens.pop(evicted, None)
+
+
+def record(key: str, previous: list[int], prompt: list[int]) -> KVStats:
+  """Compute and store how much of this turn's prompt was served from the cache."""
+  reused = 0
+  for a, b in zip(previous, prompt):
+    if a != b:
+      break
+    reused += 1
+  # llama.cpp always re-evaluates at least the final prompt token
+  reused = min(reused, max(len(prompt) - 1, 0))
+  # The previous prompt ends with per-turn context (memories, the query) that the
+  # next prompt replaces with the completed exchange, so its tail never matches.
+  # A turn that reuses most of it is a continuation; anything less is a rebuild.
+  previous_prompt = _prompt_lens.get(key, 0)
+  mode = "continue" if previous and reused * 2 >= previous_prompt else "rebuild"
+  stats = KVStats(evaluated=len(prompt) - reused, reused=reused, mode=mode)
+  from utils.turn_metrics import cache_hit
+  cache_hit("kv_tokens", reused)
+  _prompt_lens[key] = len(prompt)
+  _stats[key] = stats
+  logger.debug(f"[kv] {key}: {mode} — {stats.reused} reused, {stats.evaluated} evaluated")
+  return stats
+
+
+def get_kv_stats(key: str) -> KVStats | None:
+  """Return prompt token stats for the session's most recent turn, if any."""
+  return _stats.get(key)
+
+
+def drop(key: str) -> None:
+  _states.pop(key, None)
+  _prompt_lens.pop(key, None)
+  _stats.pop(key, None)
@@ -3,6 +3,7 @@
 import os
 import threading
 import time
+from contextlib import asynccontextmanager
 from typing import TypeVar
 
 import outlines
@@ -90,8 +91,20 @@ def generate_structured_output(
   model_path: str | None = None,
   max_tokens: int | None = 512,
   n_gpu_layers: int = -1,
+  session_key: str | None = None,
   **llama_kwargs,
 ) -> T:
+  """Generate an instance of pydantic_model constrained by outlines.
+
+  When session_key is given (multi-turn CHAT), the session's saved KV state is
+  restored first and saved afterwards, so a prompt that extends the previous
+  turn's only evaluates the new tokens. See utils/kv_cache.py.
+  """
+  from utils import kv_cache
+  from utils.turn_metrics import add_tokens, current_turn
+
+  use_kv = session_key is not None and kv_cache.ENABLED
+  counting = current_turn() is not None
   try:
     full_path = _model_path(model_name, model_path)
     llm = _get_or_load_llama(model_name, full_path, n_gpu_layers, llama_kwargs)
@@ -101,8 +114,17 @@ def generate_structured_output(
     )
 
     with llm_lock:
+      previous = kv_cache.restore(llm, session_key) if use_kv else []
       model = outlines.from_llamacpp(llm)
       result = model(model_input=prompt, output_type=pydantic_model, max_tokens=max_tokens)
+      if use_kv or counting:
+        prompt_tokens = llm.tokenize(prompt.encode("utf-8"))
+      if use_kv:
+        kv_cache.save(llm, session_key)
+        kv_cache.record(session_key, previous, prompt_tokens)
+      if counting:
+        # n_tokens is everything in the context after generation: the prompt plus the completion
+        add_tokens(prompt=len(prompt_tokens), completion=max(llm.n_tokens - len(prompt_tokens), 0))
 
     if isinstance(result, str):
       try:
@@ -116,3 +138,66 @@ def generate_structured_output(
   except Exception as error:
     logger.error(f"Failed to generate structured output: {error}")
     raise
+
+
+# ---------------------------------------------------------------------------
+# Session KV state for the streaming (ChatLlamaCpp) CHAT path
+# ---------------------------------------------------------------------------
+
+class StreamedTurn:
+  """Filled in by the caller of hold_session_kv: tokens generated during the stream."""
+
+  completion_tokens: int = 0
+
+
+async def _acquire_llm_lock() -> None:
+  """Take llm_lock from the event loop without blocking it (threading.Lock may be released from any thread)."""
+  import asyncio
+
+  acquiring = asyncio.ensure_future(asyncio.to_thread(llm_lock.acquire))
+  try:
+    await asyncio.shield(acquiring)
+  except asyncio.CancelledError:
+    # The worker thread may still get the lock after we stop waiting — hand it straight back
+    acquiring.add_done_callback(lambda f: llm_lock.release() if not f.cancelled() and f.result() else None)
+    raise
+
+
+@asynccontextmanager
+async def hold_session_kv(session_key: str):
+  """Own the shared Llama for a streamed CHAT turn: restore the session's KV state, stream, save it.
+
+  llm_lock is held from restore to save, so no classifier, skill or other
+  session can overwrite the restored state mid-stream — and the state saved is
+  this session's. The caller sets .completion_tokens on the yielded
+  StreamedTurn (see count_tokens); the prompt length is derived from the
+  evaluated tokens minus those, since ChatLlamaCpp applies the chat template
+  internally. Nothing is saved if the stream raises.
+  """
+  import asyncio
+
+  from utils import kv_cache
+  from utils.turn_metrics import add_tokens
+
+  turn = StreamedTurn()
+  await _acquire_llm_lock()
+  try:
+    llm = _llama_instance
+    use_kv = kv_cache.ENABLED and llm is not None
+    previous = await asyncio.to_thread(kv_cache.restore, llm, session_key) if use_kv else []
+    yield turn
+    if use_kv:
+      evaluated = list(llm.input_ids[: llm.n_tokens])
+      prompt = evaluated[: max(len(evaluated) - turn.completion_tokens, 0)]
+      await asyncio.to_thread(kv_cache.save, llm, session_key)
+      kv_cache.record(session_key, previous, prompt)
+      add_tokens(prompt=len(prompt), completion=turn.completion_tokens)
+  finally:
+    llm_lock.release()
+
+
+def count_tokens(text: str) -> int:
+  """Tokens text encodes to with the loaded model's tokenizer. Call with llm_lock held."""
+  if _llama_instance is None or not text:
+    return 0
+  return len(_llama_instance.tokenize(text.encode("utf-8"), add_bos=False, special=True))
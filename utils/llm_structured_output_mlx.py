@@ -105,6 +105,7 @@ def generate_structured_output(
   pydantic_model: type[T],
   model_path: str | None = None,
   max_tokens: int | None = 512,
+  session_key: str | None = None,
   **mlx_kwargs,
 ) -> T:
   """
@@ -117,6 +118,7 @@ def generate_structured_output(
     pydantic_model: Pydantic model class for structured output
     model_path: Optional override for model base path (defaults to MODEL_PATH_MLX env var)
     max_tokens: Maximum tokens to generate
+    session_key: Accepted for parity with the llama.cpp backend; MLX does not keep per-session KV state
     **mlx_kwargs: Additional kwargs for MLX generation (temperature, etc.)
 
   Returns:
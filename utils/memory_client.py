@@ -1,10 +1,12 @@
-"""Persistent conversation memory via mem0 + Qdrant.
+"""Persistent conversation memory via mem0 + a vector store.
 
 Stores facts extracted from each conversation exchange so that cross-session
 context ("remember I told you I live in London?") can be recalled semantically
 rather than relying on full journal dumps.
 
-mem0 handles fact extraction (via our local LLM) and vector storage (Qdrant).
+mem0 handles fact extraction (via our local LLM) and vector storage. Storage is
+Qdrant, or with VECTOR_BACKEND=embedded the in-process store from
+utils/vector_store.py, plugged into mem0 through _mem0_vector_store().
 The shared all-MiniLM-L6-v2 embedder (utils/embedder.py) is injected after init
 so both this module and journal_index share a single loaded model.
 """
@@ -18,6 +20,14 @@ from utils.log import logger
 
 _memory: Optional["Memory"] = None
 
+COLLECTION = "langbox_memories"
+# Cosine similarity at or above which two memories count as near-duplicates.
+DEDUP_THRESHOLD = float(os.environ.get("MEMORY_DEDUP_THRESHOLD", "0.85"))
+_MAX_CLUSTER_PROMPT = 20  # facts per merge prompt; larger clusters are merged in chunks
+_BLOCK_ROWS = 1024  # rows per similarity block — bounds the n×n matrix to block×n
+# Payload key mem0 (2.x) stores a memory's text under; user_id/created_at/updated_at/hash sit beside it
+_TEXT_KEY = "data"
+
 
 class _LangboxLlm:
     """Duck-typed mem0 LLM provider wrapping the project's ChatLlamaCpp.
@@ -104,6 +114,95 @@ class _LangboxEmbedder:
         return embed(text)
 
 
+_mem0_store_class = None
+
+
+def _mem0_vector_store(collection_name: str):
+    """mem0 vector store backed by utils.vector_store (embedded backend).
+
+    A subclass of mem0's VectorStoreBase, defined on first use so importing
+    this module does not import mem0. Returned points are VectorHit tuples,
+    which carry the .id/.score/.payload mem0 reads.
+    """
+    global _mem0_store_class
+    if _mem0_store_class is None:
+        from mem0.vector_stores.base import VectorStoreBase
+
+        class _Mem0VectorStore(VectorStoreBase):
+            def __init__(self, collection_name: str):
+                from utils.embedder import EMBEDDING_DIM
+                from utils.vector_store import get_vector_store
+
+                self.collection_name = collection_name
+                self._store = get_vector_store()
+                self._store.ensure_collection(collection_name, EMBEDDING_DIM)
+
+            def create_col(self, name=None, vector_size=None, distance=None):
+                from utils.embedder import EMBEDDING_DIM
+                self._store.ensure_collection(self.collection_name, vector_size or EMBEDDING_DIM)
+
+            def insert(self, vectors, payloads=None, ids=None):
+                import uuid
+                from utils.vector_store import VectorPoint
+
+                payloads = payloads or [{} for _ in vectors]
+                ids = ids or [str(uuid.uuid4()) for _ in vectors]
+                self._store.upsert(
+                    self.collection_name, [VectorPoint(i, v, p) for i, v, p in zip(ids, vectors, payloads)]
+                )
+
+            def search(self, query, vectors, top_k=5, filters=None):
+                return self._store.search(self.collection_name, vectors, limit=top_k, filters=filters)
+
+            def search_batch(self, queries, vectors_list, top_k=1, filters=None):
+                return self._store.search_batch(self.collection_name, vectors_list, limit=top_k, filters=filters)
+
+            def keyword_search(self, query, top_k=5, filters=None):
+                return None  # no native keyword index; search_memories does its own BM25
+
+            def delete(self, vector_id):
+                self._store.delete(self.collection_name, [vector_id])
+
+            def update(self, vector_id, vector=None, payload=None):
+                from utils.vector_store import VectorPoint
+
+                existing = self._store.get(self.collection_name, vector_id)
+                if existing is None:
+                    return
+                self._store.upsert(self.collection_name, [
+                    VectorPoint(vector_id, vector, payload if payload is not None else existing.payload)
+                ])
+
+            def get(self, vector_id):
+                from utils.vector_store import VectorHit
+
+                point = self._store.get(self.collection_name, vector_id)
+                return VectorHit(point.id, 1.0, point.payload) if point else None
+
+            def list(self, filters=None, top_k=None):
+                from utils.vector_store import VectorHit
+
+                points = self._store.scroll(self.collection_name, filters=filters)
+                hits = [VectorHit(p.id, 1.0, p.payload) for p in points[:top_k]]
+                return [hits]  # mem0 unpacks the first element, as with Qdrant's (points, offset)
+
+            def list_cols(self):
+                return [self.collection_name]
+
+            def delete_col(self):
+                self._store.drop_collection(self.collection_name)
+
+            def col_info(self):
+                return {"name": self.collection_name, "points": self._store.count(self.collection_name)}
+
+            def reset(self):
+                self.delete_col()
+                self.create_col()
+
+        _mem0_store_class = _Mem0VectorStore
+    return _mem0_store_class(collection_name)
+
+
 def _get_memory() -> "Memory":
     global _memory
     if _memory is None:
@@ -117,6 +216,14 @@ def _get_memory() -> "Memory":
             from mem0.utils import factory as _factory
             _factory.EmbedderFactory.create = staticmethod(lambda provider, config, *a, **kw: _embedder)
             _factory.LlmFactory.create = staticmethod(lambda provider, config, *a, **kw: _llm)
+            from utils.vector_store import VECTOR_BACKEND
+            if VECTOR_BACKEND == "embedded":
+                _factory.VectorStoreFactory.create = staticmethod(
+                    lambda provider, config, *a, **kw: _mem0_vector_store(
+                        config.get("collection_name", COLLECTION) if isinstance(config, dict)
+                        else getattr(config, "collection_name", COLLECTION)
+                    )
+                )
         except (ImportError, AttributeError):
             logger.warning("[memory_client] Could not patch factories — falling back to post-init replace")
 
@@ -126,7 +233,7 @@ def _get_memory() -> "Memory":
                 "config": {
                     "host": os.environ.get("QDRANT_HOST", "localhost"),
                     "port": int(os.environ.get("QDRANT_PORT", "6333")),
-                    "collection_name": "langbox_memories",
+                    "collection_name": COLLECTION,
                     "embedding_model_dims": 384,  # all-MiniLM-L6-v2-q8_0.gguf
                 },
             },
@@ -139,150 +246,309 @@ def _get_memory() -> "Memory":
         _memory.llm = _llm
         _memory.embedding_model = _embedder
 
-        logger.debug("[memory_client] Initialised mem0 with Qdrant + local LLM + all-MiniLM")
+        logger.debug("[memory_client] Initialised mem0 with vector store + local LLM + all-MiniLM")
 
     return _memory
 
 
-def add_exchange(user_msg: str, assistant_msg: str, user_id: str = "default") -> None:
-    """Extract facts from a conversation turn and store them in Qdrant."""
-    try:
-        mem = _get_memory()
-        mem.add(
-            [
-                {"role": "user", "content": user_msg},
-                {"role": "assistant", "content": assistant_msg},
-            ],
-            user_id=user_id,
-        )
-    except Exception:
-        logger.exception("[memory_client] Failed to store exchange")
+def add_exchanges(exchanges: list[tuple[str, str]], user_id: str = "default") -> None:
+    """Extract facts from several conversation turns in one mem0 call and store them.
+
+    The turns are passed as one message list, so mem0 runs a single extraction
+    generation and dedup pass for the whole batch. Raises on failure so the
+    caller can keep the batch for a retry.
+    """
+    messages = []
+    for user_msg, assistant_msg in exchanges:
+        messages.append({"role": "user", "content": user_msg})
+        messages.append({"role": "assistant", "content": assistant_msg})
+    _get_memory().add(messages, user_id=user_id)
+    invalidate_memory_cache(user_id)
 
 
-def compact_memories(user_id: str = "default") -> tuple[int, int]:
-    """LLM-squash duplicate/redundant memories and replace the store.
+def _near_duplicate_clusters(vectors, threshold: float) -> list[list[int]]:
+    """Group rows whose cosine similarity is >= threshold (transitively).
 
-    Returns (original_count, compacted_count).
+    Similarities are computed blockwise as one matrix product per block of rows,
+    and linked pairs are merged with union-find, so memory stays O(block × n).
     """
-    import json
-    import os
-    import uuid
-    from datetime import datetime, timezone
+    import numpy as np
 
-    from utils.embedder import embed
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.maximum(norms, 1e-12)
+    n = len(unit)
 
-    mem = _get_memory()
+    parent = np.arange(n)
 
-    # 1. Fetch all stored memories
-    raw = mem.get_all(filters={"user_id": user_id}, top_k=1000)
-    results = raw.get("results", raw) if isinstance(raw, dict) else raw
-    if not results:
-        return 0, 0
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
 
-    entries = []
-    for r in results:
-        text = r.get("memory") or r.get("text") if isinstance(r, dict) else str(r)
-        if text:
-            entries.append(text)
+    for start in range(0, n, _BLOCK_ROWS):
+        block = unit[start:start + _BLOCK_ROWS] @ unit.T
+        rows, cols = np.nonzero(block >= threshold)
+        rows = rows + start
+        for i, j in zip(rows[rows < cols], cols[rows < cols]):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
 
-    original_count = len(entries)
-    if original_count == 0:
-        return 0, 0
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
 
-    # 2. Ask the LLM to deduplicate and merge
+
+def _merge_cluster(facts: list[str]) -> list[str]:
+    """Ask the LLM to merge a small group of near-duplicate facts."""
     from pydantic import BaseModel
     from utils.llm_structured_output import generate_structured_output
 
-    class _CompactedMemories(BaseModel):
+    class _MergedFacts(BaseModel):
         facts: list[str]
 
-    numbered = "\n".join(f"{i + 1}. {t}" for i, t in enumerate(entries))
-    compacted = generate_structured_output(
+    numbered = "\n".join(f"{i + 1}. {t}" for i, t in enumerate(facts))
+    merged = generate_structured_output(
         model_name=os.environ["MODEL_GENERALIST"],
-        user_prompt=f"Stored facts:\n{numbered}",
+        user_prompt=f"Similar facts:\n{numbered}",
         system_prompt=(
-            "You are given a numbered list of personal memory facts about the user. "
-            "Your task:\n"
-            "1. Remove exact or near-duplicate facts — keep the most specific version.\n"
-            "2. Merge facts that say the same thing differently into one clear statement.\n"
-            "3. Discard any fact that is world knowledge, a calculation, or not personal to the user.\n"
-            "Return the cleaned list in the `facts` field. One fact per item. No explanations."
+            "You are given a few personal memory facts about the user that say similar things. "
+            "Merge them into as few clear statements as possible, keeping the most specific details. "
+            "Keep facts separate if they are genuinely different. "
+            "Drop any that are world knowledge or not personal to the user.\n"
+            "Return the result in the `facts` field. One fact per item. No explanations."
         ),
-        pydantic_model=_CompactedMemories,
-        max_tokens=1024,
+        pydantic_model=_MergedFacts,
+        max_tokens=512,
     )
+    return [f.strip() for f in merged.facts if f.strip()]
 
-    compacted_facts = [f.strip() for f in compacted.facts if f.strip()]
-    if not compacted_facts:
-        logger.warning("[memory_client] compact_memories: LLM returned empty list — aborting")
-        return original_count, original_count
 
-    # 3. Flush all existing points from Qdrant
-    from qdrant_client import QdrantClient
-    from qdrant_client.models import PointStruct
-
-    host = os.environ.get("QDRANT_HOST", "localhost")
-    port = int(os.environ.get("QDRANT_PORT", "6333"))
-    client = QdrantClient(host=host, port=port)
-
-    all_ids = []
-    offset = None
-    while True:
-        batch, next_offset = client.scroll(
-            "langbox_memories",
-            limit=100,
-            offset=offset,
-            with_payload=False,
-            with_vectors=False,
-        )
-        all_ids.extend(p.id for p in batch)
-        if next_offset is None:
-            break
-        offset = next_offset
+def compact_memories(user_id: str = "default") -> tuple[int, int]:
+    """Merge near-duplicate memories and rewrite only the points that changed.
 
-    if all_ids:
-        client.delete("langbox_memories", points_selector=all_ids)
+    All of the user's points are fetched with their stored vectors and clustered
+    by cosine similarity (DEDUP_THRESHOLD). The LLM only sees clusters with more
+    than one fact; singletons are left untouched. Merged clusters are replaced
+    with one bulk delete and one bulk upsert.
 
-    # 4. Re-insert compacted facts directly (bypasses LLM extraction)
-    now = datetime.now(timezone.utc).isoformat()
-    points = []
-    for fact in compacted_facts:
-        points.append(
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embed(fact),
-                payload={
-                    "memory": fact,
-                    "user_id": user_id,
-                    "hash": str(hash(fact)),
-                    "created_at": now,
-                    "updated_at": now,
-                },
-            )
-        )
-    client.upsert("langbox_memories", points=points)
+    Returns (original_count, compacted_count).
+    """
+    import hashlib
+    import uuid
+    from datetime import datetime, timezone
 
-    # Reset singleton so mem0's internal state reflects the new collection
-    global _memory
-    _memory = None
+    import numpy as np
+
+    from utils.embedder import embed
+    from utils.vector_store import VectorPoint, get_vector_store
 
-    logger.debug(f"[memory_client] compact: {original_count} → {len(compacted_facts)}")
-    return original_count, len(compacted_facts)
+    store = get_vector_store()
 
+    # 1. Fetch every point for this user, vectors included
+    points = [
+        p for p in store.scroll(COLLECTION, filters={"user_id": user_id}, with_vectors=True)
+        if p.payload.get(_TEXT_KEY)
+    ]
+
+    original_count = len(points)
+    if original_count < 2:
+        return original_count, original_count
+
+    # 2. Cluster near-duplicates on the stored vectors
+    vectors = np.asarray([p.vector if p.vector else embed(p.payload[_TEXT_KEY]) for p in points], dtype=np.float32)
+    clusters = [c for c in _near_duplicate_clusters(vectors, DEDUP_THRESHOLD) if len(c) > 1]
+    if not clusters:
+        logger.debug(f"[memory_client] compact: no near-duplicates among {original_count} memories")
+        return original_count, original_count
 
-def search_memories(query: str, user_id: str = "default", limit: int = 5) -> list[str]:
-    """Return facts relevant to the query, or [] on failure."""
+    # 3. Merge each cluster with the LLM
+    now = datetime.now(timezone.utc).isoformat()
+    delete_ids = []
+    new_points = []
+    for cluster in clusters:
+        members = [points[i] for i in cluster]
+        facts = [m.payload[_TEXT_KEY] for m in members]
+        merged = []
+        for start in range(0, len(facts), _MAX_CLUSTER_PROMPT):
+            merged.extend(_merge_cluster(facts[start:start + _MAX_CLUSTER_PROMPT]))
+        if not merged:
+            logger.warning(f"[memory_client] compact: empty merge for {len(facts)} facts — keeping them")
+            continue
+        if sorted(merged) == sorted(facts):
+            continue
+
+        created_at = min((m.payload.get("created_at") or now) for m in members)
+        delete_ids.extend(m.id for m in members)
+        for fact in merged:
+            # Keep any other mem0 fields (agent_id, role, metadata) from the cluster's first member
+            payload = {
+                **members[0].payload,
+                _TEXT_KEY: fact,
+                "user_id": user_id,
+                "hash": hashlib.md5(fact.encode()).hexdigest(),
+                "created_at": created_at,
+                "updated_at": now,
+            }
+            new_points.append(VectorPoint(id=str(uuid.uuid4()), vector=embed(fact), payload=payload))
+
+    # 4. Apply only the changes, in bulk
+    store.upsert(COLLECTION, new_points)
+    store.delete(COLLECTION, delete_ids)
+    invalidate_memory_cache(user_id)
+
+    compacted_count = original_count - len(delete_ids) + len(new_points)
+    logger.debug(
+        f"[memory_client] compact: {original_count} → {compacted_count} "
+        f"({len(clusters)} clusters, {len(delete_ids)} replaced by {len(new_points)})"
+    )
+    return original_count, compacted_count
+
+
+# --- Hybrid retrieval -------------------------------------------------------
+
+MEMORY_TOKEN_BUDGET = int(os.environ.get("MEMORY_TOKEN_BUDGET", "120"))
+_WEIGHT_VECTOR = 0.6
+_WEIGHT_BM25 = 0.25
+_WEIGHT_RECENCY = 0.15
+_RECENCY_HALF_LIFE_DAYS = 90.0
+_MMR_LAMBDA = 0.7  # relevance vs. diversity trade-off
+_DUPLICATE_SIMILARITY = 0.9  # candidates this close to an already chosen memory are skipped
+_CANDIDATE_POOL = 30
+_MIN_SIMILARITY = 0.2  # below this (and with no keyword match) a memory is not a candidate
+_RELATIVE_FLOOR = 0.5  # candidates scoring under this fraction of the best are dropped
+_CORPUS_TTL_SECONDS = 300
+
+_corpora: dict[str, "_MemoryCorpus"] = {}
+
+
+class _MemoryCorpus:
+    """A user's memories as NumPy arrays: unit vectors, BM25 index and ages, loaded once."""
+
+    def __init__(self, user_id: str):
+        import time
+        from datetime import datetime, timezone
+
+        import numpy as np
+        from rank_bm25 import BM25Okapi
+
+        from utils.vector_store import get_vector_store
+
+        points = [
+            p for p in get_vector_store().scroll(COLLECTION, filters={"user_id": user_id}, with_vectors=True)
+            if p.payload.get(_TEXT_KEY) and p.vector
+        ]
+        self.loaded_at = time.monotonic()
+        self.texts = [p.payload[_TEXT_KEY] for p in points]
+        if not points:
+            return
+        vectors = np.asarray([p.vector for p in points], dtype=np.float32)
+        self.vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        self.bm25 = BM25Okapi([_tokenize(t) for t in self.texts])
+
+        now = datetime.now(timezone.utc)
+        ages = []
+        for p in points:
+            stamp = p.payload.get("updated_at") or p.payload.get("created_at")
+            try:
+                moment = datetime.fromisoformat(stamp)
+                if moment.tzinfo is None:
+                    moment = moment.replace(tzinfo=timezone.utc)
+                ages.append(max((now - moment).total_seconds() / 86400, 0.0))
+            except (TypeError, ValueError):
+                ages.append(_RECENCY_HALF_LIFE_DAYS)  # unknown age — treat as middling
+        self.recency = np.exp(-np.log(2) * np.asarray(ages, dtype=np.float32) / _RECENCY_HALF_LIFE_DAYS)
+
+
+def _tokenize(text: str) -> list[str]:
+    import re
+    return re.findall(r"\w+", text.lower())
+
+
+def _get_corpus(user_id: str) -> _MemoryCorpus:
+    import time
+
+    from utils.turn_metrics import cache_hit
+
+    corpus = _corpora.get(user_id)
+    if corpus is None or time.monotonic() - corpus.loaded_at > _CORPUS_TTL_SECONDS:
+        corpus = _corpora[user_id] = _MemoryCorpus(user_id)
+    else:
+        cache_hit("memory_corpus")
+    return corpus
+
+
+def invalidate_memory_cache(user_id: str | None = None) -> None:
+    """Drop cached retrieval corpora after memories were written or deleted."""
+    if user_id is None:
+        _corpora.clear()
+    else:
+        _corpora.pop(user_id, None)
+
+
+def search_memories(
+    query: str,
+    user_id: str = "default",
+    limit: int = 5,
+    token_budget: int | None = MEMORY_TOKEN_BUDGET,
+) -> list[str]:
+    """Return facts relevant to the query, or [] on failure.
+
+    Hybrid scoring over the user's whole memory set, vectorised in NumPy:
+    cosine similarity to the query embedding, BM25 over the memory text
+    (normalised to [0, 1]) and an exponential recency decay from
+    updated_at/created_at. The best-scoring candidates are then picked by
+    maximal marginal relevance, so near-duplicates ("lives in London" / "is
+    based in London") are not both returned. Selection stops at limit or when
+    the next memory would exceed token_budget (≈ 4 chars per token).
+    """
     try:
-        mem = _get_memory()
-        raw = mem.search(query, filters={"user_id": user_id}, limit=limit)
-        results = raw.get("results", raw) if isinstance(raw, dict) else raw
-        memories = []
-        for r in results:
-            # mem0 returns dicts; key is 'memory' in current versions
-            text = r.get("memory") or r.get("text") if isinstance(r, dict) else str(r)
-            if text:
-                memories.append(text)
-        return memories
+        import numpy as np
+
+        from utils.embedder import embed
+
+        corpus = _get_corpus(user_id)
+        if not corpus.texts:
+            return []
+
+        q = np.asarray(embed(query), dtype=np.float32)
+        q /= max(float(np.linalg.norm(q)), 1e-12)
+        similarity = corpus.vectors @ q
+        bm25 = np.asarray(corpus.bm25.get_scores(_tokenize(query)), dtype=np.float32)
+        bm25 = np.clip(bm25, 0, None)
+        if bm25.max() > 0:
+            bm25 /= bm25.max()
+        relevance = _WEIGHT_VECTOR * similarity + _WEIGHT_BM25 * bm25 + _WEIGHT_RECENCY * corpus.recency
+
+        eligible = np.nonzero((similarity >= _MIN_SIMILARITY) | (bm25 > 0))[0]
+        if len(eligible) == 0:
+            return []
+        eligible = eligible[relevance[eligible] >= _RELATIVE_FLOOR * relevance[eligible].max()]
+        pool = eligible[np.argsort(-relevance[eligible])[:_CANDIDATE_POOL]]
+        pool_vectors = corpus.vectors[pool]
+        pool_relevance = relevance[pool]
+
+        chosen: list[int] = []
+        used_tokens = 0
+        max_overlap = np.zeros(len(pool), dtype=np.float32)  # max similarity to anything chosen
+        available = np.ones(len(pool), dtype=bool)
+        while len(chosen) < limit and available.any():
+            mmr = _MMR_LAMBDA * pool_relevance - (1 - _MMR_LAMBDA) * max_overlap
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            available[best] = False
+            if chosen and max_overlap[best] >= _DUPLICATE_SIMILARITY:
+                continue
+            tokens = len(corpus.texts[pool[best]]) // 4 + 1
+            if token_budget is not None and chosen and used_tokens + tokens > token_budget:
+                break
+            chosen.append(best)
+            used_tokens += tokens
+            max_overlap = np.maximum(max_overlap, pool_vectors @ pool_vectors[best])
+
+        return [corpus.texts[pool[i]] for i in chosen]
     except Exception:
         logger.exception("[memory_client] Search failed")
         return []
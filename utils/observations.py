@@ -0,0 +1,146 @@
+"""Compact tool observations for planner and ReAct prompts, and memoise tool calls.
+
+Skill outputs (a web search dump, a year of yfinance history) can run to
+thousands of tokens. The full text is kept once — in the planner job's steps or
+the ReAct observation list — but every later prompt sees only a bounded digest.
+Digests are extractive: sentences are scored against the query and the best are
+kept in their original order. No model call is involved.
+
+Tool results are also memoised in the ToolMemos collection by (tool, normalised
+query) with a per-tool TTL, so repeated research within that window is free.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from utils.log import logger
+
+DIGEST_CHARS = 600  # per observation in step-selection prompts
+SYNTHESIS_DIGEST_CHARS = 1800  # per observation in the final synthesis prompt
+
+# How long a tool's result stays fresh. Tools absent from this map are never
+# memoised (REMINDER has side effects; HOME_CONTROL is not a research tool).
+MEMO_TTL = {
+    "WEATHER": timedelta(minutes=30),
+    "FINANCE_STOCKS": timedelta(minutes=10),
+    "NEWSFEED": timedelta(hours=1),
+    "SEARCH": timedelta(hours=6),
+    "INFORMATION_QUERY": timedelta(days=7),
+}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "which",
+    "who", "why", "with",
+}
+
+
+def _tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def digest(text: str, query: str, max_chars: int = DIGEST_CHARS) -> str:
+    """Extract the sentences of text most relevant to query, within max_chars.
+
+    Sentences are scored by idf-weighted overlap with the query terms, with a
+    small bonus for early sentences (result summaries usually lead) and for
+    figures. The chosen sentences are returned in their original order, with
+    " … " marking omitted text.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+
+    sentences = []
+    seen = set()
+    for raw in _SENTENCE_SPLIT.split(text):
+        sentence = raw.strip()
+        if sentence and sentence not in seen:
+            seen.add(sentence)
+            sentences.append(sentence)
+    if not sentences:
+        return text[:max_chars]
+
+    tokenized = [set(_tokenize(s)) for s in sentences]
+    doc_freq = Counter(term for terms in tokenized for term in terms)
+    query_terms = {t for t in _tokenize(query) if t not in _STOPWORDS}
+    n = len(sentences)
+
+    scores = []
+    for i, (sentence, terms) in enumerate(zip(sentences, tokenized)):
+        relevance = sum(math.log(1 + n / doc_freq[t]) for t in query_terms & terms)
+        position = 1.0 / (1 + i)
+        figures = 0.3 if re.search(r"\d", sentence) else 0.0
+        scores.append(relevance + position + figures)
+
+    chosen = []
+    used = 0
+    for i in sorted(range(n), key=lambda i: scores[i], reverse=True):
+        length = len(sentences[i]) + 1
+        if used + length > max_chars:
+            if not chosen:
+                # A single sentence longer than the budget — keep its head
+                return sentences[i][: max_chars - 1] + "…"
+            continue
+        chosen.append(i)
+        used += length
+
+    parts = []
+    previous = -1
+    for i in sorted(chosen):
+        if i != previous + 1:
+            parts.append("…")
+        parts.append(sentences[i])
+        previous = i
+    if previous != n - 1:
+        parts.append("…")
+    return " ".join(parts)
+
+
+def normalise_query(query: str) -> str:
+    return " ".join(_tokenize(query))
+
+
+async def memoised(tool: str, query: str, call: Callable[[], Awaitable[str]]) -> str:
+    """Return a fresh memoised result for (tool, query), or await call() and memoise it.
+
+    Exceptions from call() propagate and are not memoised. Memo store failures
+    are logged and otherwise ignored — the memo is an optimisation only.
+    """
+    ttl = MEMO_TTL.get(tool)
+    if ttl is None:
+        return await call()
+
+    from db.schemas import ToolMemo
+
+    key = normalise_query(query)
+    try:
+        memo = await ToolMemo.find_one(
+            ToolMemo.tool == tool,
+            ToolMemo.query_key == key,
+            ToolMemo.expires_at > datetime.now(timezone.utc),
+        )
+    except Exception as e:
+        logger.warning(f"[memo] lookup failed for {tool}({key!r}): {e}")
+        memo = None
+    if memo is not None:
+        logger.debug(f"[memo] hit {tool}({key!r})")
+        return memo.result
+
+    result = await call()
+
+    try:
+        from beanie.operators import Set
+
+        now = datetime.now(timezone.utc)  # Mongo stores and TTL-expires in UTC
+        await ToolMemo.find_one(ToolMemo.tool == tool, ToolMemo.query_key == key).upsert(
+            Set({"result": result, "created_at": now, "expires_at": now + ttl}),
+            on_insert=ToolMemo(tool=tool, query_key=key, result=result, created_at=now, expires_at=now + ttl),
+        )
+    except Exception as e:
+        logger.warning(f"[memo] store failed for {tool}({key!r}): {e}")
+    return result
@@ -0,0 +1,86 @@
+"""Per-turn metrics: chosen intent and skill, stage timings, token counts, cache hits.
+
+A turn opens a TurnMetrics in a context variable; code anywhere below it —
+including asyncio tasks and asyncio.to_thread workers, which copy the context —
+records into it without the object being passed around. Outside a turn every
+recording call is a no-op. The finished metrics are stored on the turn's
+ConversationEntry and exported by skills/journal/archive.py.
+
+    with start_turn() as turn:
+        with stage("classify"):
+            ...
+        turn.intent = "CHAT"
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+
+_current: ContextVar["TurnMetrics | None"] = ContextVar("turn_metrics", default=None)
+_lock = threading.Lock()  # worker threads record into the same turn
+
+
+@dataclass
+class TurnMetrics:
+    intent: str | None = None
+    skill: str | None = None
+    stages: dict[str, float] = field(default_factory=dict)  # stage → milliseconds
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hits: dict[str, int] = field(default_factory=dict)  # cache → hits (or tokens, for "kv_tokens")
+    total_ms: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def current_turn() -> TurnMetrics | None:
+    return _current.get()
+
+
+@contextmanager
+def start_turn():
+    """Collect metrics for the enclosed turn; total_ms is set on exit."""
+    turn = TurnMetrics()
+    token = _current.set(turn)
+    started = time.perf_counter()
+    try:
+        yield turn
+    finally:
+        turn.total_ms = round((time.perf_counter() - started) * 1000, 1)
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as a stage of the current turn (summed if repeated)."""
+    turn = _current.get()
+    if turn is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        with _lock:
+            turn.stages[name] = round(turn.stages.get(name, 0.0) + elapsed, 1)
+
+
+def add_tokens(prompt: int = 0, completion: int = 0) -> None:
+    turn = _current.get()
+    if turn is None:
+        return
+    with _lock:
+        turn.prompt_tokens += prompt
+        turn.completion_tokens += completion
+
+
+def cache_hit(name: str, count: int = 1) -> None:
+    turn = _current.get()
+    if turn is None or count <= 0:
+        return
+    with _lock:
+        turn.cache_hits[name] = turn.cache_hits.get(name, 0) + count
@@ -0,0 +1,476 @@
+"""Pluggable vector store for memories and the journal index.
+
+Two backends share one small interface:
+
+- "qdrant"   — the Qdrant server (QDRANT_HOST / QDRANT_PORT), as before.
+- "embedded" — in-process: each collection is a memory-mapped float32 matrix of
+               unit vectors plus a JSON payload file under
+               $LANGBOX_DATA_DIR/vectors/<collection>/. Search is one brute-force
+               matrix-vector product (BLAS, SIMD) over the live rows. For a
+               single user's few thousand 384-dim vectors that is well under a
+               millisecond, with no network hop and no external service.
+
+Select with VECTOR_BACKEND=qdrant|embedded. Filters are payload equality
+matches, e.g. {"user_id": "default"} or {"datestamp": "2025-01-31"}.
+
+    store = get_vector_store()
+    store.ensure_collection("langbox_journal", 384)
+    store.upsert("langbox_journal", [VectorPoint(1, vector, {"datestamp": "2025-01-31"})])
+    hits = store.search("langbox_journal", query_vector, limit=3)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, NamedTuple, Optional
+
+from utils.log import logger
+
+DATA_DIR = os.path.expanduser(os.environ.get("LANGBOX_DATA_DIR", "~/.langbox-data"))
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "qdrant")
+
+_store: Optional["VectorStore"] = None
+
+
+class VectorPoint(NamedTuple):
+    id: Any  # int or UUID string — both backends accept either
+    vector: Optional[list[float]]
+    payload: dict
+
+
+class VectorHit(NamedTuple):
+    id: Any
+    score: float  # cosine similarity
+    payload: dict
+
+
+class VectorStore:
+    """Interface implemented by each backend."""
+
+    def ensure_collection(self, name: str, dim: int) -> None:
+        raise NotImplementedError
+
+    def upsert(self, name: str, points: list[VectorPoint]) -> None:
+        raise NotImplementedError
+
+    def search(
+        self, name: str, vector: list[float], limit: int, filters: dict | None = None,
+    ) -> list[VectorHit]:
+        raise NotImplementedError
+
+    def search_batch(
+        self, name: str, vectors: list[list[float]], limit: int, filters: dict | None = None,
+    ) -> list[list[VectorHit]]:
+        """search() for several query vectors; backends may answer them in one pass."""
+        return [self.search(name, vector, limit, filters) for vector in vectors]
+
+    def scroll(
+        self, name: str, filters: dict | None = None, with_vectors: bool = False,
+    ) -> list[VectorPoint]:
+        """Return every point matching filters."""
+        raise NotImplementedError
+
+    def get(self, name: str, point_id) -> VectorPoint | None:
+        raise NotImplementedError
+
+    def delete(self, name: str, ids: list) -> None:
+        raise NotImplementedError
+
+    def count(self, name: str, filters: dict | None = None) -> int:
+        raise NotImplementedError
+
+    def drop_collection(self, name: str) -> None:
+        raise NotImplementedError
+
+
+def get_vector_store() -> VectorStore:
+    global _store
+    if _store is None:
+        if VECTOR_BACKEND == "embedded":
+            _store = EmbeddedVectorStore(os.path.join(DATA_DIR, "vectors"))
+        elif VECTOR_BACKEND == "qdrant":
+            _store = QdrantVectorStore()
+        else:
+            raise ValueError(
+                f"Unknown VECTOR_BACKEND '{VECTOR_BACKEND}' (expected qdrant or embedded)"
+            )
+        logger.debug(f"[vector_store] Using {VECTOR_BACKEND} backend")
+    return _store
+
+
+# ---------------------------------------------------------------------------
+# Qdrant
+# ---------------------------------------------------------------------------
+
+class QdrantVectorStore(VectorStore):
+    def __init__(self, host: str | None = None, port: int | None = None):
+        from qdrant_client import QdrantClient
+
+        self._client = QdrantClient(
+            host=host or os.environ.get("QDRANT_HOST", "localhost"),
+            port=port or int(os.environ.get("QDRANT_PORT", "6333")),
+        )
+
+    @staticmethod
+    def _filter(filters: dict | None):
+        if not filters:
+            return None
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+        return Filter(
+            must=[FieldCondition(key=k, match=MatchValue(value=v)) for k, v in filters.items()]
+        )
+
+    def ensure_collection(self, name: str, dim: int) -> None:
+        from qdrant_client.models import Distance, VectorParams
+
+        existing = {c.name for c in self._client.get_collections().collections}
+        if name not in existing:
+            self._client.create_collection(
+                collection_name=name,
+                vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+            )
+            logger.info(f"[vector_store] Created Qdrant collection '{name}'")
+
+    def upsert(self, name: str, points: list[VectorPoint]) -> None:
+        from qdrant_client.models import PointStruct
+
+        if points:
+            self._client.upsert(
+                collection_name=name,
+                points=[PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points],
+            )
+
+    def search(
+        self, name: str, vector: list[float], limit: int, filters: dict | None = None,
+    ) -> list[VectorHit]:
+        hits = self._client.search(
+            collection_name=name,
+            query_vector=vector,
+            query_filter=self._filter(filters),
+            limit=limit,
+        )
+        return [VectorHit(h.id, h.score, h.payload or {}) for h in hits]
+
+    def scroll(
+        self, name: str, filters: dict | None = None, with_vectors: bool = False,
+    ) -> list[VectorPoint]:
+        points = []
+        offset = None
+        while True:
+            batch, offset = self._client.scroll(
+                name,
+                scroll_filter=self._filter(filters),
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=with_vectors,
+            )
+            points.extend(
+                VectorPoint(p.id, p.vector if with_vectors else None, p.payload or {})
+                for p in batch
+            )
+            if offset is None:
+                return points
+
+    def get(self, name: str, point_id) -> VectorPoint | None:
+        found = self._client.retrieve(name, ids=[point_id], with_payload=True, with_vectors=True)
+        return VectorPoint(found[0].id, found[0].vector, found[0].payload or {}) if found else None
+
+    def delete(self, name: str, ids: list) -> None:
+        from qdrant_client.models import PointIdsList
+
+        if ids:
+            self._client.delete(name, points_selector=PointIdsList(points=list(ids)))
+
+    def count(self, name: str, filters: dict | None = None) -> int:
+        return self._client.count(name, count_filter=self._filter(filters), exact=True).count
+
+    def drop_collection(self, name: str) -> None:
+        self._client.delete_collection(name)
+
+
+# ---------------------------------------------------------------------------
+# Embedded (memory-mapped, brute force)
+# ---------------------------------------------------------------------------
+
+class _Collection:
+    """One memory-mapped collection. Rows [0, n) of the matrix are live and dense.
+
+    Ids and payloads are persisted as a meta.json snapshot plus an append-only
+    log of upserts and deletes, so a write costs the size of the change rather
+    than of the collection. The log is folded into a new snapshot once it
+    outgrows the collection; snapshot and log carry a generation number so a
+    crash between the two never replays a log twice.
+    """
+
+    def __init__(self, path: str, dim: int):
+        import numpy as np
+
+        self.path = path
+        self.lock = threading.Lock()
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.capacity = meta["capacity"]
+            self.ids: list = meta["ids"]
+            self.payloads: list[dict] = meta["payloads"]
+            self.generation = meta.get("generation", 0)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.dim, self.capacity, self.ids, self.payloads = dim, 0, [], []
+            self.generation = 0
+        self.rows = {point_id: i for i, point_id in enumerate(self.ids)}
+        self.logged = self._replay()
+        if self.capacity:
+            self.matrix = self._open(self.capacity)
+        else:
+            self.matrix = np.zeros((0, self.dim), dtype=np.float32)
+
+    @property
+    def n(self) -> int:
+        return len(self.ids)
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"log.{generation}.jsonl")
+
+    def _replay(self) -> int:
+        """Apply this generation's log to the snapshot; drop logs of other generations."""
+        current = self._log_path(self.generation)
+        for name in os.listdir(self.path):
+            if name.startswith("log.") and os.path.join(self.path, name) != current:
+                os.remove(os.path.join(self.path, name))
+        if not os.path.exists(current):
+            return 0
+        count = 0
+        with open(current) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final line from a crash mid-write
+                if entry["op"] == "put":
+                    self.place(entry["id"], entry["payload"])
+                else:
+                    self.remove(entry["id"])
+                count += 1
+        return count
+
+    def place(self, point_id, payload: dict) -> int:
+        """Row for point_id, appending it if new, with its payload set."""
+        row = self.rows.get(point_id)
+        if row is None:
+            row = self.rows[point_id] = self.n
+            self.ids.append(point_id)
+            self.payloads.append(payload)
+        else:
+            self.payloads[row] = payload
+        return row
+
+    def remove(self, point_id) -> tuple[int, int] | None:
+        """Swap-remove point_id from ids/payloads.
+
+        Returns (row, last) so the caller can move the vector.
+        """
+        row = self.rows.pop(point_id, None)
+        if row is None:
+            return None
+        last = self.n - 1
+        if row != last:
+            self.ids[row] = self.ids[last]
+            self.payloads[row] = self.payloads[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        self.payloads.pop()
+        return row, last
+
+    def _open(self, capacity: int, mode: str = "r+"):
+        import numpy as np
+
+        return np.memmap(
+            os.path.join(self.path, "vectors.f32"),
+            dtype=np.float32,
+            mode=mode,
+            shape=(capacity, self.dim),
+        )
+
+    def _grow(self, needed: int) -> None:
+        import numpy as np
+
+        capacity = max(needed, self.capacity * 2, 256)
+        current = np.array(self.matrix[: self.n]) if self.n else None
+        tmp = os.path.join(self.path, "vectors.f32.tmp")
+        grown = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+        if current is not None:
+            grown[: self.n] = current
+        grown.flush()
+        del grown
+        self.matrix = None
+        os.replace(tmp, os.path.join(self.path, "vectors.f32"))
+        self.capacity = capacity
+        self.matrix = self._open(capacity)
+        self.save()  # capacity lives in the snapshot
+
+    def append_log(self, entries: list[dict]) -> None:
+        """Persist a change: vectors are already in the memmap, ids/payloads go to the log."""
+        if self.capacity:
+            self.matrix.flush()
+        with open(self._log_path(self.generation), "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self.logged += len(entries)
+        if self.logged > max(self.n, 1024):
+            self.save()
+
+    def save(self) -> None:
+        """Write a full snapshot and start a new, empty log generation."""
+        if self.capacity:
+            self.matrix.flush()
+        previous = self._log_path(self.generation)
+        self.generation += 1
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "dim": self.dim, "capacity": self.capacity, "generation": self.generation,
+                "ids": self.ids, "payloads": self.payloads,
+            }, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+        if os.path.exists(previous):
+            os.remove(previous)
+        self.logged = 0
+
+    def mask(self, filters: dict | None):
+        import numpy as np
+
+        if not filters:
+            return None
+        items = filters.items()
+        return np.fromiter(
+            (all(p.get(k) == v for k, v in items) for p in self.payloads), dtype=bool, count=self.n,
+        )
+
+
+class EmbeddedVectorStore(VectorStore):
+    """In-process store — see module docstring. Thread-safe per collection."""
+
+    def __init__(self, root: str):
+        self._root = root
+        self._collections: dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, name: str, dim: int | None = None) -> _Collection:
+        with self._lock:
+            col = self._collections.get(name)
+            if col is None:
+                path = os.path.join(self._root, name)
+                if dim is None and not os.path.exists(os.path.join(path, "meta.json")):
+                    from utils.embedder import EMBEDDING_DIM
+                    dim = EMBEDDING_DIM
+                col = self._collections[name] = _Collection(path, dim)
+            return col
+
+    def ensure_collection(self, name: str, dim: int) -> None:
+        self._collection(name, dim)
+
+    def upsert(self, name: str, points: list[VectorPoint]) -> None:
+        import numpy as np
+
+        if not points:
+            return
+        col = self._collection(name)
+        with col.lock:
+            new = sum(1 for p in points if p.id not in col.rows)
+            if col.n + new > col.capacity:
+                col._grow(col.n + new)
+            for p in points:
+                row = col.place(p.id, p.payload)
+                if p.vector is not None:
+                    v = np.asarray(p.vector, dtype=np.float32)
+                    col.matrix[row] = v / max(float(np.linalg.norm(v)), 1e-12)
+            col.append_log([{"op": "put", "id": p.id, "payload": p.payload} for p in points])
+
+    def search(
+        self, name: str, vector: list[float], limit: int, filters: dict | None = None,
+    ) -> list[VectorHit]:
+        return self.search_batch(name, [vector], limit, filters)[0]
+
+    def search_batch(
+        self, name: str, vectors: list[list[float]], limit: int, filters: dict | None = None,
+    ) -> list[list[VectorHit]]:
+        import numpy as np
+
+        col = self._collection(name)
+        with col.lock:
+            if col.n == 0 or not vectors:
+                return [[] for _ in vectors]
+            q = np.asarray(vectors, dtype=np.float32)
+            q /= np.maximum(np.linalg.norm(q, axis=1, keepdims=True), 1e-12)
+            scores = q @ col.matrix[: col.n].T  # one matrix product for every query
+            mask = col.mask(filters)
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+            k = min(limit, col.n)
+            results = []
+            for row in scores:
+                top = np.argpartition(-row, k - 1)[:k]
+                top = top[np.argsort(-row[top])]
+                results.append([
+                    VectorHit(col.ids[i], float(row[i]), col.payloads[i])
+                    for i in top
+                    if row[i] > -np.inf
+                ])
+            return results
+
+    def scroll(
+        self, name: str, filters: dict | None = None, with_vectors: bool = False,
+    ) -> list[VectorPoint]:
+        col = self._collection(name)
+        with col.lock:
+            mask = col.mask(filters)
+            return [
+                VectorPoint(
+                    col.ids[i], col.matrix[i].tolist() if with_vectors else None, col.payloads[i]
+                )
+                for i in range(col.n)
+                if mask is None or mask[i]
+            ]
+
+    def get(self, name: str, point_id) -> VectorPoint | None:
+        col = self._collection(name)
+        with col.lock:
+            row = col.rows.get(point_id)
+            if row is None:
+                return None
+            return VectorPoint(point_id, col.matrix[row].tolist(), col.payloads[row])
+
+    def delete(self, name: str, ids: list) -> None:
+        col = self._collection(name)
+        with col.lock:
+            removed = []
+            for point_id in ids:
+                moved = col.remove(point_id)
+                if moved is None:
+                    continue
+                # Swap-remove: move the last live row into the hole to keep rows dense
+                row, last = moved
+                if row != last:
+                    col.matrix[row] = col.matrix[last]
+                removed.append({"op": "delete", "id": point_id})
+            if removed:
+                col.append_log(removed)
+
+    def count(self, name: str, filters: dict | None = None) -> int:
+        col = self._collection(name)
+        with col.lock:
+            mask = col.mask(filters)
+            return col.n if mask is None else int(mask.sum())
+
+    def drop_collection(self, name: str) -> None:
+        import shutil
+
+        with self._lock:
+            self._collections.pop(name, None)
+            shutil.rmtree(os.path.join(self._root, name), ignore_errors=True)